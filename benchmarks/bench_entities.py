@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+实体提取性能基准
+对比旧的 split()+startswith('#') 方式、单次扫描提取器和只提取话题的快速路径
+
+用法:
+    python benchmarks/bench_entities.py --count 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from social_common.entities import extract_entities, extract_hashtags
+
+TEMPLATES = [
+    "Just shipped a new release of our SDK #python #opensource https://example.com/release/{n}",
+    "今天#美食#烹饪 分享一道家常菜 @美食达人小王 {n}",
+    "@elonmusk what do you think about $TSLA today? #EV #stocks {n}",
+    "没有任何话题的普通推文，只是记录一下生活 {n}",
+    "Reading the docs at https://docs.example.com/guide?page={n} with @alice and @bob",
+    "RT @news_bot: Breaking #news #世界 update {n} https://t.co/abc{n}",
+    "plain english tweet with no entities at all number {n}",
+]
+
+
+def make_corpus(count: int, seed: int = 42):
+    """生成合成推文文本"""
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(n=i) for i in range(count)]
+
+
+def legacy_hashtags(texts):
+    """旧实现：按空白分词后查找#开头的词"""
+    counts = {}
+    for text in texts:
+        for word in text.split():
+            if word.startswith('#'):
+                hashtag = word.lower()
+                counts[hashtag] = counts.get(hashtag, 0) + 1
+    return counts
+
+
+def extractor_entities(texts):
+    """新实现：单次扫描提取全部实体"""
+    counts = {}
+    mentions = 0
+    urls = 0
+    for text in texts:
+        entities = extract_entities(text)
+        for tag in entities["hashtags"]:
+            hashtag = tag.casefold()
+            counts[hashtag] = counts.get(hashtag, 0) + 1
+        mentions += len(entities["mentions"])
+        urls += len(entities["urls"])
+    return counts, mentions, urls
+
+
+def extractor_hashtags(texts):
+    """快速路径：只提取话题（话题统计、聚合器使用）"""
+    counts = {}
+    for text in texts:
+        for tag in extract_hashtags(text):
+            hashtag = tag.casefold()
+            counts[hashtag] = counts.get(hashtag, 0) + 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实体提取性能基准")
+    parser.add_argument("--count", type=int, default=1_000_000, help="合成推文数量 (默认: 1000000)")
+    args = parser.parse_args()
+
+    print(f"生成 {args.count:,} 条合成推文...")
+    texts = make_corpus(args.count)
+
+    start = time.perf_counter()
+    legacy = legacy_hashtags(texts)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hashtags, mentions, urls = extractor_entities(texts)
+    extractor_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hashtags_only = extractor_hashtags(texts)
+    hashtags_only_time = time.perf_counter() - start
+    assert hashtags_only == hashtags
+
+    print(f"旧实现 (仅话题):   {legacy_time:.2f}s, {len(legacy)} 个不同话题")
+    print(f"提取器 (全部实体): {extractor_time:.2f}s, {len(hashtags)} 个不同话题, "
+          f"{mentions:,} 个提及, {urls:,} 个URL")
+    print(f"提取器 (仅话题):   {hashtags_only_time:.2f}s, {len(hashtags_only)} 个不同话题")
+    print(f"提取器吞吐量: {args.count / extractor_time:,.0f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+视频统计性能基准
+对比旧的多次遍历实现、流式聚合器和NumPy向量化实现
+
+用法:
+    python benchmarks/bench_video_stats.py --count 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from social_common.aggregators import VideoAggregator
+from social_common.vectorized import analyze_videos, numpy_available
+
+TOPICS = ["美食", "烹饪", "生活", "旅行", "vlog", "古镇", "科技", "AI", "效率", "宠物", "健身", "音乐"]
+
+
+def make_videos(count: int, seed: int = 42):
+    """按 create_mock_video_data 的结构生成合成视频"""
+    rng = random.Random(seed)
+    videos = []
+    for i in range(count):
+        tags = rng.sample(TOPICS, 3)
+        plays = rng.randint(0, 200000)
+        videos.append({
+            "aweme_id": str(7300000000000000000 + i),
+            "desc": f"模拟视频 {i} " + " ".join("#" + tag for tag in tags),
+            "author": {
+                "unique_id": f"user{i % 1000}",
+                "nickname": f"作者{i % 1000}",
+            },
+            "create_time": 1701234567 - i * 60,
+            "statistics": {
+                "digg_count": rng.randint(0, plays // 5 + 1),
+                "comment_count": rng.randint(0, 500),
+                "share_count": rng.randint(0, 300),
+                "play_count": plays,
+            },
+            "video": {
+                "duration": rng.randint(5, 180),
+                "width": 720,
+                "height": 1280,
+            },
+            "music": {"title": "背景音乐", "author": "音乐制作人"},
+            "text_extra": [{"hashtag_name": tag, "type": 1} for tag in tags],
+        })
+    return videos
+
+
+def legacy_analyze(videos):
+    """旧实现：每个统计量各遍历一次，再整体排序"""
+    total_likes = sum(v.get('statistics', {}).get('digg_count', 0) for v in videos)
+    total_comments = sum(v.get('statistics', {}).get('comment_count', 0) for v in videos)
+    total_shares = sum(v.get('statistics', {}).get('share_count', 0) for v in videos)
+    total_plays = sum(v.get('statistics', {}).get('play_count', 0) for v in videos)
+
+    durations = [v.get('video', {}).get('duration', 0) for v in videos if v.get('video', {}).get('duration', 0) > 0]
+    engagement_rates = []
+    for video in videos:
+        stats = video.get('statistics', {})
+        plays = stats.get('play_count', 0)
+        if plays > 0:
+            engagement_rates.append(
+                (stats.get('digg_count', 0) + stats.get('comment_count', 0) + stats.get('share_count', 0)) / plays
+            )
+    sorted_videos = sorted(videos, key=lambda x: x.get('statistics', {}).get('digg_count', 0), reverse=True)
+
+    hashtag_counts = {}
+    for video in videos:
+        for tag in video.get('text_extra', []):
+            if tag.get('type') == 1:
+                name = tag.get('hashtag_name', '')
+                hashtag_counts[name] = hashtag_counts.get(name, 0) + 1
+
+    short_videos = len([v for v in videos if v.get('video', {}).get('duration', 0) < 30])
+    medium_videos = len([v for v in videos if 30 <= v.get('video', {}).get('duration', 0) < 60])
+    long_videos = len([v for v in videos if v.get('video', {}).get('duration', 0) >= 60])
+    return (total_likes, total_comments, total_shares, total_plays, len(durations),
+            len(engagement_rates), sorted_videos[:5], short_videos, medium_videos, long_videos)
+
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:6.2f}s  {count / elapsed:>12,.0f} 条/秒")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频统计性能基准")
+    parser.add_argument("--count", type=int, default=1_000_000, help="合成视频数量 (默认: 1000000)")
+    args = parser.parse_args()
+
+    print(f"生成 {args.count:,} 个合成视频...")
+    videos = make_videos(args.count)
+
+    timed("旧实现", lambda: legacy_analyze(videos), args.count)
+    streamed = timed("流式聚合器", lambda: VideoAggregator().consume(videos).snapshot(), args.count)
+    if not numpy_available():
+        print("未安装numpy，跳过向量化实现: pip install twitter-client[analysis]")
+        return
+
+    vectorized = timed("NumPy向量化", lambda: analyze_videos(videos, use_numpy=True), args.count)
+    assert streamed["statistics"]["total_likes"] == vectorized["statistics"]["total_likes"]
+    assert streamed["hot_videos"] == vectorized["hot_videos"]
+
+    # DouyinAnalyzer.analyze_user 的路径：单用户统计同时合并进全局聚合器
+    overall = VideoAggregator()
+    timed("向量化+全局聚合", lambda: analyze_videos(videos, use_numpy=True, aggregator=overall), args.count)
+    assert overall.snapshot()["hot_videos"] == streamed["hot_videos"]
+    print(f"点赞P90: 草图 {streamed['percentiles']['likes']['p90']:,} / 精确 {vectorized['percentiles']['likes']['p90']:,}")
+
+
+if __name__ == "__main__":
+    main()
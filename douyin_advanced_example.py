@@ -5,8 +5,6 @@
 """
 
 import asyncio
-import json
-import csv
 import os
 import sys
 from pathlib import Path
@@ -18,6 +16,14 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from src.douyin_client import DouyinClient, DouyinConfigManager
+from src.social_common import CorpusNormalizer
+from src.social_common.aggregators import VideoAggregator
+from src.social_common.leaderboard import Leaderboard, merge_leaderboards
+from src.social_common.near_duplicates import NearDuplicateIndex
+from src.social_common.vectorized import analyze_videos
+from src.social_common.segmentation import KeywordAggregator, Segmenter
+from src.social_common.storage import VIDEO
+from src.social_common.exporters import export_json, aexport_json, export_csv, aexport_csv, amap
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -26,10 +32,35 @@ load_dotenv()
 class DouyinAnalyzer:
     """抖音数据分析器"""
     
-    def __init__(self, client: DouyinClient):
+    CSV_HEADERS = [
+        '视频ID', '标题', '作者', '点赞数', '评论数', '分享数', '播放数',
+        '视频时长', '创建时间', '链接'
+    ]
+    
+    def __init__(
+        self,
+        client: DouyinClient,
+        retain_videos: bool = True,
+        near_duplicates: NearDuplicateIndex = None,
+        leaderboard_size: int = 100,
+        leaderboard_score: str = "likes"
+    ):
         self.client = client
+        # 跨用户跳过描述近似重复的视频（搬运、重复上传），避免重复计入统计
+        self.near_duplicates = near_duplicates
+        # 为False时不在内存中保留视频，导出时通过videos参数传入视频来源
+        self.retain_videos = retain_videos
         self.videos_data = []
         self.users_data = []
+        # 作者、音乐对象驻留在共享表中，videos_data只保存引用
+        self.normalizer = CorpusNormalizer()
+        # 所有已分析用户合并后的聚合结果（含分位数草图），无需保留视频
+        self.overall = VideoAggregator()
+        # 每个用户一个有界排行榜（likes、engagement_rate或velocity），全局排行由各榜归并得到
+        self.leaderboard_size = leaderboard_size
+        self.leaderboard_score = leaderboard_score
+        self.leaderboard_now = datetime.now().timestamp()
+        self.user_leaderboards: Dict[str, Leaderboard] = {}
     
     async def analyze_user(self, user_id: str, max_videos: int = 50) -> Dict[str, Any]:
         """
@@ -52,12 +83,15 @@ class DouyinAnalyzer:
             
             # 获取用户视频
             videos = await self.client.fetch_user_videos(user_id, max_videos=max_videos)
+            if videos and self.near_duplicates is not None:
+                videos = list(self.near_duplicates.filter_new(VIDEO, videos))
             
             if not videos:
                 return {"error": "无法获取用户视频"}
             
-            # 分析视频数据
+            # 单用户统计按列向量化计算，同一批列生成的部分结果直接合并进全局统计
             analysis = self._analyze_videos(videos)
+            self.user_leaderboards[user_id] = self._new_leaderboard().consume(videos)
             analysis.update({
                 "user_profile": {
                     "nickname": profile.get('nickname', 'N/A'),
@@ -73,7 +107,8 @@ class DouyinAnalyzer:
             
             # 保存数据
             self.users_data.append(analysis)
-            self.videos_data.extend(videos)
+            if self.retain_videos:
+                self.videos_data.extend(self.normalizer.normalize(videos))
             
             return analysis
             
@@ -82,140 +117,247 @@ class DouyinAnalyzer:
             return {"error": str(e)}
     
     def _analyze_videos(self, videos: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """分析视频数据"""
-        if not videos:
-            return {}
-        
-        # 基础统计
-        total_likes = sum(v.get('statistics', {}).get('digg_count', 0) for v in videos)
-        total_comments = sum(v.get('statistics', {}).get('comment_count', 0) for v in videos)
-        total_shares = sum(v.get('statistics', {}).get('share_count', 0) for v in videos)
-        total_plays = sum(v.get('statistics', {}).get('play_count', 0) for v in videos)
-        
-        durations = [v.get('video', {}).get('duration', 0) for v in videos if v.get('video', {}).get('duration', 0) > 0]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        
-        # 互动率计算
-        engagement_rates = []
-        for video in videos:
-            stats = video.get('statistics', {})
-            plays = stats.get('play_count', 0)
-            if plays > 0:
-                engagement = (stats.get('digg_count', 0) + stats.get('comment_count', 0) + stats.get('share_count', 0)) / plays
-                engagement_rates.append(engagement)
-        
-        avg_engagement_rate = sum(engagement_rates) / len(engagement_rates) if engagement_rates else 0
-        
-        # 热门视频（点赞数前10%）
-        sorted_videos = sorted(videos, key=lambda x: x.get('statistics', {}).get('digg_count', 0), reverse=True)
-        top_10_percent = max(1, len(sorted_videos) // 10)
-        hot_videos = sorted_videos[:top_10_percent]
-        
-        # 话题标签分析
-        hashtags = []
-        for video in videos:
-            text_extra = video.get('text_extra', [])
-            for tag in text_extra:
-                if tag.get('type') == 1:  # 话题标签
-                    hashtags.append(tag.get('hashtag_name', ''))
-        
-        hashtag_counts = {}
-        for tag in hashtags:
-            hashtag_counts[tag] = hashtag_counts.get(tag, 0) + 1
-        
-        top_hashtags = sorted(hashtag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        """分析视频数据并计入全局统计（已安装numpy时按列向量化计算，否则逐条聚合）"""
+        return analyze_videos(videos, aggregator=self.overall)
+    
+    async def analyze_stream(self, user_id: str, max_videos: int = 1000) -> Dict[str, Any]:
+        """
+        流式分析用户视频，逐条聚合，内存占用与视频数量无关
         
-        return {
-            "total_videos": len(videos),
-            "statistics": {
-                "total_likes": total_likes,
-                "total_comments": total_comments,
-                "total_shares": total_shares,
-                "total_plays": total_plays,
-                "avg_likes": total_likes / len(videos),
-                "avg_comments": total_comments / len(videos),
-                "avg_shares": total_shares / len(videos),
-                "avg_plays": total_plays / len(videos),
-                "avg_duration": avg_duration,
-                "avg_engagement_rate": avg_engagement_rate,
-            },
-            "hot_videos": [
-                {
-                    "aweme_id": v.get('aweme_id'),
-                    "desc": v.get('desc', '')[:100],
-                    "digg_count": v.get('statistics', {}).get('digg_count', 0),
-                    "comment_count": v.get('statistics', {}).get('comment_count', 0),
-                    "play_count": v.get('statistics', {}).get('play_count', 0),
-                }
-                for v in hot_videos[:5]  # 前5个热门视频
-            ],
-            "top_hashtags": top_hashtags,
-            "content_analysis": {
-                "short_videos": len([v for v in videos if v.get('video', {}).get('duration', 0) < 30]),
-                "medium_videos": len([v for v in videos if 30 <= v.get('video', {}).get('duration', 0) < 60]),
-                "long_videos": len([v for v in videos if v.get('video', {}).get('duration', 0) >= 60]),
-            }
-        }
+        Args:
+            user_id: 用户ID
+            max_videos: 最大分析视频数
+            
+        Returns:
+            视频分析结果
+        """
+        aggregator = VideoAggregator()
+        leaderboard = self._new_leaderboard()
+        async for video in self.client.fetch_user_videos_stream(
+            user_id,
+            max_videos=max_videos,
+            dedupe=self.near_duplicates
+        ):
+            aggregator.add(video)
+            leaderboard.add(video)
+        self.overall.merge(aggregator)
+        self.user_leaderboards[user_id] = leaderboard
+        return aggregator.snapshot()
     
-    def export_to_json(self, filename: str = None):
-        """导出数据到JSON文件"""
-        if filename is None:
-            filename = f"douyin_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    def _new_leaderboard(self) -> Leaderboard:
+        # 所有用户的排行榜使用相同的增速参考时间，得分才能互相比较
+        return Leaderboard(self.leaderboard_size, self.leaderboard_score, now=self.leaderboard_now)
+    
+    def global_leaderboard(self, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        所有已分析用户的热门视频排行（多路归并各用户的排行榜）
         
-        data = {
+        Args:
+            limit: 返回的视频数量，默认为排行榜大小
+            
+        Returns:
+            按得分降序排列的视频列表，每项含 rank 和 score
+        """
+        return merge_leaderboards(self.user_leaderboards.values(), limit or self.leaderboard_size)
+    
+    def overall_summary(self) -> Dict[str, Any]:
+        """所有已分析用户的合并统计，包括各指标分位数和全局热门阈值"""
+        return self.overall.snapshot()
+    
+    def trending_hashtags(self, limit: int = 10, window: float = None) -> List[Dict[str, Any]]:
+        """
+        所有已分析视频中上升最快的话题（按视频发布时间计算，内存占用固定）
+        
+        Args:
+            limit: 返回的话题数量
+            window: 比较的时间长度（秒），默认为12小时
+            
+        Returns:
+            元素含 hashtag、count、previous、growth 的列表
+        """
+        return self.overall.trending_hashtags(limit, window)
+    
+    def analyze_keywords(self, limit: int = 20, wordcloud_path: str = None, font_path: str = None, videos=None):
+        """
+        对视频描述做中文分词并统计关键词（需要jieba，生成词云需要wordcloud）
+        
+        Args:
+            limit: 返回的关键词数量
+            wordcloud_path: 词云图片输出路径，为None时不生成
+            font_path: 中文字体路径（词云显示中文需要）
+            videos: 视频来源，默认为已保留的视频
+            
+        Returns:
+            (关键词, 次数) 列表
+        """
+        if videos is None:
+            videos = self.videos_data
+        # 分词在进程池中并行执行，重复的描述只分词一次
+        with Segmenter() as segmenter:
+            keywords = KeywordAggregator(VIDEO, segmenter).consume(videos)
+        if wordcloud_path and keywords.count:
+            keywords.wordcloud(wordcloud_path, font_path=font_path)
+        return keywords.top(limit)
+    
+    def _json_header(self) -> Dict[str, Any]:
+        return {
             "export_time": datetime.now().isoformat(),
+            "users_analysis": self.users_data,
+        }
+    
+    def _json_footer(self, video_count: int) -> Dict[str, Any]:
+        # 视频总数和共享表在所有视频写完后才确定
+        footer = {
             "summary": {
                 "users_analyzed": len(self.users_data),
-                "total_videos": len(self.videos_data),
+                "total_videos": video_count,
+                "percentiles": self.overall.percentiles(),
+                "hot_like_threshold": self.overall.hot_threshold(),
+                "trending_hashtags": self.trending_hashtags(),
+                "leaderboard": self.global_leaderboard(),
             },
-            "users_analysis": self.users_data,
-            "raw_videos": self.videos_data[:100]  # 只保存前100个视频的原始数据
         }
+        # raw_videos中的author_id/music_id引用以下共享表
+        footer.update(self.normalizer.tables())
+        return footer
+    
+    def _csv_row(self, video: Dict[str, Any]) -> List[Any]:
+        formatted = self.client.format_video(self.normalizer.denormalize_item(video))
+        return [
+            formatted.get('aweme_id', ''),
+            formatted.get('desc', ''),
+            formatted.get('author', {}).get('nickname', ''),
+            formatted.get('statistics', {}).get('digg_count', 0),
+            formatted.get('statistics', {}).get('comment_count', 0),
+            formatted.get('statistics', {}).get('share_count', 0),
+            formatted.get('statistics', {}).get('play_count', 0),
+            formatted.get('video', {}).get('duration', 0),
+            formatted.get('create_time', 0),
+            formatted.get('url', ''),
+        ]
+    
+    def export_to_json(self, filename: str = None, compress: str = None, videos=None):
+        """
+        导出数据到JSON文件，逐个写出视频，不截断
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        Args:
+            filename: 输出文件名，以.gz/.zst结尾或指定compress时流式压缩
+            compress: 压缩格式
+            videos: 视频的可迭代对象（如生成器），默认导出已保留的视频
+        """
+        if filename is None:
+            filename = f"douyin_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        if videos is None:
+            items = iter(self.videos_data)
+        else:
+            items = (self.normalizer.normalize_item(video) for video in videos)
+        
+        export_json(
+            filename,
+            items,
+            items_key="raw_videos",
+            header=self._json_header(),
+            footer=self._json_footer,
+            compress=compress
+        )
         
         print(f"📄 数据已导出到: {filename}")
         return filename
     
-    def export_to_csv(self, filename: str = None):
-        """导出视频数据到CSV文件"""
+    async def aexport_to_json(self, videos, filename: str = None, compress: str = None):
+        """
+        从异步视频流导出数据到JSON文件（如 client.fetch_user_videos_stream）
+        
+        Args:
+            videos: 视频的同步或异步可迭代对象
+            filename: 输出文件名
+            compress: 压缩格式
+        """
+        if filename is None:
+            filename = f"douyin_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        await aexport_json(
+            filename,
+            amap(self.normalizer.normalize_item, videos),
+            items_key="raw_videos",
+            header=self._json_header(),
+            footer=self._json_footer,
+            compress=compress
+        )
+        
+        print(f"📄 数据已导出到: {filename}")
+        return filename
+    
+    def export_to_csv(self, filename: str = None, compress: str = None, videos=None):
+        """
+        导出视频数据到CSV文件，逐行写出
+        
+        Args:
+            filename: 输出文件名，以.gz/.zst结尾或指定compress时流式压缩
+            compress: 压缩格式
+            videos: 视频的可迭代对象（如生成器），默认导出已保留的视频
+        """
+        if filename is None:
+            filename = f"douyin_videos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        if videos is None:
+            if not self.videos_data:
+                print("❌ 没有视频数据可导出")
+                return
+            videos = self.videos_data
+        
+        export_csv(
+            filename,
+            (self._csv_row(video) for video in videos),
+            self.CSV_HEADERS,
+            compress=compress
+        )
+        
+        print(f"📊 CSV数据已导出到: {filename}")
+        return filename
+    
+    async def aexport_to_csv(self, videos, filename: str = None, compress: str = None):
+        """
+        从异步视频流导出视频数据到CSV文件
+        
+        Args:
+            videos: 视频的同步或异步可迭代对象
+            filename: 输出文件名
+            compress: 压缩格式
+        """
         if filename is None:
             filename = f"douyin_videos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
+        await aexport_csv(
+            filename,
+            amap(self._csv_row, videos),
+            self.CSV_HEADERS,
+            compress=compress
+        )
+        
+        print(f"📊 CSV数据已导出到: {filename}")
+        return filename
+    
+    def export_to_parquet(self, directory: str = None):
+        """导出视频数据为按用户和日期分区的Parquet数据集"""
+        from src.social_common.columnar import export_videos_parquet
+        
+        if directory is None:
+            directory = f"douyin_videos_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
         if not self.videos_data:
             print("❌ 没有视频数据可导出")
             return
         
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # 写入表头
-            headers = [
-                '视频ID', '标题', '作者', '点赞数', '评论数', '分享数', '播放数',
-                '视频时长', '创建时间', '链接'
-            ]
-            writer.writerow(headers)
-            
-            # 写入数据
-            for video in self.videos_data:
-                formatted = self.client.format_video(video)
-                row = [
-                    formatted.get('aweme_id', ''),
-                    formatted.get('desc', ''),
-                    formatted.get('author', {}).get('nickname', ''),
-                    formatted.get('statistics', {}).get('digg_count', 0),
-                    formatted.get('statistics', {}).get('comment_count', 0),
-                    formatted.get('statistics', {}).get('share_count', 0),
-                    formatted.get('statistics', {}).get('play_count', 0),
-                    formatted.get('video', {}).get('duration', 0),
-                    formatted.get('create_time', 0),
-                    formatted.get('url', ''),
-                ]
-                writer.writerow(row)
+        formatted = [
+            self.client.format_video(self.normalizer.denormalize_item(video))
+            for video in self.videos_data
+        ]
+        export_videos_parquet(formatted, directory)
         
-        print(f"📊 CSV数据已导出到: {filename}")
-        return filename
+        print(f"🗂️ Parquet数据已导出到: {directory}")
+        return directory
 
 async def demo_user_analysis():
     """演示用户分析功能"""
@@ -269,6 +411,11 @@ async def demo_user_analysis():
             print(f"平均时长: {stats.get('avg_duration', 0):.1f}秒")
             print(f"平均互动率: {stats.get('avg_engagement_rate', 0):.2%}")
             
+            likes = analysis.get('percentiles', {}).get('likes', {})
+            if likes.get('p50') is not None:
+                print(f"点赞分位数: P50 {likes['p50']:,.0f} | P90 {likes['p90']:,.0f} | P99 {likes['p99']:,.0f}")
+                print(f"热门阈值 (前10%): {analysis.get('hot_like_threshold', 0):,.0f} 赞")
+            
             # 显示热门视频
             hot_videos = analysis.get('hot_videos', [])
             if hot_videos:
@@ -283,6 +430,25 @@ async def demo_user_analysis():
                 print(f"\n#️⃣ 热门话题:")
                 for tag, count in top_hashtags[:5]:
                     print(f"   #{tag}: {count}次")
+            
+            # 显示描述中的关键词（需要jieba）
+            try:
+                keywords = analyzer.analyze_keywords(limit=5)
+            except ImportError as e:
+                print(f"\nℹ️ 跳过关键词分析: {e}")
+            else:
+                if keywords:
+                    print("\n🔤 描述关键词:")
+                    for word, count in keywords:
+                        print(f"   {word}: {count}次")
+        
+        # 所有已分析用户的热门视频排行
+        leaderboard = analyzer.global_leaderboard(limit=5)
+        if leaderboard:
+            print(f"\n🏆 热门视频排行 (按{analyzer.leaderboard_score}):")
+            for video in leaderboard:
+                print(f"{video['rank']}. {video['desc'][:50]}... @{video['author']}")
+                print(f"   点赞: {video['digg_count']:,} | 得分: {video['score']:,.2f}")
         
         # 导出数据
         print(f"\n💾 导出分析数据...")
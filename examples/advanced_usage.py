@@ -14,6 +14,7 @@ from datetime import datetime, timezone
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from twitter_client import TwitterClient, ConfigManager
+from social_common.aggregators import TweetAggregator
 
 # 设置日志
 logging.basicConfig(
@@ -34,70 +35,20 @@ class TwitterAnalyzer:
         if not tweets:
             return {"error": "没有推文数据"}
         
-        analysis = {
-            "total_tweets": len(tweets),
-            "total_likes": 0,
-            "total_retweets": 0,
-            "total_replies": 0,
-            "avg_text_length": 0,
-            "most_liked_tweet": None,
-            "most_retweeted_tweet": None,
-            "hashtags": {},
-            "urls": []
-        }
-        
-        text_lengths = []
-        max_likes = 0
-        max_retweets = 0
-        
-        for tweet in tweets:
-            formatted = self.client.format_tweet(tweet)
-            
-            # 统计互动数据
-            metrics = formatted.get('public_metrics', {})
-            likes = metrics.get('like_count', 0)
-            retweets = metrics.get('retweet_count', 0)
-            replies = metrics.get('reply_count', 0)
-            
-            analysis["total_likes"] += likes
-            analysis["total_retweets"] += retweets
-            analysis["total_replies"] += replies
-            
-            # 找出最热推文
-            if likes > max_likes:
-                max_likes = likes
-                analysis["most_liked_tweet"] = {
-                    "text": formatted.get('text', '')[:100] + "...",
-                    "likes": likes
-                }
-            
-            if retweets > max_retweets:
-                max_retweets = retweets
-                analysis["most_retweeted_tweet"] = {
-                    "text": formatted.get('text', '')[:100] + "...",
-                    "retweets": retweets
-                }
-            
-            # 统计文本长度
-            text = formatted.get('text', '')
-            text_lengths.append(len(text))
-            
-            # 提取话题标签
-            words = text.split()
-            for word in words:
-                if word.startswith('#'):
-                    hashtag = word.lower()
-                    analysis["hashtags"][hashtag] = analysis["hashtags"].get(hashtag, 0) + 1
-            
-            # 收集URLs
-            urls = formatted.get('urls', [])
-            analysis["urls"].extend(urls)
-        
-        # 计算平均文本长度
-        if text_lengths:
-            analysis["avg_text_length"] = sum(text_lengths) / len(text_lengths)
-        
-        return analysis
+        return TweetAggregator(self.client.format_tweet).consume(tweets).snapshot()
+    
+    async def analyze_stream(self, user_id, max_tweets=1000):
+        """流式分析用户推文，逐条聚合，内存占用与推文数量无关"""
+        aggregator = TweetAggregator(self.client.format_tweet)
+        await aggregator.aconsume(self.client.fetch_user_tweets_stream(user_id=user_id, max_tweets=max_tweets))
+        if not aggregator.count:
+            return {"error": "没有推文数据"}
+        return aggregator.snapshot()
+    
+    def trending_hashtags(self, tweets, limit=10, window=None):
+        """按发布时间计算上升最快的话题，话题计数内存占用固定"""
+        aggregator = TweetAggregator(self.client.format_tweet).consume(tweets)
+        return aggregator.trending_hashtags(limit, window)
 
 
 async def batch_user_analysis():
@@ -14,6 +14,8 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from twitter_client import TwitterClient, ConfigManager
+from twitter_client.compare import compare_users
+from social_common.entities import extract_hashtags
 
 def print_separator(title):
     """打印分隔线"""
@@ -83,12 +85,11 @@ async def example2_stream_processing():
             likes = formatted.get('public_metrics', {}).get('like_count', 0)
             total_likes += likes
             
-            # 提取话题标签
+            # 提取话题标签（支持紧跟中文的话题，如"今天#美食"）
             text = formatted.get('text', '')
-            words = text.split()
-            for word in words:
-                if word.startswith('#'):
-                    hashtags[word] = hashtags.get(word, 0) + 1
+            for tag in extract_hashtags(text):
+                hashtag = '#' + tag
+                hashtags[hashtag] = hashtags.get(hashtag, 0) + 1
             
             print(f"📨 推文 {tweet_count}: {text[:50]}... (❤️{likes})")
             
@@ -120,72 +121,15 @@ async def example3_data_analysis():
         # 分析多个用户
         user_ids = ["25073877", "12345678"]  # 示例用户ID列表
         
-        all_analysis = {}
-        
-        for user_id in user_ids:
-            print(f"\n📊 分析用户 {user_id}...")
-            
-            tweets = await client.fetch_user_tweets(
-                user_id=user_id,
-                max_tweets=8
-            )
-            
-            if not tweets:
-                print(f"   ❌ 用户 {user_id} 没有获取到推文")
-                continue
-            
-            # 分析数据
-            analysis = {
-                "tweet_count": len(tweets),
-                "total_likes": 0,
-                "total_retweets": 0,
-                "total_replies": 0,
-                "avg_text_length": 0,
-                "most_liked": None,
-                "hashtags": {}
-            }
+        def print_user(analysis):
+            """每个用户分析完成后立即输出，无需等待其他用户"""
+            user_id = analysis["user_id"]
+            print(f"\n📊 用户 {user_id} 分析完成:")
             
-            text_lengths = []
-            max_likes = 0
+            if analysis.get("error"):
+                print(f"   ❌ 用户 {user_id} 没有获取到推文: {analysis['error']}")
+                return
             
-            for tweet in tweets:
-                formatted = client.format_tweet(tweet)
-                text = formatted.get('text', '')
-                metrics = formatted.get('public_metrics', {})
-                
-                # 统计互动数据
-                likes = metrics.get('like_count', 0)
-                retweets = metrics.get('retweet_count', 0)
-                replies = metrics.get('reply_count', 0)
-                
-                analysis["total_likes"] += likes
-                analysis["total_retweets"] += retweets
-                analysis["total_replies"] += replies
-                
-                # 记录文本长度
-                text_lengths.append(len(text))
-                
-                # 找出最热推文
-                if likes > max_likes:
-                    max_likes = likes
-                    analysis["most_liked"] = {
-                        "text": text[:60] + "...",
-                        "likes": likes
-                    }
-                
-                # 提取话题标签
-                words = text.split()
-                for word in words:
-                    if word.startswith('#'):
-                        analysis["hashtags"][word] = analysis["hashtags"].get(word, 0) + 1
-            
-            # 计算平均值
-            if text_lengths:
-                analysis["avg_text_length"] = sum(text_lengths) / len(text_lengths)
-            
-            all_analysis[user_id] = analysis
-            
-            # 输出分析结果
             print(f"   📝 推文总数: {analysis['tweet_count']}")
             print(f"   ❤️ 总点赞数: {analysis['total_likes']}")
             print(f"   🔄 总转发数: {analysis['total_retweets']}")
@@ -195,18 +139,20 @@ async def example3_data_analysis():
             if analysis["most_liked"]:
                 print(f"   🔥 最热推文: {analysis['most_liked']['text']} (❤️{analysis['most_liked']['likes']})")
             
-            if analysis["hashtags"]:
-                top_hashtags = dict(list(analysis["hashtags"].items())[:3])
-                print(f"   🏷️ 热门话题: {top_hashtags}")
+            if analysis["top_hashtags"]:
+                print(f"   🏷️ 热门话题: {dict(analysis['top_hashtags'])}")
+        
+        # 并发拉取和分析各用户，最多同时请求2个用户
+        report = await compare_users(client, user_ids, max_tweets=8, concurrency=2, on_partial=print_user)
         
         await client.close()
         
-        # 对比分析
-        if len(all_analysis) > 1:
-            print(f"\n🔍 用户对比分析:")
-            for user_id, analysis in all_analysis.items():
-                engagement_rate = (analysis["total_likes"] + analysis["total_retweets"]) / analysis["tweet_count"] if analysis["tweet_count"] > 0 else 0
-                print(f"   👤 用户 {user_id}: 互动率 {engagement_rate:.1f} (点赞+转发)/推文")
+        # 对比分析：按每条推文的平均互动排名
+        if len(report["ranking"]) > 1:
+            print("\n🔍 用户对比分析 (按平均互动排名):")
+            for analysis in report["ranking"]:
+                print(f"   {analysis['rank']}. 👤 用户 {analysis['user_id']}: "
+                      f"平均互动 {analysis['engagement_per_tweet']:.1f} (点赞+转发)/推文")
         
     except Exception as e:
         print(f"❌ 错误: {e}")
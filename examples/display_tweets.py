@@ -12,6 +12,9 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from twitter_client import TwitterClient, ConfigManager
+from social_common.entities import extract_hashtags
+from social_common.segmentation import KeywordAggregator
+from social_common.storage import TWEET
 
 def display_tweet_content(tweets):
     """清晰地显示推文内容"""
@@ -32,7 +35,7 @@ def display_tweet_content(tweets):
         print(f"      💬 回复: {metrics['reply_count']}")
         
         # 提取话题标签
-        hashtags = [word for word in tweet['text'].split() if word.startswith('#')]
+        hashtags = ['#' + tag for tag in extract_hashtags(tweet['text'])]
         if hashtags:
             print(f"   🏷️  话题: {', '.join(hashtags)}")
         
@@ -69,11 +72,10 @@ def analyze_content(tweets):
         total_chars += len(content)
         total_likes += tweet['public_metrics']['like_count']
         
-        # 统计话题标签
-        words = content.split()
-        for word in words:
-            if word.startswith('#'):
-                hashtags[word] = hashtags.get(word, 0) + 1
+        # 统计话题标签（支持紧跟中文的话题，如"今天#美食"）
+        for tag in extract_hashtags(content):
+            hashtag = '#' + tag
+            hashtags[hashtag] = hashtags.get(hashtag, 0) + 1
     
     print(f"📝 总字符数: {total_chars}")
     print(f"📏 平均长度: {total_chars / len(tweets):.1f} 字符/推文")
@@ -84,6 +86,17 @@ def analyze_content(tweets):
         print(f"🏷️  话题标签统计:")
         for tag, count in sorted(hashtags.items(), key=lambda x: x[1], reverse=True):
             print(f"   {tag}: {count}次")
+    
+    # 中文分词统计关键词（需要jieba）
+    try:
+        keywords = KeywordAggregator(TWEET).consume(tweets)
+    except ImportError as e:
+        print(f"ℹ️  跳过关键词统计: {e}")
+    else:
+        if keywords.keywords:
+            print("🔤 关键词统计:")
+            for word, count in keywords.top(10):
+                print(f"   {word}: {count}次")
 
 async def main():
     """主函数"""
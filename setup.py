@@ -68,10 +68,14 @@ setup(
             "numpy>=1.24.0",
             "matplotlib>=3.6.0",
             "seaborn>=0.12.0",
+            "pyarrow>=10.0.0",
         ],
         "text": [
             "jieba>=0.42.1",
             "wordcloud>=1.9.0",
+        ],
+        "compression": [
+            "zstandard>=0.19.0",
         ]
     },
     entry_points={
@@ -4,11 +4,22 @@
 """
 
 import asyncio
-import json
 from typing import Dict, List, Optional, AsyncGenerator, Any
 from datetime import datetime
 import logging
 
+try:
+    from social_common import serialization
+    from social_common.entities import extract_entities
+    from social_common.raw import build_raw_page, write_to_sink
+    from social_common.storage import VIDEO
+except ImportError:
+    # 以src.douyin_client方式导入时，公共模块位于src包内
+    from ..social_common import serialization
+    from ..social_common.entities import extract_entities
+    from ..social_common.raw import build_raw_page, write_to_sink
+    from ..social_common.storage import VIDEO
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -27,16 +38,18 @@ class DouyinClient:
     基于F2项目的DouyinHandler封装，提供简化的抖音视频拉取接口
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], handler: Optional[Any] = None):
         """
         初始化抖音客户端
         
         Args:
             config: 配置字典，包含headers、proxies、cookie等信息
+            handler: 自定义处理器（如录制/回放处理器），默认创建DouyinHandler
         """
         self.config = config
-        self.handler = None
-        self._init_handler()
+        self.handler = handler
+        if self.handler is None:
+            self._init_handler()
     
     def _init_handler(self):
         """初始化DouyinHandler"""
@@ -102,14 +115,13 @@ class DouyinClient:
                                 videos.append(raw_data)
                             elif isinstance(raw_data, str):
                                 # 如果是JSON字符串，尝试解析
-                                import json
                                 try:
-                                    parsed_data = json.loads(raw_data)
+                                    parsed_data = serialization.loads(raw_data)
                                     if isinstance(parsed_data, dict) and 'aweme_list' in parsed_data:
                                         videos.extend(parsed_data['aweme_list'])
                                     else:
                                         videos.append(parsed_data)
-                                except json.JSONDecodeError:
+                                except ValueError:
                                     logger.error("无法解析JSON数据")
                                     videos.append({"raw_data": raw_data, "type": "raw_string"})
                             else:
@@ -146,6 +158,133 @@ class DouyinClient:
         
         return videos[:max_videos]
     
+    async def fetch_user_videos_stream(
+        self,
+        user_id: str,
+        max_videos: int = 100,
+        page_size: int = 20,
+        max_cursor: str = "",
+        dedupe: Optional[Any] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        流式获取用户视频
+        
+        Args:
+            user_id: 用户ID或抖音号
+            max_videos: 最大获取视频数量
+            page_size: 每页视频数量
+            max_cursor: 分页游标
+            dedupe: 去重库（SeenStore或NearDuplicateIndex），跳过之前已输出过或描述近似重复的视频
+            
+        Yields:
+            单个视频数据
+        """
+        if not self.handler:
+            raise RuntimeError("客户端未初始化")
+        
+        video_count = 0
+        
+        try:
+            async for video_data in self.handler.fetch_user_post_videos(
+                sec_user_id=user_id,
+                max_counts=max_videos,
+                page_counts=page_size,
+                max_cursor=int(max_cursor) if max_cursor else 0
+            ):
+                page_videos = self._page_to_videos(video_data)
+                if dedupe is not None:
+                    page_videos = dedupe.filter_new(VIDEO, page_videos)
+                
+                for video in page_videos:
+                    if video_count >= max_videos:
+                        return
+                    
+                    yield video
+                    video_count += 1
+                    # 达到数量后立即返回，避免去重过滤器把未输出的下一条记为已见过
+                    if video_count >= max_videos:
+                        return
+                    
+        except Exception as e:
+            logger.error(f"流式获取用户视频失败: {e}")
+            raise
+    
+    def _page_to_videos(self, video_data: Any) -> List[Dict[str, Any]]:
+        """
+        将一页视频数据转换为视频字典列表
+        
+        Args:
+            video_data: F2处理器产出的页面对象
+            
+        Returns:
+            视频字典列表
+        """
+        video_list = video_data._to_list()
+        if isinstance(video_list, list) and all(isinstance(v, dict) for v in video_list):
+            return video_list
+        
+        # 无法按条目转换时退回原始数据中的aweme_list
+        raw_data = video_data._to_raw()
+        if isinstance(raw_data, (str, bytes)):
+            raw_data = serialization.loads(raw_data)
+        if isinstance(raw_data, dict):
+            return raw_data.get("aweme_list") or []
+        return []
+    
+    async def fetch_user_videos_raw(
+        self,
+        user_id: str,
+        max_videos: int = 100,
+        page_size: int = 20,
+        max_cursor: str = "",
+        sink: Optional[Any] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        原始透传模式获取用户视频
+        
+        跳过 _to_dict() 转换和格式化，只提取视频ID和分页游标，
+        适用于只需归档原始数据的场景
+        
+        Args:
+            user_id: 用户ID或抖音号
+            max_videos: 最大获取视频数量（按整页计，最后一页不截断）
+            page_size: 每页视频数量
+            max_cursor: 分页游标
+            sink: 输出端，提供 write(record) 方法，每页写入一次
+            
+        Yields:
+            原始页面记录，包含 user_id、cursor、has_more、ids、raw 等字段
+        """
+        if not self.handler:
+            raise RuntimeError("客户端未初始化")
+        
+        video_count = 0
+        
+        try:
+            async for video_data in self.handler.fetch_user_post_videos(
+                sec_user_id=user_id,
+                max_counts=max_videos,
+                page_counts=page_size,
+                max_cursor=int(max_cursor) if max_cursor else 0
+            ):
+                page = build_raw_page(
+                    video_data,
+                    platform="douyin",
+                    user_id=user_id,
+                    id_attrs=("aweme_id",),
+                    cursor_attrs=("max_cursor",)
+                )
+                await write_to_sink(sink, page)
+                yield page
+                
+                video_count += len(page["ids"])
+                if video_count >= max_videos:
+                    return
+                    
+        except Exception as e:
+            logger.error(f"原始模式获取用户视频失败: {e}")
+            raise
+    
     async def fetch_video_detail(self, aweme_id: str) -> Dict[str, Any]:
         """
         获取单个视频详情
@@ -262,9 +401,17 @@ class DouyinClient:
                         return None
                 return data
             
+            desc = video_data.get("desc", "") or ""
+            entities = extract_entities(desc)
+            hashtags = [
+                tag.get("hashtag_name", "") 
+                for tag in video_data.get("text_extra", []) 
+                if isinstance(tag, dict) and tag.get("type") == 1
+            ]
+            
             return {
                 "aweme_id": video_data.get("aweme_id", "unknown"),
-                "desc": video_data.get("desc", ""),
+                "desc": desc,
                 "author": {
                     "unique_id": safe_get(video_data, "author", "unique_id") or "unknown",
                     "nickname": safe_get(video_data, "author", "nickname") or "Unknown",
@@ -291,11 +438,9 @@ class DouyinClient:
                     "author": safe_get(video_data, "music", "author") or "",
                     "play_url": safe_get(video_data, "music", "play_url", "url_list", 0) or "",
                 },
-                "hashtags": [
-                    tag.get("hashtag_name", "") 
-                    for tag in video_data.get("text_extra", []) 
-                    if isinstance(tag, dict) and tag.get("type") == 1
-                ],
+                # text_extra缺失时从描述文本中提取话题
+                "hashtags": hashtags or entities["hashtags"],
+                "entities": entities,
                 "url": f"https://www.douyin.com/video/{video_data.get('aweme_id', 'unknown')}",
             }
         except Exception as e:
@@ -3,11 +3,16 @@
 """
 
 import os
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
 
+try:
+    from social_common import serialization
+except ImportError:
+    # 以src.douyin_client方式导入时，公共模块位于src包内
+    from ..social_common import serialization
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -40,7 +45,7 @@ class DouyinConfigManager:
         if self.config_path.exists():
             try:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                    config = serialization.load(f)
                 logger.info(f"配置文件加载成功: {self.config_path}")
                 return config
             except Exception as e:
@@ -120,7 +125,7 @@ class DouyinConfigManager:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+                serialization.dump(self.config, f, indent=True)
             
             logger.info(f"配置已保存到: {self.config_path}")
         except Exception as e:
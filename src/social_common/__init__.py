@@ -0,0 +1,65 @@
+"""
+社交平台客户端公共模块
+Twitter与抖音客户端共享的数据处理组件
+"""
+
+from .normalize import CorpusNormalizer, EntityTable, normalize_corpus, denormalize_corpus
+from .entities import extract_entities, extract_hashtags, normalize_hashtag
+from . import serialization
+from .compression import open_output, open_input
+from .sinks import JsonlWriter, RollingShardWriter, ThreadedSink, read_manifest, run_blocking
+from .jsonl_index import build_index, JsonlIndex
+from .storage import SQLiteArchive, ArchiveSink
+from .dedupe import SeenStore, BloomFilter
+from .near_duplicates import NearDuplicateIndex
+from .heavy_hitters import SpaceSaving, CountMinSketch, TrendingHashtags
+from .aggregators import TopK, TweetAggregator, VideoAggregator
+from .leaderboard import Leaderboard, merge_leaderboards
+from .mapreduce import analyze_corpus, plan_chunks
+from .timeseries import EngagementSeries
+from .vectorized import analyze_videos
+from .segmentation import Segmenter, KeywordAggregator
+from .replay import ResponseArchive, RecordingHandler, ReplayHandler, ReplayMiss
+
+__all__ = [
+    "CorpusNormalizer",
+    "EntityTable",
+    "normalize_corpus",
+    "denormalize_corpus",
+    "extract_entities",
+    "extract_hashtags",
+    "normalize_hashtag",
+    "serialization",
+    "open_output",
+    "open_input",
+    "JsonlWriter",
+    "RollingShardWriter",
+    "read_manifest",
+    "ThreadedSink",
+    "run_blocking",
+    "build_index",
+    "JsonlIndex",
+    "SQLiteArchive",
+    "ArchiveSink",
+    "SeenStore",
+    "BloomFilter",
+    "NearDuplicateIndex",
+    "SpaceSaving",
+    "CountMinSketch",
+    "TrendingHashtags",
+    "TopK",
+    "TweetAggregator",
+    "VideoAggregator",
+    "Leaderboard",
+    "merge_leaderboards",
+    "analyze_corpus",
+    "EngagementSeries",
+    "analyze_videos",
+    "Segmenter",
+    "KeywordAggregator",
+    "plan_chunks",
+    "ResponseArchive",
+    "RecordingHandler",
+    "ReplayHandler",
+    "ReplayMiss",
+]
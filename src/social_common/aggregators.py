@@ -0,0 +1,449 @@
+"""
+流式聚合模块
+逐条消费推文/视频，维护累计值、平均值和基于堆的Top-K，
+内存占用与条目数量无关，任意时刻都可以生成快照
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .entities import extract_hashtags, normalize_hashtag
+from .exporters import Items, aiter_items
+from .heavy_hitters import SpaceSaving, TrendingHashtags
+from .quantiles import KLLSketch
+from .timeutils import to_epoch
+
+# 视频时长分段（秒）
+SHORT_VIDEO_SECONDS = 30
+LONG_VIDEO_SECONDS = 60
+
+# 热门视频：点赞数前10%，最多展示5个
+HOT_VIDEO_RATIO = 10
+HOT_VIDEO_LIMIT = 5
+
+# 快照中的热门话题数量
+TOP_HASHTAG_LIMIT = 10
+
+# 话题计数最多跟踪的话题数，超出后计数为近似值
+HASHTAG_CAPACITY = 1000
+
+# 估计分位数的视频指标
+VIDEO_SKETCH_METRICS = ("likes", "plays", "shares", "duration", "engagement_rate")
+
+# 热门阈值：点赞数的90分位（前10%）
+HOT_QUANTILE = 1 - 1 / HOT_VIDEO_RATIO
+
+
+def video_statistics(video: Dict[str, Any]) -> Dict[str, Any]:
+    """获取视频的互动统计（缺失时为空字典）"""
+    return video.get('statistics') or {}
+
+
+def video_duration(video: Dict[str, Any]) -> float:
+    """获取视频时长（秒），缺失时为0"""
+    return (video.get('video') or {}).get('duration') or 0
+
+
+def video_engagement_rate(video: Dict[str, Any]) -> Optional[float]:
+    """
+    计算视频互动率: (点赞 + 评论 + 分享) / 播放
+
+    Returns:
+        互动率，播放数为0时返回None
+    """
+    stats = video_statistics(video)
+    plays = stats.get('play_count') or 0
+    if plays <= 0:
+        return None
+    return ((stats.get('digg_count') or 0)
+            + (stats.get('comment_count') or 0)
+            + (stats.get('share_count') or 0)) / plays
+
+
+def video_hashtags(video: Dict[str, Any]) -> List[str]:
+    """
+    获取视频话题：优先使用text_extra中的话题标签，
+    其次是format_video输出的hashtags，都缺失时从描述中提取
+    """
+    text_extra = video.get('text_extra') or []
+    tags = [tag.get('hashtag_name', '') for tag in text_extra if tag.get('type') == 1]
+    return tags or list(video.get('hashtags') or []) or extract_hashtags(video.get('desc', '') or '')
+
+
+def hot_video_count(total: int) -> int:
+    """热门视频数量：点赞数前10%（至少1个），最多5个"""
+    return min(HOT_VIDEO_LIMIT, max(1, total // HOT_VIDEO_RATIO))
+
+
+class TopK:
+    """
+    有界Top-K
+
+    用大小为k的最小堆保留得分最高的k个条目；得分相同时保留先加入的条目，
+    与对完整列表稳定降序排序后取前k个的结果一致
+    """
+
+    def __init__(self, k: int):
+        """
+        Args:
+            k: 保留的条目数量
+        """
+        self.k = k
+        self._heap: List[Tuple[Any, int, Any]] = []
+        # 用整数计数而非itertools.count，保证可以pickle后在进程间传递
+        self._added = 0
+
+    def add(self, score: Any, item: Any):
+        """
+        加入条目
+
+        Args:
+            score: 得分
+            item: 条目
+        """
+        # 以负序号作第二关键字，得分相同时先淘汰后加入的条目
+        entry = (score, -self._added, item)
+        self._added += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other: "TopK"):
+        """合并另一个Top-K（其条目视为在本Top-K所有条目之后加入）"""
+        for score, _, item in sorted(other._heap, key=lambda entry: -entry[1]):
+            self.add(score, item)
+
+    def items(self) -> List[Any]:
+        """按得分降序返回条目"""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class _StreamAggregator(ABC):
+    """流式聚合器基类：子类实现 add、merge 和 snapshot，基类提供同步和异步的批量消费"""
+
+    @abstractmethod
+    def add(self, item: Dict[str, Any]):
+        """加入一条记录"""
+
+    @abstractmethod
+    def merge(self, other: "_StreamAggregator") -> "_StreamAggregator":
+        """合并另一个同类聚合器的结果，返回聚合器自身"""
+
+    @abstractmethod
+    def snapshot(self) -> Dict[str, Any]:
+        """生成当前的聚合结果"""
+
+    def consume(self, items: Iterable[Dict[str, Any]]) -> "_StreamAggregator":
+        """
+        消费同步可迭代对象
+
+        Returns:
+            聚合器自身，便于链式调用 snapshot()
+        """
+        for item in items:
+            self.add(item)
+        return self
+
+    async def aconsume(self, items: Items) -> "_StreamAggregator":
+        """
+        消费同步或异步可迭代对象（如 fetch_user_videos_stream）
+
+        Returns:
+            聚合器自身
+        """
+        async for item in aiter_items(items):
+            self.add(item)
+        return self
+
+
+class VideoAggregator(_StreamAggregator):
+    """
+    抖音视频流式聚合器
+
+    快照结构与 DouyinAnalyzer 的视频分析结果一致，另含各指标的分位数和热门阈值
+    """
+
+    def __init__(self, sketch_k: int = 200, hashtag_capacity: int = HASHTAG_CAPACITY):
+        """
+        Args:
+            sketch_k: 分位数草图的精度参数
+            hashtag_capacity: 话题计数最多跟踪的话题数
+        """
+        self.sketches = {metric: KLLSketch(k=sketch_k) for metric in VIDEO_SKETCH_METRICS}
+        self.count = 0
+        self.total_likes = 0
+        self.total_comments = 0
+        self.total_shares = 0
+        self.total_plays = 0
+        self.duration_sum = 0
+        self.duration_count = 0
+        self.engagement_sum = 0.0
+        self.engagement_count = 0
+        self.short_videos = 0
+        self.medium_videos = 0
+        self.long_videos = 0
+        self.hashtag_counts = SpaceSaving(hashtag_capacity)
+        self.trending = TrendingHashtags()
+        self.hot_videos = TopK(HOT_VIDEO_LIMIT)
+
+    def add(self, video: Dict[str, Any]):
+        """加入一个视频"""
+        stats = video_statistics(video)
+        likes = stats.get('digg_count') or 0
+        shares = stats.get('share_count') or 0
+        plays = stats.get('play_count') or 0
+
+        self.count += 1
+        self.total_likes += likes
+        self.total_comments += stats.get('comment_count') or 0
+        self.total_shares += shares
+        self.total_plays += plays
+        self.sketches["likes"].update(likes)
+        self.sketches["shares"].update(shares)
+        self.sketches["plays"].update(plays)
+
+        duration = video_duration(video)
+        if duration > 0:
+            self.duration_sum += duration
+            self.duration_count += 1
+            self.sketches["duration"].update(duration)
+        if duration < SHORT_VIDEO_SECONDS:
+            self.short_videos += 1
+        elif duration < LONG_VIDEO_SECONDS:
+            self.medium_videos += 1
+        else:
+            self.long_videos += 1
+
+        engagement = video_engagement_rate(video)
+        if engagement is not None:
+            self.engagement_sum += engagement
+            self.engagement_count += 1
+            self.sketches["engagement_rate"].update(engagement)
+
+        tags = video_hashtags(video)
+        if tags:
+            created = to_epoch(video.get('create_time'))
+            for tag in tags:
+                self.hashtag_counts.add(tag)
+                if created is not None:
+                    self.trending.add(tag, created)
+
+        # 只保留热门视频展示所需的字段
+        self.hot_videos.add(likes, {
+            "aweme_id": video.get('aweme_id'),
+            "desc": (video.get('desc', '') or '')[:100],
+            "digg_count": likes,
+            "comment_count": stats.get('comment_count', 0),
+            "play_count": stats.get('play_count', 0),
+        })
+
+    def trending_hashtags(self, n: int = 10, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        按记录时间计算上升最快的话题
+
+        Args:
+            n: 数量
+            window: 比较的时间长度（秒），默认为12小时
+
+        Returns:
+            元素含 hashtag、count、previous、growth 的列表
+        """
+        return self.trending.trending(n, window)
+
+    def merge(self, other: "VideoAggregator") -> "VideoAggregator":
+        """合并另一个聚合器的结果（用于分片并行聚合）"""
+        self.count += other.count
+        self.total_likes += other.total_likes
+        self.total_comments += other.total_comments
+        self.total_shares += other.total_shares
+        self.total_plays += other.total_plays
+        self.duration_sum += other.duration_sum
+        self.duration_count += other.duration_count
+        self.engagement_sum += other.engagement_sum
+        self.engagement_count += other.engagement_count
+        self.short_videos += other.short_videos
+        self.medium_videos += other.medium_videos
+        self.long_videos += other.long_videos
+        self.hashtag_counts.merge(other.hashtag_counts)
+        self.trending.merge(other.trending)
+        self.hot_videos.merge(other.hot_videos)
+        for metric, sketch in other.sketches.items():
+            self.sketches[metric].merge(sketch)
+        return self
+
+    def percentiles(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """各指标的分位数摘要（min、p50、p90、p99、max）"""
+        return {metric: sketch.summary() for metric, sketch in self.sketches.items()}
+
+    def hot_threshold(self) -> Optional[float]:
+        """热门阈值：点赞数不低于该值的视频约占前10%"""
+        return self.sketches["likes"].quantile(HOT_QUANTILE)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成当前的分析结果
+
+        Returns:
+            分析结果，尚未加入视频时返回空字典
+        """
+        if not self.count:
+            return {}
+
+        top_hashtags = self.hashtag_counts.top(TOP_HASHTAG_LIMIT)
+
+        return {
+            "total_videos": self.count,
+            "statistics": {
+                "total_likes": self.total_likes,
+                "total_comments": self.total_comments,
+                "total_shares": self.total_shares,
+                "total_plays": self.total_plays,
+                "avg_likes": self.total_likes / self.count,
+                "avg_comments": self.total_comments / self.count,
+                "avg_shares": self.total_shares / self.count,
+                "avg_plays": self.total_plays / self.count,
+                "avg_duration": self.duration_sum / self.duration_count if self.duration_count else 0,
+                "avg_engagement_rate": self.engagement_sum / self.engagement_count if self.engagement_count else 0,
+            },
+            "hot_videos": self.hot_videos.items()[:hot_video_count(self.count)],
+            "top_hashtags": top_hashtags,
+            "content_analysis": {
+                "short_videos": self.short_videos,
+                "medium_videos": self.medium_videos,
+                "long_videos": self.long_videos,
+            },
+            "percentiles": self.percentiles(),
+            "hot_like_threshold": self.hot_threshold(),
+        }
+
+
+class TweetAggregator(_StreamAggregator):
+    """
+    推文流式聚合器
+
+    快照结构与 TwitterAnalyzer 的推文分析结果一致；
+    URL只保留前 max_urls 个样本，另计总数
+    """
+
+    def __init__(
+        self,
+        formatter: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        max_urls: int = 100,
+        hashtag_capacity: int = HASHTAG_CAPACITY
+    ):
+        """
+        Args:
+            formatter: 推文格式化函数（如 TwitterClient.format_tweet），为None时视为已格式化
+            max_urls: 保留的URL样本数量
+            hashtag_capacity: 话题计数最多跟踪的话题数
+        """
+        self.formatter = formatter
+        self.max_urls = max_urls
+        self.count = 0
+        self.total_likes = 0
+        self.total_retweets = 0
+        self.total_replies = 0
+        self.text_length_sum = 0
+        self.most_liked_tweet: Optional[Dict[str, Any]] = None
+        self.most_retweeted_tweet: Optional[Dict[str, Any]] = None
+        self.hashtags = SpaceSaving(hashtag_capacity)
+        self.trending = TrendingHashtags()
+        self.url_count = 0
+        self.urls: List[Any] = []
+        self._max_likes = 0
+        self._max_retweets = 0
+
+    def add(self, tweet: Dict[str, Any]):
+        """加入一条推文"""
+        formatted = self.formatter(tweet) if self.formatter else tweet
+
+        metrics = formatted.get('public_metrics', {})
+        likes = metrics.get('like_count', 0)
+        retweets = metrics.get('retweet_count', 0)
+        text = formatted.get('text', '')
+
+        self.count += 1
+        self.total_likes += likes
+        self.total_retweets += retweets
+        self.total_replies += metrics.get('reply_count', 0)
+        self.text_length_sum += len(text)
+
+        if likes > self._max_likes:
+            self._max_likes = likes
+            self.most_liked_tweet = {"text": text[:100] + "...", "likes": likes}
+        if retweets > self._max_retweets:
+            self._max_retweets = retweets
+            self.most_retweeted_tweet = {"text": text[:100] + "...", "retweets": retweets}
+
+        tags = formatted.get('entities', {}).get('hashtags', [])
+        if tags:
+            created = to_epoch(formatted.get('created_at'))
+            for tag in tags:
+                hashtag = '#' + normalize_hashtag(tag)
+                self.hashtags.add(hashtag)
+                if created is not None:
+                    self.trending.add(hashtag, created)
+
+        urls = formatted.get('urls', [])
+        self.url_count += len(urls)
+        if len(self.urls) < self.max_urls:
+            self.urls.extend(urls[:self.max_urls - len(self.urls)])
+
+    def trending_hashtags(self, n: int = 10, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        按记录时间计算上升最快的话题
+
+        Args:
+            n: 数量
+            window: 比较的时间长度（秒），默认为12小时
+
+        Returns:
+            元素含 hashtag、count、previous、growth 的列表
+        """
+        return self.trending.trending(n, window)
+
+    def merge(self, other: "TweetAggregator") -> "TweetAggregator":
+        """合并另一个聚合器的结果（用于分片并行聚合）"""
+        self.count += other.count
+        self.total_likes += other.total_likes
+        self.total_retweets += other.total_retweets
+        self.total_replies += other.total_replies
+        self.text_length_sum += other.text_length_sum
+        # 与逐条聚合一致：数值相同时保留先出现的推文
+        if other._max_likes > self._max_likes:
+            self._max_likes = other._max_likes
+            self.most_liked_tweet = other.most_liked_tweet
+        if other._max_retweets > self._max_retweets:
+            self._max_retweets = other._max_retweets
+            self.most_retweeted_tweet = other.most_retweeted_tweet
+        self.hashtags.merge(other.hashtags)
+        self.trending.merge(other.trending)
+        self.url_count += other.url_count
+        if len(self.urls) < self.max_urls:
+            self.urls.extend(other.urls[:self.max_urls - len(self.urls)])
+        return self
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成当前的分析结果
+
+        Returns:
+            分析结果
+        """
+        return {
+            "total_tweets": self.count,
+            "total_likes": self.total_likes,
+            "total_retweets": self.total_retweets,
+            "total_replies": self.total_replies,
+            "avg_text_length": self.text_length_sum / self.count if self.count else 0,
+            "most_liked_tweet": self.most_liked_tweet,
+            "most_retweeted_tweet": self.most_retweeted_tweet,
+            "hashtags": self.hashtags.as_dict(),
+            "url_count": self.url_count,
+            "urls": list(self.urls),
+        }
@@ -0,0 +1,343 @@
+"""
+列式导出模块
+将格式化后的推文/视频按类型化的列写入Parquet，并按用户和日期分区
+
+依赖analysis扩展: pip install twitter-client[analysis]
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .timeutils import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+DEFAULT_PARTITION_COLS = ("user_id", "date")
+
+# 列名 -> pandas类型
+TWEET_SCHEMA = {
+    "user_id": "string",
+    "date": "string",
+    "id": "string",
+    "author": "string",
+    "created_at": "datetime64[ns, UTC]",
+    "text": "string",
+    "like_count": "Int64",
+    "retweet_count": "Int64",
+    "reply_count": "Int64",
+    "quote_count": "Int64",
+    "hashtags": "object",
+    "mentions": "object",
+    "urls": "object",
+}
+
+VIDEO_SCHEMA = {
+    "user_id": "string",
+    "date": "string",
+    "aweme_id": "string",
+    "author_unique_id": "string",
+    "author_nickname": "string",
+    "create_time": "datetime64[ns, UTC]",
+    "desc": "string",
+    "digg_count": "Int64",
+    "comment_count": "Int64",
+    "share_count": "Int64",
+    "play_count": "Int64",
+    "duration": "Int64",
+    "width": "Int64",
+    "height": "Int64",
+    "music_title": "string",
+    "hashtags": "object",
+    "url": "string",
+}
+
+
+def _require_pandas():
+    if pd is None:
+        raise ImportError("列式导出需要pandas和pyarrow，请安装: pip install twitter-client[analysis]")
+
+
+def _date_partition(created) -> str:
+    return created.strftime("%Y-%m-%d") if created else "unknown"
+
+
+def _build_frame(columns: Dict[str, List[Any]], schema: Dict[str, str]):
+    frame = pd.DataFrame(columns, columns=list(schema))
+    for name, dtype in schema.items():
+        if dtype.startswith("datetime64"):
+            frame[name] = pd.to_datetime(frame[name], utc=True)
+        elif dtype != "object":
+            frame[name] = frame[name].astype(dtype)
+    return frame
+
+
+def tweets_to_frame(tweets: Iterable[Dict[str, Any]], user_id: Optional[str] = None):
+    """
+    将格式化后的推文转换为DataFrame
+
+    Args:
+        tweets: format_tweet 输出的推文
+        user_id: 分区用的用户ID，默认使用推文作者
+
+    Returns:
+        按 TWEET_SCHEMA 类型化的DataFrame
+    """
+    _require_pandas()
+
+    columns: Dict[str, List[Any]] = {name: [] for name in TWEET_SCHEMA}
+    for tweet in tweets:
+        created = parse_timestamp(tweet.get("created_at"))
+        metrics = tweet.get("public_metrics") or {}
+        entities = tweet.get("entities") or {}
+
+        columns["user_id"].append(str(user_id or tweet.get("user_id") or tweet.get("author") or "unknown"))
+        columns["date"].append(_date_partition(created))
+        columns["id"].append(str(tweet.get("id", "")))
+        columns["author"].append(tweet.get("author", ""))
+        columns["created_at"].append(created)
+        columns["text"].append(tweet.get("text", ""))
+        columns["like_count"].append(metrics.get("like_count"))
+        columns["retweet_count"].append(metrics.get("retweet_count"))
+        columns["reply_count"].append(metrics.get("reply_count"))
+        columns["quote_count"].append(metrics.get("quote_count"))
+        columns["hashtags"].append(list(entities.get("hashtags", [])))
+        columns["mentions"].append(list(entities.get("mentions", [])))
+        columns["urls"].append(list(entities.get("urls", [])))
+
+    return _build_frame(columns, TWEET_SCHEMA)
+
+
+def videos_to_frame(videos: Iterable[Dict[str, Any]], user_id: Optional[str] = None):
+    """
+    将格式化后的视频转换为DataFrame
+
+    Args:
+        videos: format_video 输出的视频
+        user_id: 分区用的用户ID，默认使用作者抖音号
+
+    Returns:
+        按 VIDEO_SCHEMA 类型化的DataFrame
+    """
+    _require_pandas()
+
+    columns: Dict[str, List[Any]] = {name: [] for name in VIDEO_SCHEMA}
+    for video in videos:
+        created = parse_timestamp(video.get("create_time"))
+        author = video.get("author") or {}
+        stats = video.get("statistics") or {}
+        info = video.get("video") or {}
+
+        columns["user_id"].append(str(user_id or author.get("unique_id") or "unknown"))
+        columns["date"].append(_date_partition(created))
+        columns["aweme_id"].append(str(video.get("aweme_id", "")))
+        columns["author_unique_id"].append(author.get("unique_id", ""))
+        columns["author_nickname"].append(author.get("nickname", ""))
+        columns["create_time"].append(created)
+        columns["desc"].append(video.get("desc", ""))
+        columns["digg_count"].append(stats.get("digg_count"))
+        columns["comment_count"].append(stats.get("comment_count"))
+        columns["share_count"].append(stats.get("share_count"))
+        columns["play_count"].append(stats.get("play_count"))
+        columns["duration"].append(info.get("duration"))
+        columns["width"].append(info.get("width"))
+        columns["height"].append(info.get("height"))
+        columns["music_title"].append((video.get("music") or {}).get("title", ""))
+        columns["hashtags"].append(list(video.get("hashtags", [])))
+        columns["url"].append(video.get("url", ""))
+
+    return _build_frame(columns, VIDEO_SCHEMA)
+
+
+def _cell(value: Any) -> Any:
+    # pandas缺失值（NA/NaT/NaN）还原为None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    try:
+        return None if pd.isna(value) else value
+    except (TypeError, ValueError):
+        return value
+
+
+def frame_to_tweets(frame) -> Iterable[Dict[str, Any]]:
+    """
+    将推文DataFrame还原为 format_tweet 结构的记录（tweets_to_frame 的逆过程）
+
+    Args:
+        frame: 按 TWEET_SCHEMA 读取的DataFrame
+
+    Yields:
+        推文记录
+    """
+    _require_pandas()
+
+    for row in frame.to_dict("records"):
+        row = {name: _cell(value) for name, value in row.items()}
+        created = row.get("created_at")
+        yield {
+            "id": row.get("id") or "",
+            "text": row.get("text") or "",
+            "author": row.get("author") or "",
+            "created_at": created.isoformat() if created is not None else "",
+            "public_metrics": {
+                "like_count": row.get("like_count") or 0,
+                "retweet_count": row.get("retweet_count") or 0,
+                "reply_count": row.get("reply_count") or 0,
+                "quote_count": row.get("quote_count") or 0,
+            },
+            "urls": [],
+            "media": [],
+            "entities": {
+                "hashtags": row.get("hashtags") or [],
+                "mentions": row.get("mentions") or [],
+                "cashtags": [],
+                "urls": row.get("urls") or [],
+            },
+        }
+
+
+def frame_to_videos(frame) -> Iterable[Dict[str, Any]]:
+    """
+    将视频DataFrame还原为 format_video 结构的记录（videos_to_frame 的逆过程）
+
+    Args:
+        frame: 按 VIDEO_SCHEMA 读取的DataFrame
+
+    Yields:
+        视频记录
+    """
+    _require_pandas()
+
+    for row in frame.to_dict("records"):
+        row = {name: _cell(value) for name, value in row.items()}
+        created = row.get("create_time")
+        yield {
+            "aweme_id": row.get("aweme_id") or "",
+            "desc": row.get("desc") or "",
+            "create_time": int(created.timestamp()) if created is not None else 0,
+            "author": {
+                "unique_id": row.get("author_unique_id") or "",
+                "nickname": row.get("author_nickname") or "",
+            },
+            "statistics": {
+                "digg_count": row.get("digg_count") or 0,
+                "comment_count": row.get("comment_count") or 0,
+                "share_count": row.get("share_count") or 0,
+                "play_count": row.get("play_count") or 0,
+            },
+            "video": {
+                "duration": row.get("duration") or 0,
+                "width": row.get("width") or 0,
+                "height": row.get("height") or 0,
+            },
+            "music": {"title": row.get("music_title") or ""},
+            "hashtags": row.get("hashtags") or [],
+            "url": row.get("url") or "",
+        }
+
+
+def read_parquet(path: str):
+    """
+    读取Parquet文件或分区目录
+
+    Args:
+        path: 文件或目录路径
+
+    Returns:
+        DataFrame
+    """
+    _require_pandas()
+    return pd.read_parquet(path)
+
+
+def write_parquet(
+    frame,
+    path: str,
+    partition_cols: Optional[Sequence[str]] = DEFAULT_PARTITION_COLS,
+    compression: str = "zstd"
+) -> str:
+    """
+    写入Parquet
+
+    Args:
+        frame: 要写入的DataFrame
+        path: 分区时为数据集目录，不分区时为文件路径
+        partition_cols: 分区列，为空时写入单个文件
+        compression: 压缩算法: zstd、snappy、gzip 或 none
+
+    Returns:
+        输出路径
+    """
+    _require_pandas()
+
+    if compression == "none":
+        compression = None
+
+    if partition_cols:
+        Path(path).mkdir(parents=True, exist_ok=True)
+        frame.to_parquet(
+            path,
+            engine="pyarrow",
+            compression=compression,
+            partition_cols=list(partition_cols),
+            index=False
+        )
+    else:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        frame.to_parquet(path, engine="pyarrow", compression=compression, index=False)
+
+    logger.info(f"已写入 {len(frame)} 行到 {path}")
+    return path
+
+
+def export_tweets_parquet(
+    tweets: Iterable[Dict[str, Any]],
+    path: str,
+    user_id: Optional[str] = None,
+    partition_cols: Optional[Sequence[str]] = DEFAULT_PARTITION_COLS,
+    compression: str = "zstd"
+) -> str:
+    """
+    导出推文为Parquet数据集
+
+    Args:
+        tweets: format_tweet 输出的推文
+        path: 输出目录（不分区时为文件路径）
+        user_id: 分区用的用户ID
+        partition_cols: 分区列，默认按 user_id 和 date
+        compression: 压缩算法
+
+    Returns:
+        输出路径
+    """
+    return write_parquet(tweets_to_frame(tweets, user_id), path, partition_cols, compression)
+
+
+def export_videos_parquet(
+    videos: Iterable[Dict[str, Any]],
+    path: str,
+    user_id: Optional[str] = None,
+    partition_cols: Optional[Sequence[str]] = DEFAULT_PARTITION_COLS,
+    compression: str = "zstd"
+) -> str:
+    """
+    导出视频为Parquet数据集
+
+    Args:
+        videos: format_video 输出的视频
+        path: 输出目录（不分区时为文件路径）
+        user_id: 分区用的用户ID
+        partition_cols: 分区列，默认按 user_id 和 date
+        compression: 压缩算法
+
+    Returns:
+        输出路径
+    """
+    return write_parquet(videos_to_frame(videos, user_id), path, partition_cols, compression)
@@ -0,0 +1,154 @@
+"""
+流式压缩模块
+按文件扩展名或显式参数选择gzip/zstd，写入时增量压缩，读取时增量解压
+
+zstd需要安装zstandard: pip install zstandard
+"""
+
+import gzip
+import io
+import logging
+from typing import IO, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+COMPRESSIONS = (GZIP, ZSTD)
+
+_EXTENSIONS = {
+    ".gz": GZIP,
+    ".gzip": GZIP,
+    ".zst": ZSTD,
+    ".zstd": ZSTD,
+}
+
+# 默认压缩级别：gzip 6 与 zstd 3 的速度/压缩率都比较均衡
+_DEFAULT_LEVELS = {GZIP: 6, ZSTD: 3}
+
+
+def detect_compression(path: str, compress: Optional[str] = None) -> Optional[str]:
+    """
+    确定压缩格式
+
+    Args:
+        path: 文件路径
+        compress: 显式指定的压缩格式，优先于扩展名
+
+    Returns:
+        gzip、zstd 或 None（不压缩）
+    """
+    if compress:
+        if compress not in COMPRESSIONS:
+            raise ValueError(f"不支持的压缩格式: {compress}，可选: {', '.join(COMPRESSIONS)}")
+        return compress
+
+    lowered = str(path).lower()
+    for ext, name in _EXTENSIONS.items():
+        if lowered.endswith(ext):
+            return name
+    return None
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstd压缩需要安装zstandard: pip install zstandard")
+
+
+def _wrap_text(binary: IO, mode: str, encoding: str, newline: Optional[str]) -> IO:
+    if "t" in mode:
+        return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+    return binary
+
+
+def open_output(
+    path: str,
+    mode: str = "wb",
+    compress: Optional[str] = None,
+    level: Optional[int] = None,
+    encoding: str = "utf-8",
+    newline: Optional[str] = None
+) -> IO:
+    """
+    打开输出文件，按需增量压缩
+
+    追加模式下gzip追加新的member、zstd追加新的frame，两者都是合法的压缩文件
+
+    Args:
+        path: 文件路径
+        mode: wb、ab、wt 或 at
+        compress: 压缩格式，为None时按扩展名判断
+        level: 压缩级别
+        encoding: 文本模式的编码
+        newline: 文本模式的换行处理（写CSV时应为''）
+
+    Returns:
+        文件对象，关闭时完成压缩流
+    """
+    if mode not in ("wb", "ab", "wt", "at"):
+        raise ValueError(f"不支持的打开模式: {mode}")
+
+    compression = detect_compression(path, compress)
+    if compression is None:
+        if "t" in mode:
+            return open(path, mode, encoding=encoding, newline=newline)
+        return open(path, mode)
+
+    level = level if level is not None else _DEFAULT_LEVELS[compression]
+    binary_mode = mode[0] + "b"
+
+    if compression == GZIP:
+        binary = gzip.open(path, binary_mode, compresslevel=level)
+    else:
+        _require_zstandard()
+        raw = open(path, binary_mode)
+        binary = zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=True)
+
+    logger.debug(f"以{compression}压缩写入: {path}")
+    return _wrap_text(binary, mode, encoding, newline)
+
+
+def open_input(
+    path: str,
+    mode: str = "rb",
+    compress: Optional[str] = None,
+    encoding: str = "utf-8",
+    newline: Optional[str] = None
+) -> IO:
+    """
+    打开输入文件，按需增量解压
+
+    Args:
+        path: 文件路径
+        mode: rb 或 rt
+        compress: 压缩格式，为None时按扩展名判断
+        encoding: 文本模式的编码
+        newline: 文本模式的换行处理
+
+    Returns:
+        文件对象
+    """
+    if mode not in ("rb", "rt"):
+        raise ValueError(f"不支持的打开模式: {mode}")
+
+    compression = detect_compression(path, compress)
+    if compression is None:
+        if mode == "rt":
+            return open(path, mode, encoding=encoding, newline=newline)
+        return open(path, mode)
+
+    if compression == GZIP:
+        binary = gzip.open(path, "rb")
+    else:
+        _require_zstandard()
+        raw = open(path, "rb")
+        binary = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        # stream_reader不支持readline，包一层缓冲
+        binary = io.BufferedReader(binary)
+
+    return _wrap_text(binary, mode, encoding, newline)
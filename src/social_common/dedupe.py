@@ -0,0 +1,244 @@
+"""
+跨运行去重模块
+持久记录已输出过的推文ID和视频aweme_id，重叠轮询或重启后不再重复输出
+
+SQLite中的集合保证结果精确；可选的布隆过滤器放在前面，
+对绝大多数新ID无需查询数据库即可确定“未见过”
+"""
+
+import hashlib
+import logging
+import math
+import sqlite3
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .storage import TWEET, VIDEO
+
+logger = logging.getLogger(__name__)
+
+# 各类记录的ID字段
+ID_FIELDS = {TWEET: "id", VIDEO: "aweme_id"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_ids (
+    kind       TEXT NOT NULL,
+    id         TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+"""
+
+
+class BloomFilter:
+    """
+    分块布隆过滤器
+
+    只会误报（未见过的ID被判为可能见过），不会漏报，
+    因此判为“不存在”的ID一定是新的。
+    每个元素的k个位集中在同一个64位字内，检查和置位各只需一次掩码运算
+    """
+
+    # 一次16字节摘要：前8字节选字，后8字节按6位一组给出字内偏移，最多10组
+    _MAX_HASHES = 10
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        按预期容量和误报率分配位数组
+
+        Args:
+            capacity: 预期元素数量
+            error_rate: 达到容量时的误报率
+        """
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # 分块布局会抬高误报率，位数加倍后实测误报率回到目标以下
+        num_bits = -capacity * math.log(error_rate) / (math.log(2) ** 2) * 2.0
+        self.num_words = max(1, int(math.ceil(num_bits / 64)))
+        self.num_hashes = min(self._MAX_HASHES, max(1, int(round(-math.log2(error_rate)))))
+        self.words = array("Q", bytes(8 * self.num_words))
+        self.count = 0
+
+    def _locate(self, item: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        word = int.from_bytes(digest[:8], "little") % self.num_words
+        offsets = int.from_bytes(digest[8:], "little")
+        mask = 0
+        for _ in range(self.num_hashes):
+            mask |= 1 << (offsets & 63)
+            offsets >>= 6
+        return word, mask
+
+    def add(self, item: str) -> bool:
+        """
+        加入元素
+
+        Returns:
+            加入前是否可能已存在（所有位都已置位）
+        """
+        word, mask = self._locate(item)
+        value = self.words[word]
+        if value & mask == mask:
+            return True
+        self.words[word] = value | mask
+        self.count += 1
+        return False
+
+    def __contains__(self, item: str) -> bool:
+        word, mask = self._locate(item)
+        return self.words[word] & mask == mask
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SeenStore:
+    """
+    已输出ID的持久集合
+
+    新ID先进入待提交集合，由调用方在对应记录写入输出后调用 flush 提交，
+    中途崩溃时未落盘记录的ID不会被记为已见过；
+    可与 SQLiteArchive 使用同一个数据库文件
+    """
+
+    def __init__(
+        self,
+        path: str,
+        bloom_capacity: Optional[int] = 1_000_000,
+        error_rate: float = 0.001
+    ):
+        """
+        打开或创建去重库
+
+        Args:
+            path: 数据库文件路径
+            bloom_capacity: 布隆过滤器的预期容量，为None时不使用布隆过滤器
+            error_rate: 布隆过滤器的误报率
+        """
+        self.path = path
+        self.duplicates = 0
+        self.db_lookups = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+        self._pending: Dict[Tuple[str, str], float] = {}
+        self.bloom: Optional[BloomFilter] = None
+        if bloom_capacity:
+            self._load_bloom(bloom_capacity, error_rate)
+
+    def _load_bloom(self, capacity: int, error_rate: float):
+        existing = self.conn.execute("SELECT COUNT(*) FROM seen_ids").fetchone()[0]
+        # 已有ID超过预期容量时放大，避免误报率失控
+        self.bloom = BloomFilter(max(capacity, existing * 2), error_rate)
+        for kind, item_id in self.conn.execute("SELECT kind, id FROM seen_ids"):
+            self.bloom.add(f"{kind}:{item_id}")
+        logger.debug(f"去重库已载入 {existing} 个ID: {self.path}")
+
+    def contains(self, kind: str, item_id: Any) -> bool:
+        """
+        判断ID是否已输出过
+
+        Args:
+            kind: tweet 或 video
+            item_id: 推文ID或aweme_id
+
+        Returns:
+            是否已见过
+        """
+        item_id = str(item_id)
+        if self.bloom is not None and f"{kind}:{item_id}" not in self.bloom:
+            return False
+        return (kind, item_id) in self._pending or self._stored(kind, item_id)
+
+    def _stored(self, kind: str, item_id: str) -> bool:
+        self.db_lookups += 1
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_ids WHERE kind = ? AND id = ?", (kind, item_id)
+        ).fetchone()
+        return row is not None
+
+    def add(self, kind: str, item_id: Any) -> bool:
+        """
+        记录ID（只加入待提交集合，不写入数据库）
+
+        Args:
+            kind: tweet 或 video
+            item_id: 推文ID或aweme_id
+
+        Returns:
+            ID是新的时返回True，已见过时返回False
+        """
+        item_id = str(item_id)
+        # 布隆过滤器判定为新的ID无需再查待提交集合和数据库，检查与置位只哈希一次
+        if self.bloom is not None and not self.bloom.add(f"{kind}:{item_id}"):
+            pass
+        elif (kind, item_id) in self._pending or self._stored(kind, item_id):
+            self.duplicates += 1
+            return False
+
+        self._pending[(kind, item_id)] = time.time()
+        return True
+
+    def filter_new(self, kind: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        过滤掉已输出过的记录，并记录新记录的ID
+
+        没有ID的记录原样保留
+
+        Args:
+            kind: tweet 或 video
+            records: 原始或格式化后的记录
+
+        Yields:
+            未见过的记录
+        """
+        id_field = ID_FIELDS[kind]
+        for record in records:
+            item_id = record.get(id_field) if isinstance(record, dict) else None
+            if item_id in (None, "") or self.add(kind, item_id):
+                yield record
+
+    def flush(self):
+        """提交待写入的ID，应在对应记录写入输出之后调用"""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_ids (kind, id, first_seen) VALUES (?, ?, ?)",
+                [(kind, item_id, first_seen) for (kind, item_id), first_seen in self._pending.items()]
+            )
+        self._pending.clear()
+
+    def count(self, kind: Optional[str] = None) -> int:
+        """统计已记录的ID数量（含待提交的）"""
+        if kind is None:
+            stored = self.conn.execute("SELECT COUNT(*) FROM seen_ids").fetchone()[0]
+            return stored + len(self._pending)
+        stored = self.conn.execute("SELECT COUNT(*) FROM seen_ids WHERE kind = ?", (kind,)).fetchone()[0]
+        return stored + sum(1 for pending_kind, _ in self._pending if pending_kind == kind)
+
+    def close(self, commit: bool = True):
+        """
+        关闭数据库连接
+
+        Args:
+            commit: 是否先提交剩余ID，为False时丢弃未提交的ID
+        """
+        try:
+            if commit:
+                self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 异常退出时对应记录可能没有写入输出，不提交其ID
+        self.close(commit=exc_type is None)
+        return False
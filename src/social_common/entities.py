@@ -0,0 +1,100 @@
+"""
+文本实体提取模块
+单次扫描提取话题标签、@提及、$股票代码和URL，支持中文等Unicode文本
+"""
+
+import re
+from typing import Dict, List
+
+# URL优先匹配，避免把URL片段中的 # 识别为话题
+# 每个分支都以触发字符开头，前置字符的检查放在触发字符之后的定长反向断言中，
+# 这样正则引擎在普通字符处可以立即跳过
+# 话题：允许紧跟在中文之后（如"今天#美食"），但不能紧跟在ASCII字母数字之后（如"a#b"、"&#39;"）
+# 提及：ASCII用户名最长15位；非ASCII开头的按Unicode词字符匹配（抖音昵称）
+# 各分支中的 %s 用于把实体分组改为非捕获分组
+_URL = r"(%shttps?://[^\s<>\"'，。！？、；：“”‘’（）【】《》]+)"
+_HASHTAG = r"[#＃](?<![A-Za-z0-9_&/].)(\w+)"
+_MENTION = r"[@＠](?<![A-Za-z0-9_.].)(%s[A-Za-z0-9_]{1,15}(?![A-Za-z0-9_])|[^\W\x00-\x7f]\w*)"
+_CASHTAG = r"\$(?<![A-Za-z0-9_$].)(%s[A-Za-z]{1,6}(?:[._][A-Za-z]{1,2})?)(?![A-Za-z0-9_])"
+_ENTITY_PATTERN = re.compile("|".join((_URL % "", _HASHTAG, _MENTION % "", _CASHTAG % "")))
+
+# 只需话题时（话题统计、聚合器）使用：只捕获话题，其余分支仍参与匹配以保证结果与 extract_entities 相同
+# （如URL中的 #，或提及吞掉URL开头后URL中的 #），但不为提及、股票代码和URL构造结果
+_HASHTAG_PATTERN = re.compile("|".join((_URL % "?:", _HASHTAG, _MENTION % "?:", _CASHTAG % "?:")))
+
+# 快速路径：不含任何触发字符的文本无需运行完整正则
+_has_trigger = re.compile(r"[#＃@＠$]|https?://").search
+
+# URL末尾常见的标点，通常不属于URL本身
+_URL_TRAILING_PUNCTUATION = ".,;:!?)]}"
+
+
+def _empty_entities() -> Dict[str, List[str]]:
+    return {"hashtags": [], "mentions": [], "cashtags": [], "urls": []}
+
+
+def extract_entities(text: str) -> Dict[str, List[str]]:
+    """
+    提取文本中的实体
+
+    Args:
+        text: 推文或视频描述文本
+
+    Returns:
+        包含 hashtags、mentions、cashtags、urls 的字典，
+        话题/提及/股票代码不含前缀符号，按出现顺序排列
+    """
+    entities = _empty_entities()
+    if not text or not _has_trigger(text):
+        return entities
+
+    hashtags = entities["hashtags"]
+    mentions = entities["mentions"]
+    cashtags = entities["cashtags"]
+    urls = entities["urls"]
+
+    # findall返回 (url, hashtag, mention, cashtag) 元组，比逐个构造Match对象更快
+    for url, hashtag, mention, cashtag in _ENTITY_PATTERN.findall(text):
+        if hashtag:
+            # 纯数字不是话题（如"#1"）
+            if not hashtag.isdigit():
+                hashtags.append(hashtag)
+        elif mention:
+            mentions.append(mention)
+        elif url:
+            urls.append(url.rstrip(_URL_TRAILING_PUNCTUATION))
+        else:
+            cashtags.append(cashtag.upper())
+
+    return entities
+
+
+def extract_hashtags(text: str) -> List[str]:
+    """
+    提取文本中的话题标签
+
+    只统计话题时使用，比 extract_entities 快，结果与其 hashtags 相同
+
+    Args:
+        text: 文本
+
+    Returns:
+        话题标签列表（不含 # 前缀）
+    """
+    if not text or ("#" not in text and "＃" not in text):
+        return []
+    # 只有一个捕获分组，findall直接返回字符串；其他分支匹配时为空字符串
+    return [hashtag for hashtag in _HASHTAG_PATTERN.findall(text) if hashtag and not hashtag.isdigit()]
+
+
+def normalize_hashtag(tag: str) -> str:
+    """
+    规范化话题标签，用于统计时合并大小写不同的同一话题
+
+    Args:
+        tag: 话题标签（可带 # 前缀）
+
+    Returns:
+        规范化后的话题标签（不含前缀）
+    """
+    return tag.lstrip("#＃").casefold()
@@ -0,0 +1,239 @@
+"""
+流式导出模块
+导出函数接受同步或异步可迭代对象，逐条写出记录，内存占用与数据量无关
+"""
+
+import csv
+import logging
+from typing import Any, AsyncIterable, Callable, Dict, IO, Iterable, Optional, Sequence, Union
+
+from . import serialization
+from .compression import open_output
+from .sinks import ThreadedSink, run_blocking
+
+logger = logging.getLogger(__name__)
+
+Items = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+class JsonDocumentWriter:
+    """
+    流式JSON文档写入器
+
+    输出形如 {"header字段": ..., "<items_key>": [条目, ...], "footer字段": ...} 的合法JSON，
+    条目逐个写出，每个条目占一行；footer在所有条目写完后才确定（如统计数量、共享表）
+    """
+
+    def __init__(self, fp: IO, items_key: str, header: Optional[Dict[str, Any]] = None):
+        """
+        初始化写入器并写出文档头
+
+        Args:
+            fp: 文本模式的文件对象
+            items_key: 条目数组的键名
+            header: 写在条目之前的字段
+        """
+        self.fp = fp
+        self.count = 0
+        self._closed = False
+
+        fp.write("{\n")
+        for key, value in (header or {}).items():
+            fp.write(f"  {serialization.dumps(key)}: {serialization.dumps(value)},\n")
+        fp.write(f"  {serialization.dumps(items_key)}: [")
+
+    def write(self, item: Any):
+        """写出一个条目"""
+        self.fp.write(",\n    " if self.count else "\n    ")
+        self.fp.write(serialization.dumps(item))
+        self.count += 1
+
+    def close(self, footer: Optional[Dict[str, Any]] = None):
+        """
+        结束条目数组并写出文档尾
+
+        Args:
+            footer: 写在条目之后的字段
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.fp.write("\n  ]" if self.count else "]")
+        for key, value in (footer or {}).items():
+            self.fp.write(f",\n  {serialization.dumps(key)}: {serialization.dumps(value)}")
+        self.fp.write("\n}\n")
+
+
+def export_json(
+    path: str,
+    items: Iterable[Any],
+    items_key: str = "items",
+    header: Optional[Dict[str, Any]] = None,
+    footer: Optional[Callable[[int], Dict[str, Any]]] = None,
+    compress: Optional[str] = None
+) -> int:
+    """
+    流式导出JSON文档
+
+    Args:
+        path: 输出路径
+        items: 条目的可迭代对象（可以是生成器）
+        items_key: 条目数组的键名
+        header: 写在条目之前的字段
+        footer: 接收条目数量、返回条目之后字段的回调
+        compress: 压缩格式，为None时按扩展名判断
+
+    Returns:
+        写出的条目数量
+    """
+    with open_output(path, "wt", compress=compress) as f:
+        writer = JsonDocumentWriter(f, items_key, header)
+        for item in items:
+            writer.write(item)
+        writer.close(footer(writer.count) if footer else None)
+
+    logger.info(f"已导出 {writer.count} 个条目到 {path}")
+    return writer.count
+
+
+async def aexport_json(
+    path: str,
+    items: Items,
+    items_key: str = "items",
+    header: Optional[Dict[str, Any]] = None,
+    footer: Optional[Callable[[int], Dict[str, Any]]] = None,
+    compress: Optional[str] = None
+) -> int:
+    """
+    流式导出JSON文档，支持异步可迭代对象（如 fetch_user_tweets_stream）
+
+    序列化和文件写入在后台线程中进行，不阻塞事件循环中的其他协程
+
+    参数同 export_json
+
+    Returns:
+        写出的条目数量
+    """
+    f = await run_blocking(open_output, path, "wt", compress=compress)
+    try:
+        writer = await run_blocking(JsonDocumentWriter, f, items_key, header)
+        async with ThreadedSink(writer, owns_sink=False) as threaded:
+            async for item in aiter_items(items):
+                await threaded.awrite(item)
+        await run_blocking(writer.close, footer(writer.count) if footer else None)
+    finally:
+        await run_blocking(f.close)
+
+    logger.info(f"已导出 {writer.count} 个条目到 {path}")
+    return writer.count
+
+
+def export_csv(
+    path: str,
+    rows: Iterable[Sequence[Any]],
+    headers: Sequence[str],
+    compress: Optional[str] = None
+) -> int:
+    """
+    流式导出CSV
+
+    Args:
+        path: 输出路径
+        rows: 行的可迭代对象
+        headers: 表头
+        compress: 压缩格式，为None时按扩展名判断
+
+    Returns:
+        写出的行数（不含表头）
+    """
+    count = 0
+    with open_output(path, "wt", compress=compress, newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+
+    logger.info(f"已导出 {count} 行到 {path}")
+    return count
+
+
+async def aexport_csv(
+    path: str,
+    rows: Items,
+    headers: Sequence[str],
+    compress: Optional[str] = None
+) -> int:
+    """
+    流式导出CSV，支持异步可迭代对象
+
+    文件写入在后台线程中进行，不阻塞事件循环中的其他协程
+
+    参数同 export_csv
+
+    Returns:
+        写出的行数（不含表头）
+    """
+    count = 0
+    f = await run_blocking(open_output, path, "wt", compress=compress, newline="")
+    try:
+        writer = _CsvRowSink(f)
+        await run_blocking(writer.write, headers)
+        async with ThreadedSink(writer, owns_sink=False) as threaded:
+            async for row in aiter_items(rows):
+                await threaded.awrite(row)
+                count += 1
+    finally:
+        await run_blocking(f.close)
+
+    logger.info(f"已导出 {count} 行到 {path}")
+    return count
+
+
+class _CsvRowSink:
+    """以输出端接口包装csv.writer，供 ThreadedSink 使用"""
+
+    def __init__(self, fp: IO):
+        self._writer = csv.writer(fp)
+
+    def write(self, row: Sequence[Any]):
+        self._writer.writerow(row)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+async def aiter_items(items: Items):
+    """
+    统一遍历同步或异步可迭代对象
+
+    Args:
+        items: 同步或异步可迭代对象
+
+    Yields:
+        条目
+    """
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def amap(func: Callable[[Any], Any], items: Items):
+    """
+    对同步或异步可迭代对象逐条应用函数
+
+    Args:
+        func: 转换函数
+        items: 同步或异步可迭代对象
+
+    Yields:
+        转换后的条目
+    """
+    async for item in aiter_items(items):
+        yield func(item)
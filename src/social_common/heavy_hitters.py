@@ -0,0 +1,412 @@
+"""
+高频项统计模块
+以固定内存统计话题等高频项：Space-Saving 跟踪出现最多的项，Count-Min Sketch 估计任意项的次数，
+TrendingHashtags 按时间分桶维护滑动窗口内的热门和上升话题
+
+所有结构都可以合并，分片或各用户分别统计后合并的结果与整体统计的误差界相同
+"""
+
+import hashlib
+import heapq
+import time
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .timeutils import to_epoch
+
+
+class SpaceSaving:
+    """
+    Space-Saving 高频项统计
+
+    最多跟踪 capacity 个项；已满时新项替换计数最小的项并继承其计数。
+    不同项数不超过容量时计数精确，否则计数为上界，真实值至少为 count - error；
+    真实次数超过 总次数/capacity 的项一定会被跟踪
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity: 最多跟踪的项数
+        """
+        self.capacity = max(1, capacity)
+        self.total = 0
+        # 字典保持加入顺序，未发生替换时与普通计数字典的输出一致
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+        # 每个被跟踪项一个 (计数, 项) 条目；计数只增不减，条目可能偏小，淘汰时再修正
+        self._heap: List[Tuple[int, Any]] = []
+
+    def add(self, item: Any, count: int = 1):
+        """
+        加入一项
+
+        Args:
+            item: 项（如话题）
+            count: 次数
+        """
+        self.total += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        heap = self._heap
+        while True:
+            min_count, victim = heap[0]
+            current = counts[victim]
+            if current == min_count:
+                break
+            heapq.heapreplace(heap, (current, victim))
+        del counts[victim]
+        del self.errors[victim]
+        counts[item] = min_count + count
+        self.errors[item] = min_count
+        heapq.heapreplace(heap, (min_count + count, item))
+
+    def update(self, items: Iterable[Any]):
+        """逐个加入多个项"""
+        for item in items:
+            self.add(item)
+
+    def _floor(self) -> int:
+        # 已满时未被跟踪的项的次数不超过最小计数
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        合并另一个统计（Agarwal等人的可合并摘要算法）
+
+        Returns:
+            统计自身
+        """
+        floor, other_floor = self._floor(), other._floor()
+        counts: Dict[Any, int] = {}
+        errors: Dict[Any, int] = {}
+        for item, count in self.counts.items():
+            counts[item] = count + other.counts.get(item, other_floor)
+            errors[item] = self.errors[item] + other.errors.get(item, other_floor)
+        for item, count in other.counts.items():
+            if item not in counts:
+                counts[item] = count + floor
+                errors[item] = other.errors[item] + floor
+
+        if len(counts) > self.capacity:
+            # 保留计数最大的项，仍按原有顺序排列
+            keep = set(sorted(counts, key=counts.__getitem__, reverse=True)[:self.capacity])
+            counts = {item: count for item, count in counts.items() if item in keep}
+            errors = {item: errors[item] for item in counts}
+
+        self.counts = counts
+        self.errors = errors
+        self.total += other.total
+        self._heap = [(count, item) for item, count in counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        """
+        按计数降序返回高频项（计数相同时先加入的在前）
+
+        Args:
+            n: 数量，为None时返回全部被跟踪的项
+
+        Returns:
+            (项, 计数) 列表
+        """
+        ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def estimate(self, item: Any) -> int:
+        """估计次数（上界）；未被跟踪的项返回可能的最大次数"""
+        return self.counts.get(item, self._floor())
+
+    def guaranteed(self, item: Any) -> int:
+        """次数下界"""
+        if item not in self.counts:
+            return 0
+        return self.counts[item] - self.errors[item]
+
+    def as_dict(self) -> Dict[Any, int]:
+        """按加入顺序返回 项 -> 计数"""
+        return dict(self.counts)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+@lru_cache(maxsize=65536)
+def _hash_pair(item: str) -> Tuple[int, int]:
+    # 话题高度重复，缓存摘要后绝大多数更新无需再计算哈希
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch
+
+    depth行、每行width个计数器，估计值为各行对应计数器的最小值：
+    只会高估，误差不超过 总次数 * e / width 的概率为 1 - e^-depth
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """
+        Args:
+            width: 每行计数器数量
+            depth: 行数（哈希函数数量）
+        """
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = array("q", bytes(8 * width * depth))
+
+    def _positions(self, item: Any) -> List[int]:
+        # 双重哈希: h1 + i * h2 生成各行的位置
+        h1, h2 = _hash_pair(str(item))
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, item: Any, count: int = 1):
+        """
+        加入一项
+
+        Args:
+            item: 项
+            count: 次数
+        """
+        self.total += count
+        table = self.table
+        for position in self._positions(item):
+            table[position] += count
+
+    def estimate(self, item: Any) -> int:
+        """估计次数（上界）"""
+        table = self.table
+        return min(table[position] for position in self._positions(item))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """
+        合并另一个同尺寸的草图
+
+        Returns:
+            草图自身
+        """
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("只能合并尺寸相同的Count-Min Sketch")
+        table = self.table
+        for position, value in enumerate(other.table):
+            if value:
+                table[position] += value
+        self.total += other.total
+        return self
+
+    def __getitem__(self, item: Any) -> int:
+        return self.estimate(item)
+
+
+class TrendingHashtags:
+    """
+    滑动窗口话题统计
+
+    按记录时间把话题计入固定长度的时间桶，每个桶一个 Space-Saving 和一个 Count-Min Sketch；
+    只保留最新时间之前 window 秒内的桶，内存占用与数据总量无关
+    """
+
+    def __init__(
+        self,
+        window: float = 24 * 3600,
+        bucket_seconds: float = 3600,
+        capacity: int = 200,
+        sketch_width: int = 2048,
+        sketch_depth: int = 4
+    ):
+        """
+        Args:
+            window: 保留的时间范围（秒）
+            bucket_seconds: 时间桶长度（秒）
+            capacity: 每个桶跟踪的话题数
+            sketch_width: 每个桶的Count-Min Sketch宽度
+            sketch_depth: 每个桶的Count-Min Sketch深度
+        """
+        if bucket_seconds <= 0 or window < bucket_seconds:
+            raise ValueError("时间桶长度必须为正且不大于窗口")
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.buckets: Dict[int, Tuple[SpaceSaving, CountMinSketch]] = {}
+        self.latest: Optional[int] = None
+        self.late = 0
+
+    def _bucket_of(self, epoch: float) -> int:
+        return int(epoch // self.bucket_seconds)
+
+    def _retained(self) -> int:
+        return max(1, int(self.window // self.bucket_seconds))
+
+    def _expire(self):
+        oldest = self.latest - self._retained() + 1
+        for bucket in [bucket for bucket in self.buckets if bucket < oldest]:
+            del self.buckets[bucket]
+
+    def _bucket(self, bucket: int) -> Tuple[SpaceSaving, CountMinSketch]:
+        entry = self.buckets.get(bucket)
+        if entry is None:
+            entry = (SpaceSaving(self.capacity), CountMinSketch(self.sketch_width, self.sketch_depth))
+            self.buckets[bucket] = entry
+        return entry
+
+    def add(self, hashtag: str, timestamp: Any = None, count: int = 1) -> bool:
+        """
+        加入一次话题出现
+
+        Args:
+            hashtag: 话题
+            timestamp: 记录时间（时间戳、Twitter时间字符串或ISO字符串），为None时使用当前时间
+            count: 次数
+
+        Returns:
+            是否计入（早于保留窗口或时间无法解析的记录不计入）
+        """
+        epoch = time.time() if timestamp is None else to_epoch(timestamp)
+        if epoch is None:
+            return False
+        bucket = self._bucket_of(epoch)
+        if self.latest is None or bucket > self.latest:
+            self.latest = bucket
+            self._expire()
+        elif bucket <= self.latest - self._retained():
+            self.late += 1
+            return False
+
+        summary, sketch = self._bucket(bucket)
+        summary.add(hashtag, count)
+        sketch.add(hashtag, count)
+        return True
+
+    def window_start(self, epoch: float) -> float:
+        """
+        最新记录时间为epoch时保留窗口的起始时间，更早的记录不会计入
+
+        Args:
+            epoch: 时间戳（秒），不早于已计入的最新记录时才有意义
+
+        Returns:
+            起始时间戳（秒）
+        """
+        return (self._bucket_of(epoch) - self._retained() + 1) * self.bucket_seconds
+
+    def merge(self, other: "TrendingHashtags") -> "TrendingHashtags":
+        """
+        合并另一个配置相同的统计
+
+        Returns:
+            统计自身
+        """
+        if (self.bucket_seconds, self.capacity, self.sketch_width, self.sketch_depth) != (
+            other.bucket_seconds, other.capacity, other.sketch_width, other.sketch_depth
+        ):
+            raise ValueError("只能合并配置相同的话题统计")
+        for bucket, (summary, sketch) in other.buckets.items():
+            own_summary, own_sketch = self._bucket(bucket)
+            own_summary.merge(summary)
+            own_sketch.merge(sketch)
+        self.late += other.late
+        if other.latest is not None and (self.latest is None or other.latest > self.latest):
+            self.latest = other.latest
+        if self.latest is not None:
+            self._expire()
+        return self
+
+    def _range(self, window: Optional[float], offset: int = 0) -> range:
+        span = self._retained() if window is None else max(1, int(window // self.bucket_seconds))
+        end = self.latest - offset
+        return range(end - span + 1, end + 1)
+
+    def _merged(self, buckets: Iterable[int]) -> SpaceSaving:
+        merged = SpaceSaving(self.capacity)
+        for bucket in buckets:
+            entry = self.buckets.get(bucket)
+            if entry is not None:
+                merged.merge(entry[0])
+        return merged
+
+    def count(self, hashtag: str, window: Optional[float] = None) -> int:
+        """
+        估计话题在最近一段时间内的次数（上界）
+
+        Args:
+            hashtag: 话题
+            window: 时间范围（秒），默认为整个保留窗口
+
+        Returns:
+            次数
+        """
+        if self.latest is None:
+            return 0
+        return sum(
+            self.buckets[bucket][1].estimate(hashtag)
+            for bucket in self._range(window) if bucket in self.buckets
+        )
+
+    def top(self, n: int = 10, window: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        最近一段时间内出现最多的话题
+
+        Args:
+            n: 数量
+            window: 时间范围（秒），默认为整个保留窗口
+
+        Returns:
+            (话题, 次数) 列表
+        """
+        if self.latest is None:
+            return []
+        return self._merged(self._range(window)).top(n)
+
+    def trending(self, n: int = 10, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        上升最快的话题：比较最近一段时间与之前同样长度的时间内的次数
+
+        Args:
+            n: 数量
+            window: 比较的时间长度（秒），默认为保留窗口的一半
+
+        Returns:
+            按增量降序排列的列表，元素含 hashtag、count、previous、growth
+        """
+        if self.latest is None:
+            return []
+        if window is None:
+            window = max(self.bucket_seconds, self.window / 2)
+        span = max(1, int(window // self.bucket_seconds))
+
+        current = self._merged(self._range(window))
+        previous_buckets = [
+            self.buckets[bucket][1] for bucket in self._range(window, offset=span) if bucket in self.buckets
+        ]
+
+        results = []
+        for hashtag, count in current.top():
+            previous = sum(sketch.estimate(hashtag) for sketch in previous_buckets)
+            growth = count - previous
+            if growth > 0:
+                results.append({
+                    "hashtag": hashtag,
+                    "count": count,
+                    "previous": previous,
+                    "growth": growth,
+                })
+        results.sort(key=lambda x: x["growth"], reverse=True)
+        return results[:n]
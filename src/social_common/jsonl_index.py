@@ -0,0 +1,257 @@
+"""
+JSONL偏移索引模块
+为大型JSONL归档记录 (ID, 文件, 字节偏移, 长度)，
+查询时通过mmap二分查找定位单条记录，无需解析文件其余部分
+
+索引文件格式:
+    头部   8字节魔数 + 4字节文件表长度
+    文件表 JSON数组，按序号列出被索引的JSONL文件路径
+    记录区 按键升序排列的定长记录 (键, 文件序号, 偏移, 长度)
+键为ID的BLAKE2b前8字节，不同ID的键冲突时通过读取记录比对ID区分
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import serialization
+from .compression import detect_compression
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SCJLIDX1"
+_HEADER = struct.Struct(">8sI")
+# 键(8) + 文件序号(4) + 偏移(8) + 长度(4)
+_RECORD = struct.Struct(">QIQI")
+
+# 依次尝试的ID字段
+DEFAULT_ID_FIELDS = ("id", "aweme_id", "tweet_id")
+
+
+def _key_of(item_id: str) -> int:
+    digest = hashlib.blake2b(str(item_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _record_id(record: Dict[str, Any], id_fields: Sequence[str]) -> Optional[str]:
+    for field in id_fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def _scan_file(path: str, file_no: int, id_fields: Sequence[str]) -> Iterator[Tuple[int, int, int, int]]:
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            length = len(line)
+            stripped = line.rstrip(b"\r\n")
+            if stripped:
+                try:
+                    item_id = _record_id(serialization.loads(stripped), id_fields)
+                except ValueError:
+                    item_id = None
+                if item_id is not None:
+                    yield _key_of(item_id), file_no, offset, len(stripped)
+                else:
+                    logger.debug(f"跳过无ID的行: {path}@{offset}")
+            offset += length
+
+
+def build_index(
+    paths: Sequence[str],
+    index_path: str,
+    id_fields: Sequence[str] = DEFAULT_ID_FIELDS
+) -> int:
+    """
+    构建偏移索引
+
+    同一ID出现多次时保留最后一次出现的位置（后写入的记录较新）
+
+    Args:
+        paths: 未压缩的JSONL文件路径（压缩文件无法按偏移随机访问）
+        index_path: 索引文件输出路径
+        id_fields: 依次尝试的ID字段
+
+    Returns:
+        索引的记录数
+    """
+    for path in paths:
+        if detect_compression(path):
+            raise ValueError(f"压缩文件无法建立偏移索引: {path}")
+    resolved_paths = [str(Path(p).resolve()) for p in paths]
+
+    # 扫描顺序即写入顺序，排序后相同键的条目相邻且按写入先后排列
+    scanned: List[Tuple[int, int, int, int]] = []
+    for file_no, path in enumerate(resolved_paths):
+        scanned.extend(_scan_file(path, file_no, id_fields))
+    scanned.sort(key=lambda entry: entry[0])
+
+    records: List[Tuple[int, int, int, int]] = []
+    position = 0
+    while position < len(scanned):
+        end = position + 1
+        while end < len(scanned) and scanned[end][0] == scanned[position][0]:
+            end += 1
+        if end - position == 1:
+            records.append(scanned[position])
+        else:
+            # 同键多条：可能是同一ID重复出现，也可能是不同ID键冲突，按ID各保留最后一条
+            by_id: Dict[Optional[str], Tuple[int, int, int, int]] = {}
+            for entry in scanned[position:end]:
+                by_id[_read_id(resolved_paths, entry, id_fields)] = entry
+            records.extend(by_id.values())
+        position = end
+    del scanned
+
+    records.sort()
+
+    table = json.dumps(resolved_paths, ensure_ascii=False).encode("utf-8")
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(table)))
+        f.write(table)
+        for record in records:
+            f.write(_RECORD.pack(*record))
+    os.replace(tmp_path, index_path)
+
+    logger.info(f"索引已构建: {len(records)} 条记录 -> {index_path}")
+    return len(records)
+
+
+def _read_id(paths: Sequence[str], entry: Tuple[int, int, int, int], id_fields: Sequence[str]) -> Optional[str]:
+    _, file_no, offset, length = entry
+    with open(paths[file_no], "rb") as f:
+        f.seek(offset)
+        return _record_id(serialization.loads(f.read(length)), id_fields)
+
+
+class JsonlIndex:
+    """
+    JSONL偏移索引
+
+    索引文件和被索引的JSONL文件均通过mmap访问，单次查询只读取目标记录
+    """
+
+    def __init__(self, index_path: str, id_fields: Sequence[str] = DEFAULT_ID_FIELDS):
+        """
+        打开索引
+
+        Args:
+            index_path: build_index 生成的索引文件
+            id_fields: 依次尝试的ID字段（用于键冲突时比对）
+        """
+        self.index_path = index_path
+        self.id_fields = id_fields
+
+        self._index_file = open(index_path, "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, table_len = _HEADER.unpack_from(self._index, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"不是有效的索引文件: {index_path}")
+        table_start = _HEADER.size
+        self.paths: List[str] = json.loads(self._index[table_start:table_start + table_len].decode("utf-8"))
+        self._records_start = table_start + table_len
+        self.size = (len(self._index) - self._records_start) // _RECORD.size
+
+        self._data_maps: Dict[int, mmap.mmap] = {}
+        self._data_files: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _record_at(self, position: int) -> Tuple[int, int, int, int]:
+        return _RECORD.unpack_from(self._index, self._records_start + position * _RECORD.size)
+
+    def _key_at(self, position: int) -> int:
+        return _RECORD.unpack_from(self._index, self._records_start + position * _RECORD.size)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _data_map(self, file_no: int) -> mmap.mmap:
+        data = self._data_maps.get(file_no)
+        if data is None:
+            f = open(self.paths[file_no], "rb")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data_files[file_no] = f
+            self._data_maps[file_no] = data
+        return data
+
+    def _candidates(self, item_id: str) -> Iterator[bytes]:
+        key = _key_of(item_id)
+        position = self._lower_bound(key)
+        while position < self.size:
+            record_key, file_no, offset, length = self._record_at(position)
+            if record_key != key:
+                break
+            yield self._data_map(file_no)[offset:offset + length]
+            position += 1
+
+    def get_raw(self, item_id: str) -> Optional[bytes]:
+        """
+        获取记录的原始JSON字节串
+
+        Args:
+            item_id: 推文ID或aweme_id
+
+        Returns:
+            JSON字节串，不存在时返回None
+        """
+        item_id = str(item_id)
+        candidates = list(self._candidates(item_id))
+        # 单条命中且包含该ID时无需解析；否则（键冲突）逐条解析比对ID
+        if len(candidates) == 1 and item_id.encode("utf-8") in candidates[0]:
+            return candidates[0]
+        for raw in candidates:
+            if _record_id(serialization.loads(raw), self.id_fields) == item_id:
+                return raw
+        return None
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取并解析记录
+
+        Args:
+            item_id: 推文ID或aweme_id
+
+        Returns:
+            记录字典，不存在时返回None
+        """
+        raw = self.get_raw(item_id)
+        return serialization.loads(raw) if raw is not None else None
+
+    def __contains__(self, item_id: str) -> bool:
+        return self.get_raw(item_id) is not None
+
+    def close(self):
+        """关闭所有映射"""
+        for data in self._data_maps.values():
+            data.close()
+        for f in self._data_files.values():
+            f.close()
+        self._data_maps.clear()
+        self._data_files.clear()
+        self._index.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,325 @@
+"""
+热门内容排行榜模块
+流式处理时用大小为N的最小堆保留得分最高的N条内容，内存占用与数据总量无关；
+各用户的排行榜可以多路归并为全局排行榜，只需比较各榜的前N条，无需对全部内容排序
+"""
+
+import heapq
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .aggregators import _StreamAggregator, video_engagement_rate, video_statistics
+from .storage import TWEET, VIDEO
+from .timeutils import to_epoch
+
+# 可选的得分：点赞数、互动率、每小时点赞数
+SCORES = ("likes", "engagement_rate", "velocity")
+
+# 发布不足1小时的内容按1小时计算增速，避免刚发布的内容得分失真
+MIN_AGE_HOURS = 1.0
+
+ScoreFunction = Callable[[Dict[str, Any]], Optional[float]]
+
+
+def _video_created(video: Dict[str, Any]) -> Any:
+    return video.get('create_time')
+
+
+def _tweet_created(tweet: Dict[str, Any]) -> Any:
+    return tweet.get('created_at')
+
+
+def _video_likes(video: Dict[str, Any]) -> int:
+    return video_statistics(video).get('digg_count') or 0
+
+
+def _tweet_likes(tweet: Dict[str, Any]) -> int:
+    return (tweet.get('public_metrics') or {}).get('like_count') or 0
+
+
+def tweet_engagement_rate(tweet: Dict[str, Any]) -> Optional[float]:
+    """
+    计算推文互动率: (点赞 + 转发 + 回复) / 浏览
+
+    Returns:
+        互动率，没有浏览数时返回None
+    """
+    metrics = tweet.get('public_metrics') or {}
+    impressions = metrics.get('impression_count') or 0
+    if impressions <= 0:
+        return None
+    return ((metrics.get('like_count') or 0)
+            + (metrics.get('retweet_count') or 0)
+            + (metrics.get('reply_count') or 0)) / impressions
+
+
+def _velocity(likes: Callable[[Dict[str, Any]], int], created: Callable[[Dict[str, Any]], Any], now: float) -> ScoreFunction:
+    def score(item: Dict[str, Any]) -> Optional[float]:
+        epoch = to_epoch(created(item))
+        if epoch is None:
+            return None
+        age_hours = max(MIN_AGE_HOURS, (now - epoch) / 3600)
+        return likes(item) / age_hours
+    return score
+
+
+def score_function(score: str, kind: str, now: Optional[float] = None) -> ScoreFunction:
+    """
+    按名称获取得分函数
+
+    Args:
+        score: likes（点赞数）、engagement_rate（互动率）或 velocity（每小时点赞数）
+        kind: tweet 或 video
+        now: 计算增速的参考时间，默认为当前时间
+
+    Returns:
+        得分函数，无法计算得分时返回None
+    """
+    if kind not in (TWEET, VIDEO):
+        raise ValueError(f"不支持的类型: {kind}")
+    likes = _video_likes if kind == VIDEO else _tweet_likes
+    if score == "likes":
+        return likes
+    if score == "engagement_rate":
+        return video_engagement_rate if kind == VIDEO else tweet_engagement_rate
+    if score == "velocity":
+        created = _video_created if kind == VIDEO else _tweet_created
+        return _velocity(likes, created, time.time() if now is None else now)
+    raise ValueError(f"不支持的得分: {score}，可选: {', '.join(SCORES)}")
+
+
+def _video_entry(video: Dict[str, Any]) -> Dict[str, Any]:
+    stats = video_statistics(video)
+    author = video.get('author') or {}
+    return {
+        "aweme_id": video.get('aweme_id'),
+        "desc": (video.get('desc', '') or '')[:100],
+        "author": author.get('nickname', '') if isinstance(author, dict) else author,
+        "create_time": video.get('create_time'),
+        "digg_count": stats.get('digg_count', 0),
+        "comment_count": stats.get('comment_count', 0),
+        "share_count": stats.get('share_count', 0),
+        "play_count": stats.get('play_count', 0),
+    }
+
+
+def _tweet_entry(tweet: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = tweet.get('public_metrics') or {}
+    return {
+        "id": tweet.get('id'),
+        "text": (tweet.get('text', '') or '')[:100],
+        "author": tweet.get('author', ''),
+        "created_at": tweet.get('created_at'),
+        "like_count": metrics.get('like_count', 0),
+        "retweet_count": metrics.get('retweet_count', 0),
+        "reply_count": metrics.get('reply_count', 0),
+    }
+
+
+class Leaderboard(_StreamAggregator):
+    """
+    有界排行榜
+
+    保留得分最高的N条内容，每条只保存展示所需的字段；同一内容重复加入时只保留得分最高的一次。
+    得分相同时保留先加入的内容
+    """
+
+    def __init__(
+        self,
+        n: int = 100,
+        score: Union[str, ScoreFunction] = "likes",
+        kind: str = VIDEO,
+        now: Optional[float] = None,
+        formatter: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            n: 保留的内容数量
+            score: 得分名称（likes、engagement_rate、velocity）或得分函数
+            kind: tweet 或 video
+            now: 计算增速的参考时间，默认为当前时间；要合并的排行榜应使用相同的参考时间
+            formatter: 推文格式化函数（如 TwitterClient.format_tweet），为None时视为已格式化
+        """
+        if kind not in (TWEET, VIDEO):
+            raise ValueError(f"不支持的类型: {kind}")
+        self.n = max(1, n)
+        self.kind = kind
+        self.formatter = formatter
+        self.now = time.time() if now is None else now
+        if callable(score):
+            self.score_name = getattr(score, "__name__", "custom")
+            self.score = score
+        else:
+            self.score_name = score
+            self.score = score_function(score, kind, self.now)
+        self.id_field = "aweme_id" if kind == VIDEO else "id"
+        self.count = 0
+        self._heap: List[Tuple[float, int, Any, Dict[str, Any]]] = []
+        # 榜上内容ID -> 得分
+        self._members: Dict[Any, float] = {}
+        self._added = 0
+
+    def __getstate__(self):
+        # 得分函数可能是闭包，不随排行榜在进程间传递，按名称的得分在加载时重建
+        state = self.__dict__.copy()
+        state["score"] = None
+        state["formatter"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.score_name in SCORES:
+            self.score = score_function(self.score_name, self.kind, self.now)
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        加入一条内容
+
+        Returns:
+            是否进入排行榜（无法计算得分或得分不够高时为False）
+        """
+        if self.formatter and self.kind == TWEET:
+            item = self.formatter(item)
+        self.count += 1
+        score = self.score(item)
+        if score is None:
+            return False
+        # 榜满后绝大多数内容得分不超过门槛，无需构造条目
+        if len(self._heap) >= self.n and score <= self._heap[0][0]:
+            return False
+        entry = _video_entry(item) if self.kind == VIDEO else _tweet_entry(item)
+        return self._offer(score, entry)
+
+    def _offer(self, score: float, entry: Dict[str, Any]) -> bool:
+        item_id = entry.get(self.id_field)
+        previous = self._members.get(item_id)
+        if previous is not None:
+            if score <= previous:
+                return False
+            # 已在榜上的内容得分提高（如重新拉取后互动增加），移除旧条目；堆大小为N，重建开销有限
+            self._heap = [node for node in self._heap if node[2] != item_id]
+            heapq.heapify(self._heap)
+            del self._members[item_id]
+
+        # 以负序号作第二关键字，得分相同时先淘汰后加入的内容
+        node = (score, -self._added, item_id, entry)
+        self._added += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, node)
+        elif node[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, node)
+            del self._members[evicted[2]]
+        else:
+            return False
+        self._members[item_id] = score
+        return True
+
+    def merge(self, other: "Leaderboard") -> "Leaderboard":
+        """
+        合并另一个排行榜（其内容视为在本排行榜所有内容之后加入）
+
+        Returns:
+            排行榜自身
+        """
+        if (self.kind, self.score_name) != (other.kind, other.score_name):
+            raise ValueError("只能合并类型和得分相同的排行榜")
+        for score, _, _, entry in sorted(other._heap, key=lambda node: -node[1]):
+            self._offer(score, entry)
+        self.count += other.count
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        按得分降序返回榜上内容
+
+        Args:
+            n: 数量，默认为全部
+
+        Returns:
+            内容列表，每项含 score
+        """
+        ranked = sorted(self._heap, key=lambda node: node[:2], reverse=True)
+        if n is not None:
+            ranked = ranked[:n]
+        return [{**entry, "score": score} for score, _, _, entry in ranked]
+
+    def threshold(self) -> Optional[float]:
+        """进入排行榜所需的最低得分，榜未满时返回None"""
+        if len(self._heap) < self.n:
+            return None
+        return self._heap[0][0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成当前的排行结果
+
+        Returns:
+            包含得分名称、处理的内容数和排行的字典
+        """
+        return {
+            "score": self.score_name,
+            "total_items": self.count,
+            "ranking": self.top(),
+        }
+
+    def __contains__(self, item_id: Any) -> bool:
+        return item_id in self._members
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def iter_merged(
+    rankings: Iterable[Union[Leaderboard, Iterable[Dict[str, Any]]]],
+    id_field: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    多路归并多个排行榜，按得分降序逐条产出
+
+    Args:
+        rankings: 排行榜，或已按得分降序排列、每项含 score 的内容列表（如导出的单用户排行）
+        id_field: 内容ID字段，同一内容出现在多个榜上时只产出得分最高的一次；
+                  默认根据排行榜类型确定，传入列表时需要指定
+
+    Yields:
+        内容，得分相同时先传入的排行榜中的内容在前
+    """
+    streams = []
+    for ranking in rankings:
+        if isinstance(ranking, Leaderboard):
+            id_field = id_field or ranking.id_field
+            streams.append(ranking.top())
+        else:
+            streams.append(ranking)
+
+    seen = set()
+    for entry in heapq.merge(*streams, key=lambda entry: entry["score"], reverse=True):
+        if id_field is not None:
+            item_id = entry.get(id_field)
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+        yield entry
+
+
+def merge_leaderboards(
+    rankings: Iterable[Union[Leaderboard, Iterable[Dict[str, Any]]]],
+    n: int = 100,
+    id_field: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    把多个排行榜归并为前N名的全局排行
+
+    Args:
+        rankings: 排行榜或已按得分降序排列的内容列表
+        n: 全局排行的数量
+        id_field: 内容ID字段，见 iter_merged
+
+    Returns:
+        按得分降序排列的内容列表，每项含 rank 和 score
+    """
+    merged = []
+    for rank, entry in enumerate(islice(iter_merged(rankings, id_field), n), 1):
+        merged.append({**entry, "rank": rank})
+    return merged
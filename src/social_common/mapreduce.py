@@ -0,0 +1,183 @@
+"""
+并行归档分析模块
+把JSONL/Parquet归档切分为分片，在进程池中分别聚合，再合并各分片的部分结果
+
+分片聚合复用 aggregators 中的 TweetAggregator/VideoAggregator，
+指标定义与在线分析完全一致；合并按分片顺序进行，结果与单进程逐条聚合相同
+（分位数为近似值，误差在KLL草图的范围内）
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import serialization
+from .aggregators import TweetAggregator, VideoAggregator
+from .compression import detect_compression, open_input
+from .sinks import MANIFEST_NAME, read_manifest
+from .storage import TWEET, VIDEO
+
+logger = logging.getLogger(__name__)
+
+# 未压缩JSONL按字节范围切分时每个分片的大小
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+_AGGREGATORS = {TWEET: TweetAggregator, VIDEO: VideoAggregator}
+
+# (类型, 路径, 起始偏移, 结束偏移)，结束偏移为None表示整个文件
+Task = Tuple[str, str, int, Optional[int]]
+
+
+def _expand_paths(paths: Iterable[Union[str, Path]]) -> List[Path]:
+    expanded: List[Path] = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir() and (path / MANIFEST_NAME).exists():
+            # 滚动分片目录只读取清单中列出的已完成分片
+            for entry in read_manifest(str(path)):
+                shard = path / entry["file"]
+                if shard.is_file():
+                    expanded.append(shard)
+                else:
+                    logger.warning(f"清单中的分片不存在: {shard}")
+        elif path.is_dir():
+            found = set(path.glob("*.jsonl*")) | set(path.rglob("*.parquet"))
+            # 跳过清单文件和滚动写入中尚未完成的分片
+            expanded.extend(sorted(
+                p for p in found
+                if p.is_file() and p.name != MANIFEST_NAME and not p.name.endswith(".part")
+            ))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def _file_format(path: Path) -> str:
+    return "parquet" if path.suffix == ".parquet" else "jsonl"
+
+
+def plan_chunks(
+    paths: Iterable[Union[str, Path]],
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> List[Task]:
+    """
+    规划分片
+
+    未压缩的JSONL按字节范围切分，压缩的JSONL和Parquet文件各为一个分片
+
+    Args:
+        paths: 文件或目录（目录下查找 *.jsonl* 和 **/*.parquet；含 manifest.jsonl 的分片目录只读取清单中的分片）
+        chunk_bytes: 每个分片的字节数
+
+    Returns:
+        按文件和偏移排列的分片列表
+    """
+    tasks: List[Task] = []
+    for path in _expand_paths(paths):
+        fmt = _file_format(path)
+        if fmt == "parquet" or detect_compression(str(path)):
+            tasks.append((fmt, str(path), 0, None))
+            continue
+        size = path.stat().st_size
+        for start in range(0, max(size, 1), chunk_bytes):
+            tasks.append((fmt, str(path), start, min(start + chunk_bytes, size)))
+    return tasks
+
+
+def _read_lines(path: str, start: int, end: Optional[int]) -> Iterator[bytes]:
+    """读取分片内的行：从起始偏移后的第一个完整行开始，到越过结束偏移的那一行为止"""
+    if end is None:
+        with open_input(path, "rb") as f:
+            yield from f
+        return
+
+    with open(path, "rb") as f:
+        if start > 0:
+            # 起点落在行中间时，该行属于上一个分片
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+
+def _run_task(kind: str, factory: Optional[Callable[[], Any]], task: Task):
+    """工作进程入口：聚合一个分片，返回部分聚合结果和跳过的行数"""
+    fmt, path, start, end = task
+    aggregator = factory() if factory else _AGGREGATORS[kind]()
+    skipped = 0
+
+    if fmt == "parquet":
+        from .columnar import frame_to_tweets, frame_to_videos, read_parquet
+
+        convert = frame_to_tweets if kind == TWEET else frame_to_videos
+        for record in convert(read_parquet(path)):
+            aggregator.add(record)
+        return aggregator, skipped
+
+    for line in _read_lines(path, start, end):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = serialization.loads(line)
+        except ValueError:
+            skipped += 1
+            continue
+        if isinstance(record, dict):
+            aggregator.add(record)
+        else:
+            skipped += 1
+    return aggregator, skipped
+
+
+def analyze_corpus(
+    paths: Sequence[Union[str, Path]],
+    kind: str,
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    factory: Optional[Callable[[], Any]] = None
+) -> Any:
+    """
+    并行分析归档
+
+    Args:
+        paths: JSONL/Parquet文件或目录，推文须为格式化后的记录，视频可为原始或格式化后的记录
+        kind: tweet 或 video
+        workers: 工作进程数，默认为CPU核数；为1时在当前进程内执行
+        chunk_bytes: 未压缩JSONL每个分片的字节数
+        factory: 创建聚合器的可pickle对象（如 functools.partial(EngagementSeries, VIDEO, "day")），
+            聚合器需提供 add 和 merge；默认按类型使用 TweetAggregator/VideoAggregator
+
+    Returns:
+        合并后的聚合器
+    """
+    if kind not in _AGGREGATORS:
+        raise ValueError(f"不支持的类型: {kind}")
+
+    tasks = plan_chunks(paths, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"开始分析 {len(tasks)} 个分片，进程数: {min(workers, max(len(tasks), 1))}")
+
+    merged = factory() if factory else _AGGREGATORS[kind]()
+    skipped = 0
+    if workers <= 1 or len(tasks) <= 1:
+        for partial, task_skipped in (_run_task(kind, factory, task) for task in tasks):
+            merged.merge(partial)
+            skipped += task_skipped
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            # map按提交顺序返回结果，合并顺序固定，并列时的取舍与逐条聚合一致
+            for partial, task_skipped in executor.map(_run_task, [kind] * len(tasks), [factory] * len(tasks), tasks):
+                merged.merge(partial)
+                skipped += task_skipped
+
+    if skipped:
+        logger.warning(f"跳过 {skipped} 行无法解析的记录")
+    return merged
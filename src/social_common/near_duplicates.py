@@ -0,0 +1,329 @@
+"""
+近似重复检测模块
+用MinHash签名估计文本的Jaccard相似度，用LSH分带索引签名：
+每条新记录只与至少一个分带完全相同的记录比较，无需与全部已有记录逐一比较
+
+用于识别转发、复制粘贴的刷屏内容和描述几乎相同的重复上传视频
+"""
+
+import logging
+import os
+import pickle
+import random
+import re
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .dedupe import ID_FIELDS
+from .storage import TWEET
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 梅森素数 2^61-1，排列哈希 (a*h + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 转发前缀、提及和URL不参与比较；其余只保留文字和数字
+_NOISE_PATTERN = re.compile(r"https?://\S+|[@＠]\w+|^rt\b")
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """去除URL、提及和标点空白并转为小写，使仅格式不同的文本一致"""
+    text = _NOISE_PATTERN.sub(" ", (text or "").casefold())
+    return _NON_WORD_PATTERN.sub("", text)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    选择分带数和每带行数
+
+    候选概率曲线的拐点约为 (1/b)^(1/r)，取不高于阈值的最大拐点，
+    相似度达到阈值的记录以高概率成为候选，候选再用签名精确比较
+
+    Returns:
+        (分带数, 每带行数)
+    """
+    best = (num_perm, 1)
+    best_point = -1.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        point = (1 / bands) ** (1 / rows)
+        if best_point < point <= threshold:
+            best, best_point = (bands, rows), point
+    return best
+
+
+class MinHasher:
+    """MinHash签名计算，已安装NumPy时向量化计算，两种实现结果相同"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        Args:
+            num_perm: 签名长度（排列数）
+            seed: 随机种子，相同种子生成的签名可以互相比较
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)
+            self._b = np.array(self.b, dtype=np.uint64)
+
+    def signature(self, hashes: List[int]):
+        """
+        计算签名
+
+        Args:
+            hashes: 各shingle的32位哈希
+
+        Returns:
+            长度为 num_perm 的无符号32位数组（NumPy数组或array('I')）
+        """
+        if np is not None:
+            values = np.array(hashes, dtype=np.uint64)[:, np.newaxis]
+            # uint64乘法按2^64取模回绕，与纯Python实现中的 & _MASK64 一致
+            with np.errstate(over="ignore"):
+                permuted = (values * self._a + self._b) % np.uint64(_MERSENNE_PRIME)
+            return (permuted & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+        signature = array("I", [_MAX_HASH] * self.num_perm)
+        for position, (a, b) in enumerate(zip(self.a, self.b)):
+            signature[position] = min(((a * h + b) & _MASK64) % _MERSENNE_PRIME & _MAX_HASH for h in hashes)
+        return signature
+
+
+def signature_similarity(first, second) -> float:
+    """两个签名中相同位置取值相等的比例，即Jaccard相似度的估计"""
+    if np is not None and isinstance(first, np.ndarray):
+        return float(np.count_nonzero(first == second)) / len(first)
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    增量近似重复索引
+
+    文本按字符n-gram（shingle）计算MinHash签名；签名分为b带，每带r行，
+    任一带相同的记录成为候选，候选的签名相似度达到阈值即判为近似重复
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        min_length: int = 10,
+        capacity: Optional[int] = None,
+        seed: int = 1
+    ):
+        """
+        Args:
+            threshold: 判为近似重复的Jaccard相似度
+            num_perm: 签名长度，越长估计越准、越慢
+            shingle_size: 字符n-gram长度（中文按字切分，3适用于中英文）
+            min_length: 规范化后短于该长度的文本不参与检测（如"哈哈哈"）
+            capacity: 最多索引的记录数，超出后淘汰最早加入的，为None时不限制
+            seed: 随机种子
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("相似度阈值必须在0到1之间")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        self.capacity = capacity
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.signatures: "OrderedDict[Any, Any]" = OrderedDict()
+        self.tables: List[Dict[bytes, List[Any]]] = [{} for _ in range(self.bands)]
+        self.duplicates = 0
+        self.candidates_checked = 0
+        self._anonymous = 0
+
+    def _shingles(self, text: str) -> Set[int]:
+        normalized = normalize_text(text)
+        if len(normalized) < self.min_length:
+            return set()
+        size = self.shingle_size
+        return {
+            zlib.crc32(normalized[start:start + size].encode("utf-8"))
+            for start in range(len(normalized) - size + 1)
+        }
+
+    def signature(self, text: str):
+        """
+        计算文本签名
+
+        Returns:
+            签名，文本过短时返回None
+        """
+        shingles = self._shingles(text)
+        if not shingles:
+            return None
+        return self.hasher.signature(list(shingles))
+
+    def _band_keys(self, signature) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def _query_signature(self, signature, exclude: Any = None) -> List[Tuple[Any, float]]:
+        candidates: Dict[Any, None] = {}
+        for table, key in zip(self.tables, self._band_keys(signature)):
+            for item_id in table.get(key, ()):
+                candidates[item_id] = None
+        candidates.pop(exclude, None)
+
+        matches = []
+        for item_id in candidates:
+            self.candidates_checked += 1
+            similarity = signature_similarity(signature, self.signatures[item_id])
+            if similarity >= self.threshold:
+                matches.append((item_id, similarity))
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches
+
+    def query(self, text: str) -> List[Tuple[Any, float]]:
+        """
+        查找与文本近似重复的已索引记录
+
+        Args:
+            text: 文本
+
+        Returns:
+            按相似度降序排列的 (记录ID, 相似度) 列表
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        return self._query_signature(signature)
+
+    def _insert(self, item_id: Any, signature):
+        self.signatures[item_id] = signature
+        for table, key in zip(self.tables, self._band_keys(signature)):
+            table.setdefault(key, []).append(item_id)
+        if self.capacity is not None and len(self.signatures) > self.capacity:
+            self.remove(next(iter(self.signatures)))
+
+    def add(self, item_id: Any, text: str) -> bool:
+        """
+        索引一条记录（不检查重复）
+
+        Returns:
+            是否已索引（文本过短或ID已存在时不索引）
+        """
+        if item_id in self.signatures:
+            return False
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self._insert(item_id, signature)
+        return True
+
+    def check(self, item_id: Any, text: str) -> Optional[Tuple[Any, float]]:
+        """
+        检查记录是否与已索引记录近似重复；不重复时将其加入索引
+
+        近似重复的记录不加入索引，索引中只保留每组内容最早出现的一条
+
+        Args:
+            item_id: 记录ID
+            text: 文本
+
+        Returns:
+            最相似的已索引记录 (记录ID, 相似度)，不重复时返回None
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        matches = self._query_signature(signature, exclude=item_id)
+        if matches:
+            self.duplicates += 1
+            return matches[0]
+        if item_id not in self.signatures:
+            self._insert(item_id, signature)
+        return None
+
+    def remove(self, item_id: Any) -> bool:
+        """从索引中移除记录"""
+        signature = self.signatures.pop(item_id, None)
+        if signature is None:
+            return False
+        for table, key in zip(self.tables, self._band_keys(signature)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.remove(item_id)
+                if not bucket:
+                    del table[key]
+        return True
+
+    def check_record(self, kind: str, record: Dict[str, Any]) -> Optional[Tuple[Any, float]]:
+        """
+        按记录类型取ID和文本后调用 check；没有ID的记录用序号占位，仍参与检测
+
+        流式逐条检测和 filter_new 都经过此方法，同一索引文件中的ID格式一致
+
+        Args:
+            kind: tweet 或 video
+            record: 原始或格式化后的记录
+
+        Returns:
+            同 check
+        """
+        if kind == TWEET:
+            text = record.get('text') or record.get('full_text') or ""
+        else:
+            text = record.get('desc') or ""
+        item_id = record.get(ID_FIELDS[kind])
+        if item_id in (None, ""):
+            self._anonymous += 1
+            item_id = f"#{self._anonymous}"
+        match = self.check(str(item_id), text)
+        if match is not None:
+            logger.debug(f"近似重复: {item_id} ≈ {match[0]} (相似度 {match[1]:.2f})")
+        return match
+
+    def filter_new(self, kind: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        过滤掉与已索引记录近似重复的记录（接口与 SeenStore.filter_new 相同，可作为客户端的dedupe参数）
+
+        Args:
+            kind: tweet 或 video
+            records: 原始或格式化后的记录
+
+        Yields:
+            非近似重复的记录
+        """
+        for record in records:
+            if self.check_record(kind, record) is None:
+                yield record
+
+    def save(self, path: str):
+        """保存索引（先写临时文件再替换）"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NearDuplicateIndex":
+        """加载 save 保存的索引"""
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if not isinstance(index, cls):
+            raise ValueError(f"不是近似重复索引文件: {path}")
+        return index
+
+    def __contains__(self, item_id: Any) -> bool:
+        return item_id in self.signatures
+
+    def __len__(self) -> int:
+        return len(self.signatures)
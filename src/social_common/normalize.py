@@ -0,0 +1,206 @@
+"""
+数据规范化模块
+将推文/视频中重复嵌入的作者、音乐对象提取到按ID索引的共享表中，
+条目只保留对应的键引用
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 作者对象的候选主键（抖音原始数据 / 格式化数据 / Twitter原始数据）
+AUTHOR_KEY_FIELDS = ("sec_uid", "uid", "id", "rest_id", "unique_id", "username", "screen_name")
+
+# 音乐对象的候选主键
+MUSIC_KEY_FIELDS = ("id_str", "mid", "id")
+
+
+class EntityTable:
+    """
+    实体驻留表
+
+    相同ID的对象只保存一份，重复出现时以最新的对象为准
+    """
+
+    def __init__(self, key_fields: Tuple[str, ...]):
+        """
+        初始化实体表
+
+        Args:
+            key_fields: 按优先级排列的候选主键字段
+        """
+        self.key_fields = key_fields
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def key_of(self, obj: Dict[str, Any]) -> Optional[str]:
+        """
+        计算对象的主键
+
+        Args:
+            obj: 实体对象
+
+        Returns:
+            主键字符串，无法确定时返回None
+        """
+        for field in self.key_fields:
+            value = obj.get(field)
+            if value not in (None, ""):
+                return str(value)
+
+        # 格式化后的音乐对象没有ID，退化为标题+作者
+        if obj.get("title") or obj.get("author"):
+            return f"{obj.get('title', '')}|{obj.get('author', '')}"
+        return None
+
+    def intern(self, obj: Dict[str, Any]) -> Optional[str]:
+        """
+        驻留实体对象
+
+        Args:
+            obj: 实体对象
+
+        Returns:
+            实体主键，无法确定主键时返回None
+        """
+        key = self.key_of(obj)
+        if key is not None:
+            self._entries[key] = obj
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """按主键获取实体"""
+        return self._entries.get(key)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """导出为 {主键: 实体} 字典"""
+        return dict(self._entries)
+
+    def update(self, entries: Dict[str, Dict[str, Any]]):
+        """批量载入已有实体"""
+        self._entries.update(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+
+class CorpusNormalizer:
+    """
+    语料规范化器
+
+    将条目中的 ``author`` / ``music`` 对象替换为 ``author_id`` / ``music_id``
+    引用，实体本身保存在共享表中
+    """
+
+    def __init__(self):
+        self.authors = EntityTable(AUTHOR_KEY_FIELDS)
+        self.music = EntityTable(MUSIC_KEY_FIELDS)
+
+    def normalize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        规范化单个条目
+
+        Args:
+            item: 推文或视频数据
+
+        Returns:
+            引用共享表的新条目（浅拷贝，原条目不变）
+        """
+        if not isinstance(item, dict):
+            return item
+
+        normalized = item
+        for field, table in (("author", self.authors), ("music", self.music)):
+            entity = item.get(field)
+            if not isinstance(entity, dict):
+                continue
+
+            key = table.intern(entity)
+            if key is None:
+                continue
+
+            if normalized is item:
+                normalized = dict(item)
+            del normalized[field]
+            normalized[f"{field}_id"] = key
+
+        return normalized
+
+    def normalize(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量规范化条目"""
+        return [self.normalize_item(item) for item in items]
+
+    def denormalize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        还原单个条目的内嵌实体
+
+        Args:
+            item: 规范化后的条目
+
+        Returns:
+            内嵌 ``author`` / ``music`` 对象的条目
+        """
+        if not isinstance(item, dict):
+            return item
+
+        restored = item
+        for field, table in (("author", self.authors), ("music", self.music)):
+            key = item.get(f"{field}_id")
+            if key is None or key not in table:
+                continue
+
+            if restored is item:
+                restored = dict(item)
+            del restored[f"{field}_id"]
+            restored[field] = table.get(key)
+
+        return restored
+
+    def tables(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """导出共享实体表"""
+        return {
+            "authors": self.authors.to_dict(),
+            "music": self.music.to_dict(),
+        }
+
+
+def normalize_corpus(items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    规范化整个语料
+
+    Args:
+        items: 推文或视频列表
+
+    Returns:
+        包含 authors、music 共享表以及 items 的字典
+    """
+    normalizer = CorpusNormalizer()
+    normalized_items = normalizer.normalize(items)
+
+    result = normalizer.tables()
+    result["items"] = normalized_items
+
+    logger.debug(
+        f"规范化完成: {len(normalized_items)} 个条目, "
+        f"{len(normalizer.authors)} 个作者, {len(normalizer.music)} 个音乐"
+    )
+    return result
+
+
+def denormalize_corpus(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    还原规范化后的语料
+
+    Args:
+        data: normalize_corpus 的输出
+
+    Returns:
+        内嵌实体的条目列表
+    """
+    normalizer = CorpusNormalizer()
+    normalizer.authors.update(data.get("authors", {}))
+    normalizer.music.update(data.get("music", {}))
+    return [normalizer.denormalize_item(item) for item in data.get("items", [])]
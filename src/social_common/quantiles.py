@@ -0,0 +1,218 @@
+"""
+分位数草图模块
+KLL草图单遍估计分位数，内存占用与数据量无关，
+同一指标的多个草图（如各用户、各分片）可以合并，合并结果与在全部数据上构建的草图等价
+"""
+
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 快照中输出的分位点
+DEFAULT_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class KLLSketch:
+    """
+    KLL分位数草图（Karnin-Lang-Liberty）
+
+    第h层的每个元素代表2^h个原始值；某层满时排序后随机保留奇数位或偶数位的元素提升到上一层。
+    k=200时排名误差约为1.5%，最小值和最大值精确
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: Optional[int] = None):
+        """
+        Args:
+            k: 精度参数，越大越精确、占用越多
+            c: 相邻层容量的衰减系数
+            seed: 随机种子，固定后结果可复现
+        """
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.compactors: List[List[float]] = []
+        self._size = 0
+        self._max_size = 0
+        self._rng = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            items = self.compactors[level]
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 >= len(self.compactors):
+                self._grow()
+
+            items.sort()
+            # 奇数个元素时最大的一个留在本层
+            leftover = [items.pop()] if len(items) % 2 else []
+            promoted = items[self._rng.getrandbits(1)::2]
+            self.compactors[level] = leftover
+            self.compactors[level + 1].extend(promoted)
+
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def update(self, value: float):
+        """
+        加入一个值
+
+        Args:
+            value: 数值
+        """
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        self.compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]):
+        """
+        加入多个值
+
+        整批放入第0层后统一压缩，比逐个 update 快得多；
+        一次压缩的排名误差只与层的权重有关，与该层元素数量无关
+        """
+        values = list(values)
+        if not values:
+            return
+        self.count += len(values)
+        low, high = min(values), max(values)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+        self.compactors[0].extend(values)
+        self._size += len(values)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        合并另一个草图
+
+        Args:
+            other: 同一指标的草图
+
+        Returns:
+            草图自身
+        """
+        if not other.count:
+            return self
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def _weighted_items(self) -> List[Tuple[float, int]]:
+        weighted = [(value, 1 << level) for level, items in enumerate(self.compactors) for value in items]
+        weighted.sort()
+        return weighted
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        估计分位数
+
+        Args:
+            q: 分位点，0到1之间
+
+        Returns:
+            估计值，草图为空时返回None
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """
+        一次估计多个分位数（只排序一次）
+
+        Args:
+            qs: 分位点列表
+
+        Returns:
+            与分位点一一对应的估计值
+        """
+        if not self.count:
+            return [None] * len(qs)
+
+        weighted = self._weighted_items()
+        total = sum(weight for _, weight in weighted)
+        results: List[Optional[float]] = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+                continue
+            if q >= 1:
+                results.append(self.max)
+                continue
+            target = q * total
+            cumulative = 0
+            value = self.max
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    value = item
+                    break
+            results.append(value)
+        return results
+
+    def rank(self, value: float) -> float:
+        """
+        估计不大于给定值的数据比例
+
+        Args:
+            value: 数值
+
+        Returns:
+            0到1之间的比例
+        """
+        if not self.count:
+            return 0.0
+        weighted = self._weighted_items()
+        total = sum(weight for _, weight in weighted)
+        return sum(weight for item, weight in weighted if item <= value) / total
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[float]]:
+        """
+        生成分位数摘要
+
+        Args:
+            percentiles: 分位点
+
+        Returns:
+            形如 {"min": .., "p50": .., "p90": .., "p99": .., "max": ..} 的字典
+        """
+        summary: Dict[str, Optional[float]] = {"min": self.min}
+        for q, value in zip(percentiles, self.quantiles(percentiles)):
+            summary[f"p{q * 100:g}"] = value
+        summary["max"] = self.max
+        return summary
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,83 @@
+"""
+原始数据透传模块
+跳过 _to_dict()/_to_list() 转换和格式化，直接把F2处理器返回的原始页面交给输出端，
+只提取条目ID和分页游标
+"""
+
+import inspect
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def _first_attr(page: Any, names: Sequence[str]) -> Any:
+    """按顺序读取第一个存在且非空的属性"""
+    for name in names:
+        try:
+            value = getattr(page, name)
+        except Exception:
+            continue
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _as_id_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v not in (None, "")]
+    return [str(value)]
+
+
+def build_raw_page(
+    page: Any,
+    platform: str,
+    user_id: str,
+    id_attrs: Sequence[str],
+    cursor_attrs: Sequence[str],
+) -> Dict[str, Any]:
+    """
+    从F2过滤器对象构建原始页面记录
+
+    Args:
+        page: F2处理器产出的页面对象（需提供 _to_raw()）
+        platform: 平台名称，twitter 或 douyin
+        user_id: 用户ID
+        id_attrs: 条目ID属性名候选
+        cursor_attrs: 分页游标属性名候选
+
+    Returns:
+        原始页面记录，raw字段为处理器的原始JSON
+    """
+    has_more = _first_attr(page, ("has_more", "hasMore"))
+    return {
+        "platform": platform,
+        "user_id": user_id,
+        "cursor": _first_attr(page, cursor_attrs),
+        "has_more": bool(has_more) if has_more is not None else None,
+        "ids": _as_id_list(_first_attr(page, id_attrs)),
+        "fetched_at": time.time(),
+        "raw": page._to_raw(),
+    }
+
+
+async def write_to_sink(sink: Optional[Any], record: Dict[str, Any]):
+    """
+    写入输出端
+
+    输出端只需提供 write(record) 方法，同步或异步均可；
+    提供 awrite 时（如 ThreadedSink）优先使用，队列满时不阻塞事件循环
+
+    Args:
+        sink: 输出端，为None时不写入
+        record: 要写入的记录
+    """
+    if sink is None:
+        return
+    awrite = getattr(sink, "awrite", None)
+    if awrite is not None:
+        await awrite(record)
+        return
+    result = sink.write(record)
+    if inspect.isawaitable(result):
+        await result
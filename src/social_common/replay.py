@@ -0,0 +1,277 @@
+"""
+原始响应录制与回放模块
+录制F2处理器返回的每一页原始数据到按内容寻址的压缩归档，
+回放时由归档直接提供页面，无需网络即可重跑解析和格式化逻辑
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from . import serialization
+from .compression import open_input, open_output
+
+logger = logging.getLogger(__name__)
+
+# 产出多页数据的异步生成器方法
+STREAM_METHODS = ("fetch_post_tweet", "fetch_user_post_videos")
+
+# 返回单页数据的协程方法
+SINGLE_METHODS = ("fetch_user_profile", "fetch_one_video")
+
+# 回放时允许重建的页面类型（上述方法返回的F2过滤器），
+# 归档可能来自他人，其余类型一律不导入，回放为 ReplayPage
+REPLAY_PAGE_TYPES = frozenset((
+    "f2.apps.twitter.filter:PostTweetFilter",
+    "f2.apps.twitter.filter:UserProfileFilter",
+    "f2.apps.douyin.filter:UserPostFilter",
+    "f2.apps.douyin.filter:UserProfileFilter",
+    "f2.apps.douyin.filter:PostDetailFilter",
+))
+
+
+class ReplayMiss(KeyError):
+    """归档中没有对应请求的录制数据"""
+    pass
+
+
+def _atomic_write(path: Path, data: bytes, compress: Optional[str] = None):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open_output(str(tmp_path), "wb", compress=compress) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResponseArchive:
+    """
+    按内容寻址的响应归档
+
+    目录结构:
+        objects/ab/abcdef....json.gz  页面原始数据，以SHA-256命名，内容相同只存一份
+        requests/<请求键>.json         请求参数及按顺序排列的页面摘要
+    """
+
+    def __init__(self, root: str):
+        """
+        打开或创建归档
+
+        Args:
+            root: 归档根目录
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.requests_dir = self.root / "requests"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.requests_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def request_key(method: str, kwargs: Dict[str, Any]) -> str:
+        """
+        计算请求键，相同方法和参数得到相同的键
+
+        Args:
+            method: 处理器方法名
+            kwargs: 调用参数
+
+        Returns:
+            请求键（十六进制）
+        """
+        # 使用标准库json保证键顺序和格式稳定
+        canonical = json.dumps([method, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json.gz"
+
+    def put_object(self, raw: Any) -> str:
+        """
+        保存一页原始数据
+
+        Args:
+            raw: 原始JSON数据
+
+        Returns:
+            内容摘要
+        """
+        data = serialization.dumps_bytes(raw)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            _atomic_write(path, data, compress="gzip")
+        return digest
+
+    def get_object(self, digest: str) -> Any:
+        """按摘要读取一页原始数据"""
+        with open_input(str(self._object_path(digest)), "rb") as f:
+            return serialization.loads(f.read())
+
+    def save_request(self, method: str, kwargs: Dict[str, Any], pages: List[Dict[str, Any]]):
+        """
+        保存一次请求的页面列表（覆盖同一请求的旧录制）
+
+        Args:
+            method: 处理器方法名
+            kwargs: 调用参数
+            pages: 按顺序排列的页面条目，包含 digest 和 type
+        """
+        key = self.request_key(method, kwargs)
+        manifest = {
+            "method": method,
+            "kwargs": kwargs,
+            "recorded_at": time.time(),
+            "pages": pages,
+        }
+        _atomic_write(
+            self.requests_dir / f"{key}.json",
+            json.dumps(manifest, ensure_ascii=False, default=str).encode("utf-8")
+        )
+
+    def load_request(self, method: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        读取一次请求的录制
+
+        Raises:
+            ReplayMiss: 没有对应的录制
+        """
+        path = self.requests_dir / f"{self.request_key(method, kwargs)}.json"
+        if not path.exists():
+            raise ReplayMiss(f"没有录制数据: {method}({kwargs})")
+        with open(path, "rb") as f:
+            return serialization.loads(f.read())
+
+    def iter_requests(self):
+        """遍历所有请求录制"""
+        for path in sorted(self.requests_dir.glob("*.json")):
+            with open(path, "rb") as f:
+                yield serialization.loads(f.read())
+
+
+def _type_name(obj: Any) -> str:
+    cls = type(obj)
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+class ReplayPage:
+    """
+    回放页面
+
+    无法重建F2过滤器对象时使用，提供与过滤器相同的 _to_raw/_to_dict/_to_list 接口
+    """
+
+    def __init__(self, raw: Any):
+        self._raw = raw
+
+    def _to_raw(self) -> Any:
+        return self._raw
+
+    def _to_dict(self) -> Any:
+        return self._raw
+
+    def _to_list(self) -> List[Any]:
+        return self._raw if isinstance(self._raw, list) else [self._raw]
+
+
+def _rebuild_page(raw: Any, type_name: Optional[str]) -> Any:
+    """
+    按录制时的类型重建页面对象，使F2的解析逻辑在回放时重新执行
+
+    只重建 REPLAY_PAGE_TYPES 中的类型，其余类型不导入，直接回放为 ReplayPage
+    """
+    if type_name in REPLAY_PAGE_TYPES:
+        module_name, _, class_name = type_name.partition(":")
+        try:
+            return getattr(importlib.import_module(module_name), class_name)(raw)
+        except Exception as e:
+            logger.debug(f"无法重建页面类型 {type_name}: {e}")
+    elif type_name:
+        logger.debug(f"页面类型不在允许列表中，按原始数据回放: {type_name}")
+    return ReplayPage(raw)
+
+
+class RecordingHandler:
+    """
+    录制处理器
+
+    包装F2处理器，透明地把 fetch_post_tweet、fetch_user_post_videos、
+    fetch_user_profile、fetch_one_video 返回的原始页面写入归档，
+    其余属性直接转发给被包装的处理器
+    """
+
+    def __init__(self, handler: Any, archive: ResponseArchive):
+        """
+        初始化录制处理器
+
+        Args:
+            handler: TwitterHandler 或 DouyinHandler
+            archive: 响应归档
+        """
+        self.handler = handler
+        self.archive = archive
+
+    def __getattr__(self, name: str) -> Any:
+        if name in STREAM_METHODS:
+            return lambda **kwargs: self._record_stream(name, kwargs)
+        if name in SINGLE_METHODS:
+            return lambda **kwargs: self._record_single(name, kwargs)
+        return getattr(self.handler, name)
+
+    def _record_page(self, page: Any) -> Dict[str, Any]:
+        return {"digest": self.archive.put_object(page._to_raw()), "type": _type_name(page)}
+
+    async def _record_stream(self, method: str, kwargs: Dict[str, Any]) -> AsyncGenerator[Any, None]:
+        pages = []
+        try:
+            async for page in getattr(self.handler, method)(**kwargs):
+                pages.append(self._record_page(page))
+                yield page
+        finally:
+            # 中途停止时也保存已录制的页面
+            self.archive.save_request(method, kwargs, pages)
+            logger.debug(f"已录制 {method}: {len(pages)} 页")
+
+    async def _record_single(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        page = await getattr(self.handler, method)(**kwargs)
+        self.archive.save_request(method, kwargs, [self._record_page(page)])
+        return page
+
+
+class ReplayHandler:
+    """
+    回放处理器
+
+    以与F2处理器相同的接口从归档提供页面，不发起网络请求、不等待
+    """
+
+    def __init__(self, archive: ResponseArchive):
+        """
+        初始化回放处理器
+
+        Args:
+            archive: 响应归档
+        """
+        self.archive = archive
+
+    def __getattr__(self, name: str) -> Any:
+        if name in STREAM_METHODS:
+            return lambda **kwargs: self._replay_stream(name, kwargs)
+        if name in SINGLE_METHODS:
+            return lambda **kwargs: self._replay_single(name, kwargs)
+        raise AttributeError(name)
+
+    def _load_page(self, entry: Dict[str, Any]) -> Any:
+        return _rebuild_page(self.archive.get_object(entry["digest"]), entry.get("type"))
+
+    async def _replay_stream(self, method: str, kwargs: Dict[str, Any]) -> AsyncGenerator[Any, None]:
+        manifest = self.archive.load_request(method, kwargs)
+        for entry in manifest["pages"]:
+            yield self._load_page(entry)
+
+    async def _replay_single(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        manifest = self.archive.load_request(method, kwargs)
+        return self._load_page(manifest["pages"][0])
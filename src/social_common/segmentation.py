@@ -0,0 +1,385 @@
+"""
+中文分词模块
+用jieba把推文和视频描述切分为关键词，分词在进程池中并行执行（jieba为纯Python实现，受GIL限制），
+结果按文本摘要缓存，转发、重复上传等相同文本只分词一次；
+关键词计数使用固定内存的 Space-Saving，并可生成词云
+
+依赖text扩展: pip install twitter-client[text]
+"""
+
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .aggregators import HASHTAG_CAPACITY, _StreamAggregator
+from .heavy_hitters import SpaceSaving
+from .storage import TWEET, VIDEO
+
+logger = logging.getLogger(__name__)
+
+try:
+    import jieba
+except ImportError:
+    jieba = None
+
+try:
+    from wordcloud import WordCloud
+except ImportError:
+    WordCloud = None
+
+# 话题、提及和URL由实体提取单独统计，分词前移除
+_ENTITY_PATTERN = re.compile(r"https?://\S+|[#＃]\w+|[@＠]\w+")
+
+# 常见的无意义词
+STOPWORDS = frozenset("""
+的 了 和 是 就 都 而 及 与 着 或 一个 没有 我们 你们 他们 她们 它们 这个 那个 这些 那些 这样 那样
+自己 什么 怎么 为什么 因为 所以 但是 如果 还是 就是 可以 不是 一下 一些 已经 现在 时候 真的 还有
+今天 大家 这里 那里 然后 其实 非常 觉得 知道 the a an and or of to in on for with at by from is are
+was were be been it this that these those you your we our they their he she his her i me my rt amp
+""".split())
+
+# 每个分词任务包含的文本数
+DEFAULT_BATCH_SIZE = 256
+
+# 待分词文本少于该数量时在当前进程内执行，避免进程间传输的开销
+MIN_PARALLEL_TEXTS = 1024
+
+
+def _require_jieba():
+    if jieba is None:
+        raise ImportError("中文分词需要jieba，请安装: pip install twitter-client[text]")
+
+
+def _init_worker(user_dict: Optional[str] = None):
+    """初始化jieba词典（每个进程一次）"""
+    jieba.setLogLevel(logging.WARNING)
+    if user_dict:
+        jieba.load_userdict(user_dict)
+    jieba.initialize()
+
+
+def _keep(token: str) -> bool:
+    # 单字多为虚词，纯数字和标点不作为关键词
+    if len(token) < 2 or token in STOPWORDS or token.isdigit():
+        return False
+    return any(char.isalnum() for char in token)
+
+
+def segment_text(text: str) -> List[str]:
+    """
+    切分单条文本为关键词
+
+    Args:
+        text: 推文或视频描述
+
+    Returns:
+        关键词列表（英文转为小写），按出现顺序排列
+    """
+    _require_jieba()
+    cleaned = _ENTITY_PATTERN.sub(" ", text or "")
+    tokens = []
+    for token in jieba.lcut(cleaned):
+        token = token.strip().lower()
+        if _keep(token):
+            tokens.append(token)
+    return tokens
+
+
+def _segment_batch(texts: Sequence[str]) -> List[List[str]]:
+    """工作进程入口：切分一批文本"""
+    return [segment_text(text) for text in texts]
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class Segmenter:
+    """
+    带缓存的并行分词器
+
+    缓存以文本的BLAKE2b摘要为键、按最近使用淘汰；
+    未命中的文本达到 MIN_PARALLEL_TEXTS 条时分批提交到进程池
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_size: int = 100_000,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        user_dict: Optional[str] = None
+    ):
+        """
+        Args:
+            workers: 分词进程数，默认为CPU核数；为1时在当前进程内分词
+            cache_size: 缓存的文本数量
+            batch_size: 每个分词任务的文本数
+            user_dict: jieba自定义词典路径
+        """
+        _require_jieba()
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.user_dict = user_dict
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[bytes, Tuple[str, ...]]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._initialized = False
+
+    def _ensure_local(self):
+        if not self._initialized:
+            _init_worker(self.user_dict)
+            self._initialized = True
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.user_dict,)
+            )
+        return self._executor
+
+    def _remember(self, key: bytes, tokens: Tuple[str, ...]):
+        self._cache[key] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def segment(self, text: str) -> List[str]:
+        """
+        切分单条文本（在当前进程内执行）
+
+        Args:
+            text: 文本
+
+        Returns:
+            关键词列表
+        """
+        return self.segment_many([text])[0]
+
+    def segment_many(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        切分多条文本
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            与输入一一对应的关键词列表
+        """
+        keys = [_text_key(text or "") for text in texts]
+        # 同一批内重复的文本也只分词一次
+        pending: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            elif key in pending:
+                self.hits += 1
+            else:
+                pending[key] = text or ""
+                self.misses += 1
+
+        if pending:
+            # 新结果先放入本地表：缓存小于本批文本数时，加入缓存的条目可能在取用前就被淘汰
+            fresh = dict(zip(pending, self._run(list(pending.values()))))
+            for key, tokens in fresh.items():
+                self._remember(key, tokens)
+        else:
+            fresh = {}
+
+        return [list(fresh[key]) if key in fresh else list(self._cache[key]) for key in keys]
+
+    def _run(self, texts: List[str]) -> List[Tuple[str, ...]]:
+        if self.workers <= 1 or len(texts) < MIN_PARALLEL_TEXTS:
+            self._ensure_local()
+            return [tuple(segment_text(text)) for text in texts]
+
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        results: List[Tuple[str, ...]] = []
+        for batch in self._pool().map(_segment_batch, batches):
+            results.extend(tuple(tokens) for tokens in batch)
+        return results
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def item_text(item: Dict[str, Any], kind: str) -> str:
+    """获取推文正文或视频描述"""
+    return (item.get('text') if kind == TWEET else item.get('desc')) or ""
+
+
+class KeywordAggregator(_StreamAggregator):
+    """
+    关键词聚合器
+
+    逐条加入时按条分词；consume 按批分词以利用进程池。
+    关键词计数为固定内存的 Space-Saving，可以合并
+    """
+
+    def __init__(
+        self,
+        kind: str = TWEET,
+        segmenter: Optional[Segmenter] = None,
+        capacity: int = HASHTAG_CAPACITY,
+        batch_size: int = 4096
+    ):
+        """
+        Args:
+            kind: tweet 或 video
+            segmenter: 分词器，默认在当前进程内分词
+            capacity: 最多跟踪的关键词数
+            batch_size: consume 每次分词的记录数
+        """
+        if kind not in (TWEET, VIDEO):
+            raise ValueError(f"不支持的类型: {kind}")
+        self.kind = kind
+        self.segmenter = segmenter or Segmenter(workers=1)
+        self.batch_size = batch_size
+        self.keywords = SpaceSaving(capacity)
+        self.count = 0
+
+    def __getstate__(self):
+        # 分词器持有进程池和缓存，不随聚合结果在进程间传递
+        state = self.__dict__.copy()
+        state["segmenter"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def add_tokens(self, tokens: Iterable[str]):
+        """加入一条记录的关键词"""
+        self.count += 1
+        for token in tokens:
+            self.keywords.add(token)
+
+    def add(self, item: Dict[str, Any]):
+        """加入一条记录"""
+        if self.segmenter is None:
+            self.segmenter = Segmenter(workers=1)
+        self.add_tokens(self.segmenter.segment(item_text(item, self.kind)))
+
+    def consume(self, items: Iterable[Dict[str, Any]]) -> "KeywordAggregator":
+        """
+        按批分词并聚合
+
+        Returns:
+            聚合器自身
+        """
+        batch: List[str] = []
+        for item in items:
+            batch.append(item_text(item, self.kind))
+            if len(batch) >= self.batch_size:
+                self._add_batch(batch)
+                batch = []
+        if batch:
+            self._add_batch(batch)
+        return self
+
+    def _add_batch(self, texts: List[str]):
+        if self.segmenter is None:
+            self.segmenter = Segmenter(workers=1)
+        for tokens in self.segmenter.segment_many(texts):
+            self.add_tokens(tokens)
+
+    def merge(self, other: "KeywordAggregator") -> "KeywordAggregator":
+        """合并另一个聚合器的结果"""
+        self.keywords.merge(other.keywords)
+        self.count += other.count
+        return self
+
+    def top(self, n: int = 20) -> List[Tuple[str, int]]:
+        """出现最多的关键词"""
+        return self.keywords.top(n)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成当前的分析结果
+
+        Returns:
+            包含记录数和热门关键词的字典
+        """
+        return {
+            "total_items": self.count,
+            "top_keywords": self.top(),
+        }
+
+    def wordcloud(
+        self,
+        path: str,
+        font_path: Optional[str] = None,
+        max_words: int = 200,
+        width: int = 1200,
+        height: int = 800
+    ) -> str:
+        """
+        按关键词频次生成词云图片
+
+        Args:
+            path: 输出图片路径（如 wordcloud.png）
+            font_path: 字体文件路径，包含中文关键词时需要指定中文字体
+            max_words: 最多展示的关键词数
+            width: 图片宽度
+            height: 图片高度
+
+        Returns:
+            图片路径
+        """
+        return generate_wordcloud(dict(self.top(max_words)), path, font_path, width, height)
+
+
+def generate_wordcloud(
+    frequencies: Dict[str, int],
+    path: str,
+    font_path: Optional[str] = None,
+    width: int = 1200,
+    height: int = 800
+) -> str:
+    """
+    按词频生成词云图片
+
+    Args:
+        frequencies: 词 -> 频次
+        path: 输出图片路径
+        font_path: 字体文件路径，包含中文时需要指定中文字体
+        width: 图片宽度
+        height: 图片高度
+
+    Returns:
+        图片路径
+    """
+    if WordCloud is None:
+        raise ImportError("生成词云需要wordcloud，请安装: pip install twitter-client[text]")
+    if not frequencies:
+        raise ValueError("没有可用于生成词云的关键词")
+    if font_path is None and any(not word.isascii() for word in frequencies):
+        logger.warning("未指定中文字体，词云中的中文可能无法显示")
+
+    cloud = WordCloud(
+        font_path=font_path,
+        width=width,
+        height=height,
+        background_color="white",
+        collocations=False
+    )
+    cloud.generate_from_frequencies(frequencies)
+    cloud.to_file(path)
+    logger.info(f"词云已生成: {path}")
+    return path
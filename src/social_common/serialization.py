@@ -0,0 +1,165 @@
+"""
+JSON序列化模块
+优先使用orjson/ujson加速编解码，未安装时回退到标准库json
+
+可通过环境变量 SOCIAL_JSON_BACKEND (orjson/ujson/json) 强制指定后端
+"""
+
+import json
+import logging
+import os
+from typing import Any, IO, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+AVAILABLE_BACKENDS = tuple(
+    name for name, module in (("orjson", orjson), ("ujson", ujson), ("json", json))
+    if module is not None
+)
+
+_backend = AVAILABLE_BACKENDS[0]
+
+
+def get_backend() -> str:
+    """
+    获取当前使用的JSON后端
+
+    Returns:
+        后端名称: orjson、ujson 或 json
+    """
+    return _backend
+
+
+def set_backend(name: str):
+    """
+    切换JSON后端
+
+    Args:
+        name: 后端名称: orjson、ujson 或 json
+    """
+    global _backend
+    if name not in AVAILABLE_BACKENDS:
+        raise ValueError(f"JSON后端不可用: {name}，可用后端: {', '.join(AVAILABLE_BACKENDS)}")
+    _backend = name
+    logger.debug(f"JSON后端: {name}")
+
+
+def _stdlib_dumps(obj: Any, indent: bool) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    序列化为UTF-8字节串
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否使用2空格缩进
+
+    Returns:
+        JSON字节串（非ASCII字符不转义）
+    """
+    if _backend == "orjson":
+        try:
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # orjson不支持的类型（如超过64位的整数）交给标准库处理
+            return _stdlib_dumps(obj, indent).encode("utf-8")
+    return dumps(obj, indent=indent).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    序列化为字符串
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否使用2空格缩进
+
+    Returns:
+        JSON字符串（非ASCII字符不转义）
+    """
+    if _backend == "orjson":
+        return dumps_bytes(obj, indent=indent).decode("utf-8")
+
+    if _backend == "ujson":
+        try:
+            return ujson.dumps(
+                obj,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                indent=2 if indent else 0,
+            )
+        except (TypeError, OverflowError):
+            pass
+
+    return _stdlib_dumps(obj, indent)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    反序列化JSON
+
+    Args:
+        data: JSON字符串或字节串
+
+    Returns:
+        解析结果
+
+    Raises:
+        ValueError: JSON格式错误（json.JSONDecodeError 也是其子类）
+    """
+    if _backend == "orjson":
+        return orjson.loads(data)
+    if _backend == "ujson":
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj: Any, fp: IO, indent: bool = False):
+    """
+    序列化到文件对象
+
+    Args:
+        obj: 要序列化的对象
+        fp: 文本或二进制模式的文件对象
+        indent: 是否使用2空格缩进
+    """
+    if "b" in getattr(fp, "mode", ""):
+        fp.write(dumps_bytes(obj, indent=indent))
+    else:
+        fp.write(dumps(obj, indent=indent))
+
+
+def load(fp: IO) -> Any:
+    """
+    从文件对象反序列化
+
+    Args:
+        fp: 文本或二进制模式的文件对象
+
+    Returns:
+        解析结果
+    """
+    return loads(fp.read())
+
+
+_env_backend = os.getenv("SOCIAL_JSON_BACKEND")
+if _env_backend:
+    try:
+        set_backend(_env_backend)
+    except ValueError as e:
+        logger.warning(f"{e}，使用 {_backend}")
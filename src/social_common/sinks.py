@@ -0,0 +1,548 @@
+"""
+输出端模块
+将推文/视频记录持续写入文件
+"""
+
+import asyncio
+import functools
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from . import serialization
+from .compression import GZIP, ZSTD, detect_compression, open_output
+
+logger = logging.getLogger(__name__)
+
+# fsync策略
+FSYNC_NEVER = "never"    # 从不fsync，交给操作系统
+FSYNC_FLUSH = "flush"    # 每次刷新缓冲区后fsync
+FSYNC_CLOSE = "close"    # 仅在关闭时fsync
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_FLUSH, FSYNC_CLOSE)
+
+
+class JsonlWriter:
+    """
+    缓冲JSONL写入器
+
+    文件在整个生命周期内保持打开，记录先进入内存缓冲区，
+    缓冲区达到指定大小或距上次刷新超过指定时间后才写入文件。
+    时间条件在写入和调用 poll() 时检查；由 ThreadedSink 包装时写入线程空闲时也会定期调用 poll()，
+    没有新记录到达时缓冲的记录同样会按时刷新
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        fsync: str = FSYNC_NEVER,
+        append: bool = True,
+        compress: Optional[str] = None
+    ):
+        """
+        初始化写入器
+
+        Args:
+            path: 输出文件路径
+            flush_bytes: 缓冲区达到该字节数时刷新
+            flush_interval: 距上次刷新超过该秒数时刷新，0表示每条记录都刷新
+            fsync: fsync策略: never、flush 或 close
+            append: 是否追加到已有文件
+            compress: 压缩格式 gzip/zstd，为None时按扩展名判断
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"无效的fsync策略: {fsync}，可选: {', '.join(FSYNC_POLICIES)}")
+
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.records_written = 0
+
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self.compression = detect_compression(path, compress)
+        self._file = open_output(path, 'ab' if append else 'wb', compress=self.compression)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, record: Dict[str, Any]):
+        """
+        写入一条记录
+
+        Args:
+            record: 可JSON序列化的记录
+        """
+        self.write_line(serialization.dumps_bytes(record))
+
+    def write_line(self, line: bytes):
+        """
+        写入一行已序列化的数据
+
+        Args:
+            line: 不含换行符的JSON字节串
+        """
+        self._buffer.append(line)
+        self._buffer.append(b'\n')
+        self._buffered_bytes += len(line) + 1
+        self.records_written += 1
+
+        if (self._buffered_bytes >= self.flush_bytes
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def poll(self):
+        """距上次刷新超过 flush_interval 且有缓冲的记录时刷新（供定时调用）"""
+        if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区写入文件"""
+        if self._buffer:
+            self._file.write(b''.join(self._buffer))
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            # 压缩流每次flush都会结束当前压缩块、降低压缩率，只在要求落盘时才flush
+            if self.compression is None or self.fsync == FSYNC_FLUSH:
+                self._file.flush()
+            if self.fsync == FSYNC_FLUSH:
+                self._fsync()
+        self._last_flush = time.monotonic()
+
+    def _fsync(self):
+        try:
+            fileno = self._file.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return
+        os.fsync(fileno)
+
+    def close(self):
+        """刷新缓冲区并关闭文件"""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            # 压缩流在close时才写出尾部，fsync需在其后
+            self._file.close()
+        if self.fsync in (FSYNC_FLUSH, FSYNC_CLOSE):
+            with open(self.path, 'rb') as f:
+                os.fsync(f.fileno())
+        logger.debug(f"已写入 {self.records_written} 条记录到 {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 包括KeyboardInterrupt和任务取消在内，退出时都会刷新已缓冲的记录
+        self.close()
+        return False
+
+
+# 分片文件扩展名
+_SHARD_EXTENSIONS = {None: ".jsonl", GZIP: ".jsonl.gz", ZSTD: ".jsonl.zst"}
+
+# 已完成分片的清单文件名
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class RollingShardWriter:
+    """
+    滚动分片写入器
+
+    按大小、记录数或时间窗口切换输出文件。分片先写入 .part 临时文件，
+    完成后改名为正式文件名，并在目录下的 manifest.jsonl 中追加一行分片信息，
+    下游只需读取清单中列出的分片，不会读到写了一半的文件
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "shard",
+        max_bytes: Optional[int] = None,
+        max_records: Optional[int] = None,
+        interval: Optional[float] = None,
+        compress: Optional[str] = None,
+        flush_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        fsync: str = FSYNC_NEVER
+    ):
+        """
+        初始化写入器
+
+        Args:
+            directory: 分片输出目录
+            prefix: 分片文件名前缀
+            max_bytes: 单个分片的最大字节数（未压缩）
+            max_records: 单个分片的最大记录数
+            interval: 时间窗口秒数，如3600表示按整点小时切换
+            compress: 压缩格式 gzip/zstd
+            flush_bytes: 缓冲区达到该字节数时刷新
+            flush_interval: 距上次刷新超过该秒数时刷新
+            fsync: fsync策略: never、flush 或 close
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"无效的fsync策略: {fsync}，可选: {', '.join(FSYNC_POLICIES)}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.interval = interval
+        self.compression = detect_compression("", compress)
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.manifest_path = self.directory / MANIFEST_NAME
+
+        self.records_written = 0
+        self.shards: List[str] = []
+        self._closed = False
+        self._writer: Optional[JsonlWriter] = None
+        self._shard_name = ""
+        self._shard_bytes = 0
+        self._shard_records = 0
+        self._shard_started = 0.0
+        self._window: Optional[int] = None
+        self._sequence = self._next_sequence()
+
+        leftovers = sorted(self.directory.glob(f"{prefix}-*.part"))
+        if leftovers:
+            logger.warning(f"发现未完成的分片，可能来自中断的运行: {', '.join(p.name for p in leftovers)}")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _next_sequence(self) -> int:
+        # 续接目录中已有分片的序号，重启后不会覆盖
+        sequence = 0
+        for path in self.directory.glob(f"{self.prefix}-*"):
+            try:
+                sequence = max(sequence, int(path.name.split("-")[-1].split(".")[0]) + 1)
+            except ValueError:
+                continue
+        return sequence
+
+    def _current_window(self, now: float) -> Optional[int]:
+        if not self.interval:
+            return None
+        return int(now // self.interval)
+
+    def _open_shard(self, now: float):
+        started = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._shard_name = f"{self.prefix}-{started}-{self._sequence:06d}{_SHARD_EXTENSIONS[self.compression]}"
+        self._sequence += 1
+        self._writer = JsonlWriter(
+            str(self.directory / f"{self._shard_name}.part"),
+            flush_bytes=self.flush_bytes,
+            flush_interval=self.flush_interval,
+            fsync=self.fsync,
+            append=False,
+            compress=self.compression
+        )
+        self._shard_bytes = 0
+        self._shard_records = 0
+        self._shard_started = now
+        self._window = self._current_window(now)
+
+    def _finish_shard(self):
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        writer.close()
+
+        final_path = self.directory / self._shard_name
+        os.replace(writer.path, final_path)
+        entry = {
+            "file": self._shard_name,
+            "records": self._shard_records,
+            "bytes": self._shard_bytes,
+            "compression": self.compression,
+            "started_at": self._shard_started,
+            "finished_at": time.time(),
+        }
+        with open(self.manifest_path, "ab") as f:
+            f.write(serialization.dumps_bytes(entry) + b"\n")
+            if self.fsync != FSYNC_NEVER:
+                f.flush()
+                os.fsync(f.fileno())
+        self.shards.append(str(final_path))
+        logger.info(f"分片已完成: {self._shard_name} ({self._shard_records} 条记录)")
+
+    def _should_rotate(self, now: float) -> bool:
+        if self.max_bytes and self._shard_bytes >= self.max_bytes:
+            return True
+        if self.max_records and self._shard_records >= self.max_records:
+            return True
+        return self.interval is not None and self._current_window(now) != self._window
+
+    def write(self, record: Dict[str, Any]):
+        """
+        写入一条记录
+
+        Args:
+            record: 可JSON序列化的记录
+        """
+        self.write_line(serialization.dumps_bytes(record))
+
+    def write_line(self, line: bytes):
+        """
+        写入一行已序列化的数据
+
+        Args:
+            line: 不含换行符的JSON字节串
+        """
+        if self._closed:
+            raise ValueError("写入器已关闭")
+        now = time.time()
+        if self._writer is not None and self._should_rotate(now):
+            self._finish_shard()
+        if self._writer is None:
+            self._open_shard(now)
+
+        self._writer.write_line(line)
+        self._shard_bytes += len(line) + 1
+        self._shard_records += 1
+        self.records_written += 1
+
+    def poll(self):
+        """时间窗口已结束时完成当前分片，否则按刷新间隔刷新（供定时调用，没有新记录时也能按时切换分片）"""
+        if self._writer is None:
+            return
+        if self.interval is not None and self._current_window(time.time()) != self._window:
+            self._finish_shard()
+        else:
+            self._writer.poll()
+
+    def flush(self):
+        """刷新当前分片；时间窗口已结束时直接完成该分片"""
+        if self._writer is None:
+            return
+        if self.interval is not None and self._current_window(time.time()) != self._window:
+            self._finish_shard()
+        else:
+            self._writer.flush()
+
+    def close(self):
+        """完成当前分片并关闭"""
+        if self._closed:
+            return
+        self._closed = True
+        self._finish_shard()
+        logger.debug(f"已写入 {self.records_written} 条记录到 {len(self.shards)} 个分片: {self.directory}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 中断时也完成当前分片，已写入的记录不会停留在临时文件中
+        self.close()
+        return False
+
+
+def read_manifest(directory: str) -> List[Dict[str, Any]]:
+    """
+    读取分片清单
+
+    Args:
+        directory: 分片输出目录
+
+    Returns:
+        按完成顺序排列的分片信息列表
+    """
+    path = Path(directory) / MANIFEST_NAME
+    if not path.exists():
+        return []
+    with open(path, "rb") as f:
+        return [serialization.loads(line) for line in f if line.strip()]
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    在线程池中执行阻塞的磁盘操作，不阻塞事件循环
+
+    Args:
+        func: 阻塞函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    Returns:
+        函数返回值
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+class _FlushRequest:
+    """写入线程处理到此处时刷新输出端并通知等待方"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+# 写入线程空闲时调用输出端 poll() 的间隔（秒）
+POLL_INTERVAL = 0.25
+
+
+class ThreadedSink:
+    """
+    后台线程输出端
+
+    包装任意提供 write/flush/close 的输出端（JsonlWriter、RollingShardWriter、ArchiveSink等），
+    记录经有界队列交给专用写入线程，序列化和磁盘I/O都不在事件循环中执行；
+    队列满时 awrite 在线程池中等待，形成背压而不阻塞其他协程。
+    输出端提供 poll() 时，写入线程没有新记录期间每隔 poll_interval 秒调用一次，
+    按时间刷新和按时间切换分片不依赖下一条记录的到达
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        max_queue: int = 1024,
+        owns_sink: bool = True,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        """
+        启动写入线程
+
+        Args:
+            sink: 被包装的输出端
+            max_queue: 队列中最多缓存的记录数
+            owns_sink: 关闭时是否同时关闭被包装的输出端
+            poll_interval: 空闲时调用输出端 poll() 的间隔（秒）
+        """
+        self.sink = sink
+        self.owns_sink = owns_sink
+        self.poll_interval = poll_interval
+        self._poll = getattr(sink, "poll", None)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"sink-writer-{type(sink).__name__}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def records_written(self) -> int:
+        # 关闭前读取时可能略少于已提交的记录数
+        return getattr(self.sink, "records_written", 0)
+
+    def _run(self):
+        timeout = self.poll_interval if self._poll is not None else None
+        while True:
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if self._error is None:
+                    try:
+                        self._poll()
+                    except BaseException as e:
+                        logger.error(f"写入线程出错: {e}")
+                        self._error = e
+                continue
+            if item is _STOP:
+                return
+            try:
+                # 出错后继续取出队列中的记录，避免生产方在满队列上永久等待
+                if self._error is None:
+                    if isinstance(item, _FlushRequest):
+                        self.sink.flush()
+                    else:
+                        self.sink.write(item)
+            except BaseException as e:
+                logger.error(f"写入线程出错: {e}")
+                self._error = e
+            finally:
+                if isinstance(item, _FlushRequest):
+                    item.done.set()
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise ValueError("输出端已关闭")
+
+    def write(self, record: Any):
+        """
+        提交一条记录（队列满时阻塞当前线程）
+
+        Args:
+            record: 要写入的记录
+        """
+        self._check()
+        self._queue.put(record)
+
+    async def awrite(self, record: Any):
+        """
+        在协程中提交一条记录，队列满时让出事件循环等待
+
+        Args:
+            record: 要写入的记录
+        """
+        self._check()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            await run_blocking(self._queue.put, record)
+
+    def flush(self):
+        """等待已提交的记录全部写出并刷新输出端"""
+        self._check()
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def aflush(self):
+        """在协程中等待刷新完成"""
+        await run_blocking(self.flush)
+
+    def close(self):
+        """写完队列中剩余的记录，停止写入线程并关闭输出端"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self.owns_sink:
+            self.sink.close()
+        if self._error is not None:
+            raise self._error
+
+    async def aclose(self):
+        """在协程中关闭"""
+        await run_blocking(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        return False
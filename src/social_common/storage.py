@@ -0,0 +1,468 @@
+"""
+本地存储模块
+基于SQLite（WAL模式）归档推文和视频，按ID去重并在重复拉取时刷新互动数据，
+可选FTS5全文索引用于本地关键词检索
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import serialization
+from .timeutils import to_epoch
+
+logger = logging.getLogger(__name__)
+
+TWEET = "tweet"
+VIDEO = "video"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id            TEXT PRIMARY KEY,
+    user_id       TEXT NOT NULL,
+    author        TEXT,
+    created_at    INTEGER,
+    text          TEXT,
+    like_count    INTEGER,
+    retweet_count INTEGER,
+    reply_count   INTEGER,
+    quote_count   INTEGER,
+    data          TEXT NOT NULL,
+    first_seen    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_user_created ON tweets (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS videos (
+    aweme_id      TEXT PRIMARY KEY,
+    user_id       TEXT NOT NULL,
+    author        TEXT,
+    create_time   INTEGER,
+    description   TEXT,
+    digg_count    INTEGER,
+    comment_count INTEGER,
+    share_count   INTEGER,
+    play_count    INTEGER,
+    duration      INTEGER,
+    data          TEXT NOT NULL,
+    first_seen    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_user_created ON videos (user_id, create_time);
+"""
+
+# 重复拉取时只刷新内容和互动数据，保留首次入库时间
+_UPSERT_TWEET = """
+INSERT INTO tweets (
+    id, user_id, author, created_at, text,
+    like_count, retweet_count, reply_count, quote_count,
+    data, first_seen, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    text = excluded.text,
+    like_count = excluded.like_count,
+    retweet_count = excluded.retweet_count,
+    reply_count = excluded.reply_count,
+    quote_count = excluded.quote_count,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+_UPSERT_VIDEO = """
+INSERT INTO videos (
+    aweme_id, user_id, author, create_time, description,
+    digg_count, comment_count, share_count, play_count, duration,
+    data, first_seen, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (aweme_id) DO UPDATE SET
+    description = excluded.description,
+    digg_count = excluded.digg_count,
+    comment_count = excluded.comment_count,
+    share_count = excluded.share_count,
+    play_count = excluded.play_count,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+
+# 全文索引：推文正文、视频描述和话题。索引行的rowid与归档表一致，
+# 每批写入后在同一事务中按ID重建这一批的索引行。
+# 不使用触发器：FTS5在触发器中逐行提交待写词项，写入速度要慢数倍
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5(text);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(description, hashtags);
+"""
+
+# 各类记录的全文索引: (索引表, 归档表, 主键列, 索引列及其取值表达式)
+_FTS_TABLES = {
+    TWEET: ("tweets_fts", "tweets", "id", "text", "fts_text(text)"),
+    VIDEO: ("videos_fts", "videos", "aweme_id", "description, hashtags",
+            "fts_text(description), fts_hashtags(data)"),
+}
+
+# FTS5的unicode61分词器把连续的中日韩文字当作一个词，
+# 索引和查询时都在这些字符两侧加空格，按字切分后用短语查询匹配相邻的字
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+
+class _CJKSpacing(dict):
+    """str.translate 映射表，首次遇到某字符时判断并缓存，比逐字正则替换快数倍"""
+
+    def __missing__(self, code: int) -> Any:
+        char = chr(code)
+        # 映射为None会删除字符，非中日韩字符映射回自身
+        value = f" {char} " if _CJK_PATTERN.match(char) else code
+        self[code] = value
+        return value
+
+
+_CJK_SPACING = _CJKSpacing()
+
+
+def fts_text(text: Optional[str]) -> str:
+    """
+    生成写入全文索引的文本
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        中日韩文字按字分隔后的文本
+    """
+    if not text:
+        return ""
+    return text.translate(_CJK_SPACING)
+
+
+def _fts_hashtags(data: Optional[str]) -> str:
+    if not data:
+        return ""
+    try:
+        hashtags = serialization.loads(data).get("hashtags") or []
+    except (ValueError, AttributeError):
+        return ""
+    return fts_text(" ".join(str(tag) for tag in hashtags))
+
+
+def build_match_query(query: str) -> str:
+    """
+    把关键词转换为FTS5查询表达式
+
+    空白分隔的每个关键词作为一个短语，多个关键词之间为“且”的关系；
+    话题前的#会被忽略
+
+    Args:
+        query: 关键词，如 "美食 #探店"
+
+    Returns:
+        FTS5 MATCH 表达式
+    """
+    phrases = []
+    for term in query.split():
+        term = fts_text(term.lstrip("#＃")).strip()
+        if term:
+            phrases.append('"' + " ".join(term.split()).replace('"', '""') + '"')
+    if not phrases:
+        raise ValueError("搜索关键词不能为空")
+    return " ".join(phrases)
+
+
+def _epoch_int(value: Any) -> Optional[int]:
+    epoch = to_epoch(value)
+    return int(epoch) if epoch is not None else None
+
+
+def _tweet_row(tweet: Dict[str, Any], user_id: Optional[str], now: float) -> Tuple:
+    metrics = tweet.get("public_metrics") or {}
+    return (
+        str(tweet.get("id", "")),
+        str(user_id or tweet.get("user_id") or tweet.get("author") or ""),
+        tweet.get("author", ""),
+        _epoch_int(tweet.get("created_at")),
+        tweet.get("text", ""),
+        metrics.get("like_count"),
+        metrics.get("retweet_count"),
+        metrics.get("reply_count"),
+        metrics.get("quote_count"),
+        serialization.dumps(tweet),
+        now,
+        now,
+    )
+
+
+def _video_row(video: Dict[str, Any], user_id: Optional[str], now: float) -> Tuple:
+    author = video.get("author") or {}
+    stats = video.get("statistics") or {}
+    return (
+        str(video.get("aweme_id", "")),
+        str(user_id or author.get("unique_id") or ""),
+        author.get("unique_id", ""),
+        _epoch_int(video.get("create_time")),
+        video.get("desc", ""),
+        stats.get("digg_count"),
+        stats.get("comment_count"),
+        stats.get("share_count"),
+        stats.get("play_count"),
+        (video.get("video") or {}).get("duration"),
+        serialization.dumps(video),
+        now,
+        now,
+    )
+
+
+class SQLiteArchive:
+    """
+    SQLite本地归档
+
+    推文以id、视频以aweme_id为主键，(user_id, 时间)上建有二级索引，
+    写入按批次在事务中执行
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, fulltext: bool = False):
+        """
+        打开或创建归档
+
+        Args:
+            path: 数据库文件路径
+            batch_size: 每个事务写入的记录数
+            fulltext: 是否建立全文索引，对已有归档首次启用时会为已有记录补建索引
+        """
+        self.path = path
+        self.batch_size = batch_size
+        # 允许由后台写入线程使用连接，调用方保证同一时刻只有一个线程访问
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL模式下NORMAL足以保证数据库一致性，且比FULL少一次fsync
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.create_function("fts_text", 1, fts_text, deterministic=True)
+        self.conn.create_function("fts_hashtags", 1, _fts_hashtags, deterministic=True)
+        # 启用过全文索引的归档再次打开时继续维护索引
+        self._fulltext = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tweets_fts'"
+        ).fetchone() is not None
+        if fulltext:
+            self.enable_fulltext()
+        logger.info(f"SQLite归档已打开: {path}")
+
+    @property
+    def fulltext(self) -> bool:
+        """是否已建立全文索引"""
+        return self._fulltext
+
+    def enable_fulltext(self):
+        """建立全文索引并为已有记录补建索引，之后随写入增量维护"""
+        if self._fulltext:
+            return
+        self.conn.executescript(_FTS_SCHEMA)
+        with self.conn:
+            for fts_table, table, _, columns, values in _FTS_TABLES.values():
+                self.conn.execute(f"INSERT INTO {fts_table} (rowid, {columns}) SELECT rowid, {values} FROM {table}")
+        self._fulltext = True
+        logger.info(f"全文索引已建立: {self.path}")
+
+    def search(
+        self,
+        kind: str,
+        query: str,
+        user_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        全文检索推文或视频，按相关度排序
+
+        Args:
+            kind: tweet 或 video
+            query: 关键词，空白分隔的多个关键词需同时命中
+            user_id: 只检索该用户的记录
+            limit: 最多返回的记录数
+
+        Returns:
+            格式化后的记录列表
+        """
+        if not self.fulltext:
+            raise ValueError("归档未建立全文索引，请以 fulltext=True 打开归档（命令行: fetch --fulltext）")
+
+        table, fts_table = ("tweets", "tweets_fts") if kind == TWEET else ("videos", "videos_fts")
+        sql = (
+            f"SELECT t.data FROM {fts_table} f JOIN {table} t ON t.rowid = f.rowid "
+            f"WHERE {fts_table} MATCH ?"
+        )
+        params: List[Any] = [build_match_query(query)]
+        if user_id is not None:
+            sql += " AND t.user_id = ?"
+            params.append(str(user_id))
+        sql += " ORDER BY f.rank LIMIT ?"
+        params.append(limit)
+
+        return [serialization.loads(data) for (data,) in self.conn.execute(sql, params)]
+
+    def _upsert(self, sql: str, rows: Iterator[Tuple], kind: str) -> int:
+        count = 0
+        batch: List[Tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._write_batch(sql, batch, kind)
+                count += len(batch)
+                batch.clear()
+        if batch:
+            self._write_batch(sql, batch, kind)
+            count += len(batch)
+        return count
+
+    def _write_batch(self, sql: str, batch: List[Tuple], kind: str):
+        with self.conn:
+            self.conn.executemany(sql, batch)
+            if self._fulltext:
+                self._index_batch(kind, [row[0] for row in batch])
+
+    def _index_batch(self, kind: str, ids: List[str]):
+        fts_table, table, key, columns, values = _FTS_TABLES[kind]
+        placeholders = ",".join("?" * len(ids))
+        selected = f"SELECT rowid FROM {table} WHERE {key} IN ({placeholders})"
+        self.conn.execute(f"DELETE FROM {fts_table} WHERE rowid IN ({selected})", ids)
+        self.conn.execute(
+            f"INSERT INTO {fts_table} (rowid, {columns}) "
+            f"SELECT rowid, {values} FROM {table} WHERE {key} IN ({placeholders})",
+            ids
+        )
+
+    def upsert_tweets(self, tweets: Iterable[Dict[str, Any]], user_id: Optional[str] = None) -> int:
+        """
+        批量写入推文，已存在的推文刷新内容和互动数据
+
+        Args:
+            tweets: format_tweet 输出的推文
+            user_id: 所属用户ID，默认使用推文作者
+
+        Returns:
+            写入的推文数量
+        """
+        now = time.time()
+        return self._upsert(_UPSERT_TWEET, (_tweet_row(t, user_id, now) for t in tweets), TWEET)
+
+    def upsert_videos(self, videos: Iterable[Dict[str, Any]], user_id: Optional[str] = None) -> int:
+        """
+        批量写入视频，已存在的视频刷新内容和互动数据
+
+        Args:
+            videos: format_video 输出的视频
+            user_id: 所属用户ID，默认使用作者抖音号
+
+        Returns:
+            写入的视频数量
+        """
+        now = time.time()
+        return self._upsert(_UPSERT_VIDEO, (_video_row(v, user_id, now) for v in videos), VIDEO)
+
+    def get_tweet(self, tweet_id: str) -> Optional[Dict[str, Any]]:
+        """按ID获取推文"""
+        row = self.conn.execute("SELECT data FROM tweets WHERE id = ?", (str(tweet_id),)).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def get_video(self, aweme_id: str) -> Optional[Dict[str, Any]]:
+        """按ID获取视频"""
+        row = self.conn.execute("SELECT data FROM videos WHERE aweme_id = ?", (str(aweme_id),)).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def iter_user_items(
+        self,
+        kind: str,
+        user_id: str,
+        since: Any = None,
+        until: Any = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        按时间顺序遍历用户的推文或视频（使用 (user_id, 时间) 索引）
+
+        Args:
+            kind: tweet 或 video
+            user_id: 用户ID
+            since: 起始时间（含），可为时间戳或时间字符串
+            until: 结束时间（不含）
+
+        Yields:
+            格式化后的记录
+        """
+        table, time_col = ("tweets", "created_at") if kind == TWEET else ("videos", "create_time")
+        sql = f"SELECT data FROM {table} WHERE user_id = ?"
+        params: List[Any] = [str(user_id)]
+        if since is not None:
+            sql += f" AND {time_col} >= ?"
+            params.append(_epoch_int(since))
+        if until is not None:
+            sql += f" AND {time_col} < ?"
+            params.append(_epoch_int(until))
+        sql += f" ORDER BY {time_col}"
+
+        for (data,) in self.conn.execute(sql, params):
+            yield serialization.loads(data)
+
+    def count(self, kind: str) -> int:
+        """统计推文或视频数量"""
+        table = "tweets" if kind == TWEET else "videos"
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class ArchiveSink:
+    """
+    归档输出端
+
+    与 JsonlWriter 相同的 write/flush/close 接口，逐条接收记录并按批次写入归档
+    """
+
+    def __init__(self, archive: SQLiteArchive, kind: str, user_id: Optional[str] = None):
+        """
+        初始化输出端
+
+        Args:
+            archive: SQLite归档
+            kind: tweet 或 video
+            user_id: 所属用户ID
+        """
+        self.archive = archive
+        self.kind = kind
+        self.user_id = user_id
+        self.records_written = 0
+        self._pending: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]):
+        """写入一条格式化后的记录"""
+        self._pending.append(record)
+        if len(self._pending) >= self.archive.batch_size:
+            self.flush()
+
+    def flush(self):
+        """把待写入的记录提交到归档"""
+        if not self._pending:
+            return
+        if self.kind == TWEET:
+            self.records_written += self.archive.upsert_tweets(self._pending, self.user_id)
+        else:
+            self.records_written += self.archive.upsert_videos(self._pending, self.user_id)
+        self._pending.clear()
+
+    def close(self):
+        """提交剩余记录（不关闭归档本身）"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
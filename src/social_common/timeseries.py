@@ -0,0 +1,215 @@
+"""
+互动时间序列模块
+按发布时间把推文/视频归入分钟、小时或天的时间桶，增量维护各桶的数量和互动累计值，
+看板刷新时直接读取预先聚合的序列，无需重新扫描全部数据
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .aggregators import _StreamAggregator, video_statistics
+from .storage import TWEET, VIDEO
+from .timeutils import to_epoch
+
+# 时间粒度 -> 桶长度（秒）
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+
+# 各类记录累计的指标及其在记录中的字段
+TWEET_METRICS = {
+    "likes": "like_count",
+    "retweets": "retweet_count",
+    "replies": "reply_count",
+    "quotes": "quote_count",
+}
+VIDEO_METRICS = {
+    "likes": "digg_count",
+    "comments": "comment_count",
+    "shares": "share_count",
+    "plays": "play_count",
+}
+
+
+class EngagementSeries(_StreamAggregator):
+    """
+    按时间桶增量聚合的互动序列
+
+    每个桶保存 [数量, 各指标累计值...]，新记录只更新所属的桶；
+    序列可以合并，也可以汇总为更粗的粒度
+    """
+
+    def __init__(self, kind: str = TWEET, granularity: str = "hour"):
+        """
+        Args:
+            kind: tweet 或 video
+            granularity: minute、hour 或 day
+        """
+        if kind not in (TWEET, VIDEO):
+            raise ValueError(f"不支持的类型: {kind}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"不支持的时间粒度: {granularity}，可选: {', '.join(GRANULARITIES)}")
+        self.kind = kind
+        self.granularity = granularity
+        self.bucket_seconds = GRANULARITIES[granularity]
+        self.metrics = TWEET_METRICS if kind == TWEET else VIDEO_METRICS
+        self.buckets: Dict[int, List[int]] = {}
+        self.skipped = 0
+
+    def _timestamp(self, item: Dict[str, Any]) -> Optional[float]:
+        if self.kind == TWEET:
+            return to_epoch(item.get('created_at'))
+        return to_epoch(item.get('create_time'))
+
+    def _values(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        if self.kind == TWEET:
+            return item.get('public_metrics') or {}
+        return video_statistics(item)
+
+    def add(self, item: Dict[str, Any]):
+        """加入一条记录，发布时间无法解析的记录不计入"""
+        epoch = self._timestamp(item)
+        if epoch is None:
+            self.skipped += 1
+            return
+
+        start = int(epoch // self.bucket_seconds) * self.bucket_seconds
+        row = self.buckets.get(start)
+        if row is None:
+            row = self.buckets[start] = [0] * (len(self.metrics) + 1)
+        row[0] += 1
+        values = self._values(item)
+        for column, field in enumerate(self.metrics.values(), 1):
+            row[column] += values.get(field) or 0
+
+    def merge(self, other: "EngagementSeries") -> "EngagementSeries":
+        """
+        合并同类型、同粒度的序列
+
+        Returns:
+            序列自身
+        """
+        if (self.kind, self.granularity) != (other.kind, other.granularity):
+            raise ValueError("只能合并类型和时间粒度相同的序列")
+        for start, other_row in other.buckets.items():
+            row = self.buckets.get(start)
+            if row is None:
+                self.buckets[start] = list(other_row)
+            else:
+                for column, value in enumerate(other_row):
+                    row[column] += value
+        self.skipped += other.skipped
+        return self
+
+    def rollup(self, granularity: str) -> "EngagementSeries":
+        """
+        汇总为更粗的粒度（如小时汇总为天）
+
+        Args:
+            granularity: 目标粒度，不能比当前粒度更细
+
+        Returns:
+            新的序列
+        """
+        rolled = EngagementSeries(self.kind, granularity)
+        if rolled.bucket_seconds < self.bucket_seconds:
+            raise ValueError(f"无法从 {self.granularity} 汇总为更细的 {granularity}")
+        size = rolled.bucket_seconds
+        for start, row in self.buckets.items():
+            target = rolled.buckets.setdefault(start // size * size, [0] * len(row))
+            for column, value in enumerate(row):
+                target[column] += value
+        rolled.skipped = self.skipped
+        return rolled
+
+    def _point(self, start: int, row: List[int]) -> Dict[str, Any]:
+        point: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(start, tz=timezone.utc).isoformat(),
+            "count": row[0],
+        }
+        for column, metric in enumerate(self.metrics, 1):
+            point[metric] = row[column]
+
+        if self.kind == TWEET:
+            engagement = point["likes"] + point["retweets"] + point["replies"] + point["quotes"]
+            point["engagement"] = engagement
+            point["avg_engagement"] = engagement / row[0] if row[0] else 0
+        else:
+            engagement = point["likes"] + point["comments"] + point["shares"]
+            point["engagement"] = engagement
+            # 按播放加权的互动率：(Σ点赞 + Σ评论 + Σ分享) / Σ播放，播放多的视频权重大；
+            # 与 VideoAggregator 的 avg_engagement_rate（各视频互动率的平均）不是同一统计量。
+            # 推文没有播放数，只给出每条平均互动 avg_engagement
+            point["weighted_engagement_rate"] = engagement / point["plays"] if point["plays"] else 0
+        return point
+
+    def series(self, start: Any = None, end: Any = None, fill: bool = False) -> List[Dict[str, Any]]:
+        """
+        按时间升序返回序列
+
+        Args:
+            start: 起始时间（含），时间戳或时间字符串
+            end: 结束时间（不含）
+            fill: 是否为区间内没有记录的桶补零
+
+        Returns:
+            数据点列表，元素含 time、count、各指标累计值和互动汇总
+        """
+        size = self.bucket_seconds
+        starts = sorted(self.buckets)
+        if not starts:
+            return []
+
+        low = to_epoch(start) if start is not None else None
+        high = to_epoch(end) if end is not None else None
+        low = starts[0] if low is None else int(low // size) * size
+        high = starts[-1] + size if high is None else high
+
+        if fill:
+            empty = [0] * (len(self.metrics) + 1)
+            bucket_starts = range(int(low), int(high), size)
+            return [self._point(s, self.buckets.get(s, empty)) for s in bucket_starts]
+        return [self._point(s, self.buckets[s]) for s in starts if low <= s < high]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成当前的序列结果
+
+        Returns:
+            包含类型、粒度、跳过的记录数和完整序列的字典
+        """
+        return {
+            "kind": self.kind,
+            "granularity": self.granularity,
+            "skipped": self.skipped,
+            "series": self.series(),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可序列化的字典，便于持久化后增量更新"""
+        return {
+            "kind": self.kind,
+            "granularity": self.granularity,
+            "metrics": list(self.metrics),
+            "buckets": {str(start): row for start, row in self.buckets.items()},
+            "skipped": self.skipped,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EngagementSeries":
+        """
+        从 to_dict 的结果恢复序列
+
+        Args:
+            data: to_dict 导出的字典
+
+        Returns:
+            序列
+        """
+        restored = cls(data["kind"], data["granularity"])
+        if list(data.get("metrics", restored.metrics)) != list(restored.metrics):
+            raise ValueError("序列的指标列与当前版本不一致")
+        restored.buckets = {int(start): list(row) for start, row in data["buckets"].items()}
+        restored.skipped = data.get("skipped", 0)
+        return restored
+
+    def __len__(self) -> int:
+        return len(self.buckets)
@@ -0,0 +1,72 @@
+"""
+时间解析工具
+统一解析Twitter的created_at和抖音的create_time
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Twitter v1.1 时间格式，如 "Wed Oct 10 20:19:24 +0000 2018"
+_TWITTER_LEGACY_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# 大于该值的时间戳视为毫秒
+_MILLISECOND_THRESHOLD = 10 ** 11
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    解析时间值为带时区的UTC时间
+
+    Args:
+        value: 秒/毫秒级时间戳、Twitter v1.1时间字符串或ISO 8601字符串
+
+    Returns:
+        UTC时间，无法解析时返回None
+    """
+    if value is None or value == "":
+        return None
+
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    if isinstance(value, str):
+        text = value.strip()
+        if text.isdigit():
+            value = int(text)
+        else:
+            try:
+                return datetime.strptime(text, _TWITTER_LEGACY_FORMAT).astimezone(timezone.utc)
+            except ValueError:
+                pass
+            try:
+                # Python 3.11之前的fromisoformat不支持末尾的Z
+                parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+            return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    if isinstance(value, (int, float)):
+        if value <= 0:
+            return None
+        if value > _MILLISECOND_THRESHOLD:
+            value = value / 1000
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+
+    return None
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """
+    解析时间值为秒级时间戳
+
+    Args:
+        value: 同 parse_timestamp
+
+    Returns:
+        秒级时间戳，无法解析时返回None
+    """
+    # 秒级数值时间戳（抖音create_time）无需构造datetime
+    if type(value) in (int, float) and 0 < value <= _MILLISECOND_THRESHOLD:
+        return float(value)
+    parsed = parse_timestamp(value)
+    return parsed.timestamp() if parsed else None
@@ -0,0 +1,317 @@
+"""
+向量化视频统计模块
+一次遍历把视频的互动指标抽取为列，再用NumPy一次性计算全部统计量；
+同一批列还可以直接生成 VideoAggregator 的部分结果，合并进跨批次的全局聚合器，无需逐条加入；
+未安装NumPy时退回纯Python的 VideoAggregator，两者输出结构相同
+
+依赖analysis扩展: pip install twitter-client[analysis]
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from .aggregators import (
+    HOT_QUANTILE,
+    HOT_VIDEO_LIMIT,
+    LONG_VIDEO_SECONDS,
+    SHORT_VIDEO_SECONDS,
+    TOP_HASHTAG_LIMIT,
+    VideoAggregator,
+    hot_video_count,
+    video_hashtags,
+)
+from .heavy_hitters import TrendingHashtags
+from .quantiles import DEFAULT_PERCENTILES
+from .timeutils import to_epoch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def numpy_available() -> bool:
+    """是否可以使用NumPy实现"""
+    return np is not None
+
+
+class _TagBuckets:
+    """
+    按时间桶统计一批视频的话题次数，供生成 TrendingHashtags 的部分结果
+
+    只统计批内最新视频所在保留窗口内的话题；视频通常按发布时间倒序排列，
+    窗口外的视频无需逐个计数
+    """
+
+    def __init__(self, trending: TrendingHashtags):
+        self.trending = trending
+        self.size = trending.bucket_seconds
+        self.buckets: Dict[float, Dict[str, int]] = {}
+        self.newest: Optional[float] = None
+        self.oldest = 0.0
+        self.late = 0
+        # 相邻视频多在同一时间桶，沿用上一个桶的计数字典
+        self._start: Optional[float] = None
+        self._counts: Dict[str, int] = {}
+
+    def add(self, created: Any, tags: List[str]):
+        """计入一个视频的话题"""
+        epoch = to_epoch(created)
+        if epoch is None:
+            return
+        if self.newest is None or epoch > self.newest:
+            self.newest = epoch
+            self.oldest = self.trending.window_start(epoch)
+        if epoch < self.oldest:
+            self.late += len(tags)
+            return
+        start = epoch // self.size * self.size
+        if start != self._start:
+            self._start, self._counts = start, self.buckets.setdefault(start, {})
+        counts = self._counts
+        for tag in tags:
+            counts[tag] = counts.get(tag, 0) + 1
+
+    def flush(self):
+        """
+        按时间顺序计入话题统计，每个 (时间桶, 话题) 只调用一次，结果与逐条加入相同：
+        加入时已早于窗口的计为过期记录，之后才移出窗口的桶直接丢弃
+        """
+        for start in sorted(self.buckets):
+            if start >= self.oldest:
+                for tag, count in self.buckets[start].items():
+                    self.trending.add(tag, start, count)
+        self.trending.late += self.late
+
+
+def _video_columns(
+    videos: Sequence[Dict[str, Any]],
+    hashtag_counts: Dict[str, int],
+    tag_buckets: Optional[_TagBuckets] = None
+):
+    """
+    单次遍历抽取 点赞、评论、分享、播放、时长 五列，同时统计话题
+
+    tag_buckets 不为None时另按发布时间统计话题
+    """
+    likes: List[int] = []
+    comments: List[int] = []
+    shares: List[int] = []
+    plays: List[int] = []
+    durations: List[float] = []
+    # 循环体内只做取值和追加，绑定方法避免每次属性查找
+    add_likes, add_comments, add_shares = likes.append, comments.append, shares.append
+    add_plays, add_duration = plays.append, durations.append
+    count_of = hashtag_counts.get
+    for video in videos:
+        stats = video.get('statistics') or {}
+        add_likes(stats.get('digg_count') or 0)
+        add_comments(stats.get('comment_count') or 0)
+        add_shares(stats.get('share_count') or 0)
+        add_plays(stats.get('play_count') or 0)
+        add_duration((video.get('video') or {}).get('duration') or 0)
+        tags = video_hashtags(video)
+        for tag in tags:
+            hashtag_counts[tag] = count_of(tag, 0) + 1
+        if tag_buckets is not None and tags:
+            tag_buckets.add(video.get('create_time'), tags)
+    return (
+        np.array(likes, dtype=np.int64),
+        np.array(comments, dtype=np.int64),
+        np.array(shares, dtype=np.int64),
+        np.array(plays, dtype=np.int64),
+        np.array(durations),
+    )
+
+
+def _summary(values) -> Dict[str, Optional[float]]:
+    """与 KLLSketch.summary 结构相同的精确分位数摘要"""
+    if not len(values):
+        summary: Dict[str, Optional[float]] = {"min": None}
+        summary.update({f"p{q * 100:g}": None for q in DEFAULT_PERCENTILES})
+        summary["max"] = None
+        return summary
+
+    # inverted_cdf 取累计比例首次达到分位点的样本值，与KLL草图的定义一致
+    quantiles = np.quantile(values, DEFAULT_PERCENTILES, method="inverted_cdf")
+    summary = {"min": values.min().item()}
+    for q, value in zip(DEFAULT_PERCENTILES, quantiles):
+        summary[f"p{q * 100:g}"] = value.item()
+    summary["max"] = values.max().item()
+    return summary
+
+
+def _top_indices(likes, k: int):
+    """点赞数最高的k个下标；并列时保留靠前的视频，与稳定降序排序一致"""
+    if k >= len(likes):
+        return np.argsort(-likes, kind="stable")[:k]
+    threshold = np.partition(likes, len(likes) - k)[len(likes) - k]
+    candidates = np.flatnonzero(likes >= threshold)
+    return candidates[np.argsort(-likes[candidates], kind="stable")[:k]]
+
+
+def _hot_video(video: Dict[str, Any], likes: int) -> Dict[str, Any]:
+    stats = video.get('statistics') or {}
+    return {
+        "aweme_id": video.get('aweme_id'),
+        "desc": (video.get('desc', '') or '')[:100],
+        "digg_count": likes,
+        "comment_count": stats.get('comment_count', 0),
+        "play_count": stats.get('play_count', 0),
+    }
+
+
+def _partial_for(aggregator: VideoAggregator) -> VideoAggregator:
+    """与目标聚合器配置相同的空聚合器，用于生成可合并的部分结果"""
+    return VideoAggregator(
+        sketch_k=aggregator.sketches["likes"].k,
+        hashtag_capacity=aggregator.hashtag_counts.capacity
+    )
+
+
+def _fill_partial(
+    partial: VideoAggregator,
+    videos: Sequence[Dict[str, Any]],
+    analysis: Dict[str, Any],
+    columns: Dict[str, Any],
+    hashtag_counts: Dict[str, int],
+    top: List[int]
+):
+    """
+    由分析结果和已抽取的列填充部分聚合结果（话题的时间统计已由 _TagBuckets 计入）；
+    累计值、热门视频和话题与逐条加入相同，分位数草图整批压缩，误差界不变
+
+    columns 为 VIDEO_SKETCH_METRICS 各指标的数组（时长只含大于0的值，互动率只含有播放的视频）
+    """
+    statistics = analysis["statistics"]
+    content = analysis["content_analysis"]
+
+    partial.count = analysis["total_videos"]
+    partial.total_likes = statistics["total_likes"]
+    partial.total_comments = statistics["total_comments"]
+    partial.total_shares = statistics["total_shares"]
+    partial.total_plays = statistics["total_plays"]
+    partial.duration_sum = columns["duration"].sum().item()
+    partial.duration_count = len(columns["duration"])
+    partial.engagement_sum = columns["engagement_rate"].sum().item()
+    partial.engagement_count = len(columns["engagement_rate"])
+    partial.short_videos = content["short_videos"]
+    partial.medium_videos = content["medium_videos"]
+    partial.long_videos = content["long_videos"]
+    for metric, values in columns.items():
+        # 草图压缩时要排序，先用NumPy排好序，列表排序只需线性时间
+        partial.sketches[metric].extend(np.sort(values).tolist())
+
+    for tag, count in hashtag_counts.items():
+        partial.hashtag_counts.add(tag, count)
+
+    # 按原始顺序加入，点赞相同时保留靠前的视频
+    likes = columns["likes"]
+    for index in sorted(top):
+        partial.hot_videos.add(int(likes[index]), _hot_video(videos[index], int(likes[index])))
+
+
+def _analyze_numpy(
+    videos: Sequence[Dict[str, Any]],
+    aggregator: Optional[VideoAggregator] = None
+) -> Dict[str, Any]:
+    count = len(videos)
+    hashtag_counts: Dict[str, int] = {}
+    partial = None
+    tag_buckets = None
+    if aggregator is not None:
+        partial = _partial_for(aggregator)
+        tag_buckets = _TagBuckets(partial.trending)
+    likes, comments, shares, plays, durations = _video_columns(videos, hashtag_counts, tag_buckets)
+
+    total_likes = int(likes.sum())
+    total_comments = int(comments.sum())
+    total_shares = int(shares.sum())
+    total_plays = int(plays.sum())
+
+    positive_durations = durations[durations > 0]
+    watched = plays > 0
+    engagement = (likes[watched] + comments[watched] + shares[watched]) / plays[watched]
+
+    short_videos = int(np.count_nonzero(durations < SHORT_VIDEO_SECONDS))
+    long_videos = int(np.count_nonzero(durations >= LONG_VIDEO_SECONDS))
+
+    top = _top_indices(likes, HOT_VIDEO_LIMIT).tolist()
+    hot_videos = [_hot_video(videos[index], int(likes[index])) for index in top[:hot_video_count(count)]]
+
+    analysis = {
+        "total_videos": count,
+        "statistics": {
+            "total_likes": total_likes,
+            "total_comments": total_comments,
+            "total_shares": total_shares,
+            "total_plays": total_plays,
+            "avg_likes": total_likes / count,
+            "avg_comments": total_comments / count,
+            "avg_shares": total_shares / count,
+            "avg_plays": total_plays / count,
+            "avg_duration": positive_durations.mean().item() if len(positive_durations) else 0,
+            "avg_engagement_rate": engagement.mean().item() if len(engagement) else 0,
+        },
+        "hot_videos": hot_videos,
+        "top_hashtags": sorted(hashtag_counts.items(), key=lambda x: x[1], reverse=True)[:TOP_HASHTAG_LIMIT],
+        "content_analysis": {
+            "short_videos": short_videos,
+            "medium_videos": count - short_videos - long_videos,
+            "long_videos": long_videos,
+        },
+        "percentiles": {
+            "likes": _summary(likes),
+            "plays": _summary(plays),
+            "shares": _summary(shares),
+            "duration": _summary(positive_durations),
+            "engagement_rate": _summary(engagement),
+        },
+        "hot_like_threshold": np.quantile(likes, HOT_QUANTILE, method="inverted_cdf").item(),
+    }
+
+    if partial is not None:
+        tag_buckets.flush()
+        columns = {
+            "likes": likes,
+            "plays": plays,
+            "shares": shares,
+            "duration": positive_durations,
+            "engagement_rate": engagement,
+        }
+        _fill_partial(partial, videos, analysis, columns, hashtag_counts, top)
+        aggregator.merge(partial)
+    return analysis
+
+
+def analyze_videos(
+    videos: Sequence[Dict[str, Any]],
+    use_numpy: Optional[bool] = None,
+    aggregator: Optional[VideoAggregator] = None
+) -> Dict[str, Any]:
+    """
+    计算视频统计
+
+    输出结构与 VideoAggregator.snapshot() 相同；NumPy实现的分位数为精确值
+
+    Args:
+        videos: 原始或格式化后的视频列表
+        use_numpy: 是否使用NumPy实现，默认在已安装时使用
+        aggregator: 跨批次的聚合器（如所有用户的全局统计），传入时把这批视频的结果合并进去，
+                    无需再逐条加入
+
+    Returns:
+        分析结果，视频为空时返回空字典
+    """
+    if not videos:
+        return {}
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise ImportError("向量化统计需要numpy，请安装: pip install twitter-client[analysis]")
+        return _analyze_numpy(videos, aggregator)
+    if aggregator is None:
+        return VideoAggregator().consume(videos).snapshot()
+    partial = _partial_for(aggregator).consume(videos)
+    aggregator.merge(partial)
+    return partial.snapshot()
@@ -5,6 +5,7 @@ Twitter推文拉取客户端
 
 from .client import TwitterClient, TwitterClientError
 from .config import ConfigManager, create_default_config_file
+from .compare import compare_users, iter_user_reports
 
 __version__ = "1.0.0"
 __author__ = "Twitter Client"
@@ -14,5 +15,7 @@ __all__ = [
     "TwitterClient",
     "TwitterClientError", 
     "ConfigManager",
-    "create_default_config_file"
+    "create_default_config_file",
+    "compare_users",
+    "iter_user_reports"
 ]
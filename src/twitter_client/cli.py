@@ -5,13 +5,40 @@
 
 import argparse
 import asyncio
-import json
+import functools
 import sys
 import os
 import logging
 from typing import Optional
 
+try:
+    from social_common import serialization
+    from social_common.normalize import CorpusNormalizer
+    from social_common.compression import open_output, COMPRESSIONS
+    from social_common.sinks import JsonlWriter, RollingShardWriter, ThreadedSink, run_blocking, FSYNC_POLICIES
+    from social_common.storage import SQLiteArchive, ArchiveSink, TWEET, VIDEO
+    from social_common.replay import ResponseArchive, RecordingHandler, ReplayHandler
+    from social_common.dedupe import SeenStore
+    from social_common.near_duplicates import NearDuplicateIndex
+    from social_common.mapreduce import analyze_corpus, DEFAULT_CHUNK_BYTES
+    from social_common.timeseries import EngagementSeries, GRANULARITIES
+    from social_common.segmentation import KeywordAggregator
+except ImportError:
+    # 以src.twitter_client方式导入时，公共模块位于src包内
+    from ..social_common import serialization
+    from ..social_common.normalize import CorpusNormalizer
+    from ..social_common.compression import open_output, COMPRESSIONS
+    from ..social_common.sinks import JsonlWriter, RollingShardWriter, ThreadedSink, run_blocking, FSYNC_POLICIES
+    from ..social_common.storage import SQLiteArchive, ArchiveSink, TWEET, VIDEO
+    from ..social_common.replay import ResponseArchive, RecordingHandler, ReplayHandler
+    from ..social_common.dedupe import SeenStore
+    from ..social_common.near_duplicates import NearDuplicateIndex
+    from ..social_common.mapreduce import analyze_corpus, DEFAULT_CHUNK_BYTES
+    from ..social_common.timeseries import EngagementSeries, GRANULARITIES
+    from ..social_common.segmentation import KeywordAggregator
+
 from .client import TwitterClient
+from .compare import compare_users
 from .config import ConfigManager, create_default_config_file
 
 # 设置日志
@@ -22,43 +49,206 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _rotating(args) -> bool:
+    """是否启用分片滚动输出"""
+    return bool(args.rotate_size or args.rotate_records or args.rotate_interval)
+
+
+def _open_writer(args):
+    """按命令行参数创建JSONL写入器，启用滚动时 --output 为分片目录"""
+    if _rotating(args):
+        return RollingShardWriter(
+            args.output,
+            prefix=args.user_id,
+            max_bytes=int(args.rotate_size * 1024 * 1024) if args.rotate_size else None,
+            max_records=args.rotate_records,
+            interval=args.rotate_interval,
+            compress=args.compress,
+            flush_interval=args.flush_interval,
+            fsync=args.fsync
+        )
+    return JsonlWriter(
+        args.output,
+        flush_interval=args.flush_interval,
+        fsync=args.fsync,
+        compress=args.compress
+    )
+
+
+def _open_near_index(args) -> Optional[NearDuplicateIndex]:
+    """按命令行参数创建或加载近似重复索引，未启用时返回None"""
+    if args.near_duplicates is None and not args.near_index:
+        return None
+    if args.near_index and os.path.exists(args.near_index):
+        index = NearDuplicateIndex.load(args.near_index)
+        if args.near_duplicates is not None:
+            # 分带参数沿用建索引时的阈值，新阈值只影响候选的判定
+            index.threshold = args.near_duplicates
+        # 只统计本次运行跳过的数量
+        index.duplicates = 0
+        return index
+    return NearDuplicateIndex(threshold=args.near_duplicates if args.near_duplicates is not None else 0.8)
+
+
+def _authors_path(args) -> str:
+    """JSONL输出的共享作者表路径：分片目录下的 authors.json，或输出文件旁的 <输出>.authors.json"""
+    if _rotating(args):
+        return os.path.join(args.output, "authors.json")
+    return f"{args.output}.authors.json"
+
+
+def _export_record(tweet, formatted, normalizer: Optional[CorpusNormalizer]):
+    """输出的推文记录；启用规范化时保留原始作者对象并驻留到共享作者表，推文只保存 author_id"""
+    if normalizer is None:
+        return formatted
+    author = tweet.get("author")
+    if isinstance(author, dict) and author:
+        formatted = {**formatted, "author": author}
+    return normalizer.normalize_item(formatted)
+
+
+def _write_json(path: str, data, compress: Optional[str]):
+    """写出JSON文件（在线程池中调用）"""
+    with open_output(path, 'wt', compress=compress) as f:
+        serialization.dump(data, f, indent=True)
+
+
 async def fetch_tweets_command(args):
     """获取推文命令"""
     try:
         # 创建配置管理器
         config_manager = ConfigManager(args.config)
         
-        if not config_manager.validate_config():
+        # 回放模式不访问网络，无需Cookie
+        if not args.replay and not config_manager.validate_config():
             print("❌ 配置验证失败，请检查配置文件或环境变量TWITTER_COOKIE")
             return 1
         
         # 创建客户端
-        client = TwitterClient(config_manager.get_request_config())
+        if args.replay:
+            client = TwitterClient(
+                config_manager.get_request_config(),
+                handler=ReplayHandler(ResponseArchive(args.replay))
+            )
+        else:
+            client = TwitterClient(config_manager.get_request_config())
+            if args.record:
+                # 录制每一页原始响应，之后可用 --replay 离线重跑
+                client.handler = RecordingHandler(client.handler, ResponseArchive(args.record))
         
         print(f"正在获取用户 {args.user_id} 的推文...")
         
+        # 本地SQLite归档，按推文ID去重
+        archive = SQLiteArchive(args.db, fulltext=args.fulltext) if args.db else None
+        
+        # 跨运行去重，跳过之前已输出过的推文
+        dedupe = SeenStore(args.dedupe) if args.dedupe else None
+        
+        # 按内容相似度跳过转发、复制粘贴等近似重复的推文
+        near_duplicates = _open_near_index(args)
+        
+        if args.format == "parquet" and (args.stream or args.raw):
+            print("❌ --format parquet 只支持批量获取，不能与 --stream 或 --raw 同时使用")
+            await client.close()
+            return 1
+        
+        if args.format == "parquet" and args.compress:
+            print("❌ Parquet 数据集已按列压缩，不能与 --compress 同时使用")
+            await client.close()
+            return 1
+        
+        # 同一作者的对象只在共享作者表中保存一份
+        normalizer = CorpusNormalizer() if args.normalize else None
+        if normalizer and (args.raw or args.format == "parquet" or not args.output):
+            print("⚠️ --normalize 只作用于 --output 的JSON/JSONL输出")
+            normalizer = None
+        
+        if _rotating(args) and not (args.output and (args.stream or args.raw)):
+            print("❌ 分片滚动需要配合 --output 以及 --stream 或 --raw 使用")
+            await client.close()
+            return 1
+        
         # 获取推文
-        if args.stream:
+        if args.raw:
+            # 原始透传：不做转换和格式化，每页原始数据写为一行
+            if not args.output:
+                print("❌ --raw 需要配合 --output 使用")
+                await client.close()
+                return 1
+            if archive:
+                print("⚠️ 原始模式不解析推文，不会写入 --db")
+            if dedupe:
+                print("⚠️ 原始模式按页保存，不做 --dedupe 去重")
+            if near_duplicates is not None:
+                print("⚠️ 原始模式按页保存，不做 --near-duplicates 去重")
+            
+            page_count = 0
+            tweet_count = 0
+            # 序列化和写文件在后台线程中进行，不阻塞网络请求
+            with ThreadedSink(_open_writer(args)) as writer:
+                async for page in client.fetch_user_tweets_raw(
+                    user_id=args.user_id,
+                    max_tweets=args.count,
+                    page_size=args.page_size,
+                    sink=writer
+                ):
+                    page_count += 1
+                    tweet_count += len(page["ids"])
+            
+            print(f"✅ 原始模式获取 {page_count} 页 ({tweet_count} 条推文)，已保存到 {args.output}")
+        elif args.stream:
             # 流式获取
             count = 0
-            async for tweet in client.fetch_user_tweets_stream(
-                user_id=args.user_id,
-                max_tweets=args.count,
-                page_size=args.page_size
-            ):
-                count += 1
-                formatted = client.format_tweet(tweet)
-                
-                if args.output:
-                    # 保存到文件
-                    with open(args.output, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps(formatted, ensure_ascii=False) + '\n')
-                else:
-                    # 输出到控制台
-                    print(f"推文 {count}:")
-                    print(f"  内容: {formatted.get('text', '')[:100]}...")
-                    print(f"  点赞: {formatted.get('public_metrics', {}).get('like_count', 0)}")
-                    print("-" * 50)
+            # 输出文件在整个流式过程中保持打开，缓冲写入；
+            # 写文件和写数据库都交给后台线程，磁盘繁忙时不阻塞网络请求
+            writer = ThreadedSink(_open_writer(args)) if args.output else None
+            archive_sink = ThreadedSink(ArchiveSink(archive, TWEET, args.user_id)) if archive else None
+            try:
+                async for tweet in client.fetch_user_tweets_stream(
+                    user_id=args.user_id,
+                    max_tweets=args.count,
+                    page_size=args.page_size,
+                    dedupe=dedupe
+                ):
+                    formatted = client.format_tweet(tweet)
+                    if near_duplicates is not None and near_duplicates.check_record(TWEET, formatted):
+                        continue
+                    count += 1
+                    
+                    if archive_sink:
+                        await archive_sink.awrite(formatted)
+                    
+                    if writer:
+                        # 保存到文件
+                        await writer.awrite(_export_record(tweet, formatted, normalizer))
+                    elif not archive_sink:
+                        # 输出到控制台
+                        print(f"推文 {count}:")
+                        print(f"  内容: {formatted.get('text', '')[:100]}...")
+                        print(f"  点赞: {formatted.get('public_metrics', {}).get('like_count', 0)}")
+                        print("-" * 50)
+            finally:
+                # 正常结束、异常或Ctrl-C时都等待后台线程写完并刷新缓冲区；
+                # 输出文件关闭失败时仍关闭数据库写入并提交ID
+                try:
+                    if writer:
+                        writer.close()
+                finally:
+                    try:
+                        if archive_sink:
+                            archive_sink.close()
+                    finally:
+                        # 记录落盘后再提交其ID
+                        if dedupe:
+                            dedupe.flush()
+            
+            if writer:
+                print(f"✅ 成功获取 {count} 条推文，已保存到 {args.output}")
+            if normalizer:
+                await run_blocking(_write_json, _authors_path(args), {"authors": normalizer.authors.to_dict()}, None)
+                print(f"👥 {len(normalizer.authors)} 个作者已保存到 {_authors_path(args)}")
+            if archive_sink:
+                print(f"✅ 已写入 {archive_sink.records_written} 条推文到数据库 {args.db}")
         else:
             # 批量获取
             tweets = await client.fetch_user_tweets(
@@ -66,20 +256,48 @@ async def fetch_tweets_command(args):
                 max_tweets=args.count,
                 page_size=args.page_size
             )
+            if dedupe:
+                tweets = list(dedupe.filter_new(TWEET, tweets))
+            if near_duplicates is not None:
+                tweets = list(near_duplicates.filter_new(TWEET, tweets))
             
-            if args.output:
+            if archive:
+                stored = await run_blocking(
+                    archive.upsert_tweets,
+                    [client.format_tweet(tweet) for tweet in tweets],
+                    user_id=args.user_id
+                )
+                print(f"✅ 已写入 {stored} 条推文到数据库 {args.db}")
+            
+            if args.output and args.format == "parquet":
+                # 列式导出，按用户和日期分区
+                try:
+                    from social_common.columnar import export_tweets_parquet
+                except ImportError:
+                    from ..social_common.columnar import export_tweets_parquet
+                
+                await run_blocking(
+                    export_tweets_parquet,
+                    [client.format_tweet(tweet) for tweet in tweets],
+                    args.output,
+                    user_id=args.user_id
+                )
+                print(f"✅ 成功获取 {len(tweets)} 条推文，已保存到Parquet数据集 {args.output}")
+            elif args.output:
                 # 保存到文件
                 output_data = {
                     "user_id": args.user_id,
                     "tweet_count": len(tweets),
-                    "tweets": [client.format_tweet(tweet) for tweet in tweets]
+                    "tweets": [_export_record(tweet, client.format_tweet(tweet), normalizer) for tweet in tweets]
                 }
+                if normalizer:
+                    # 推文中的 author_id 引用此表
+                    output_data["authors"] = normalizer.authors.to_dict()
                 
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    json.dump(output_data, f, indent=2, ensure_ascii=False)
+                await run_blocking(_write_json, args.output, output_data, args.compress)
                 
                 print(f"✅ 成功获取 {len(tweets)} 条推文，已保存到 {args.output}")
-            else:
+            elif not archive:
                 # 输出到控制台
                 print(f"✅ 成功获取 {len(tweets)} 条推文:")
                 print("-" * 50)
@@ -97,7 +315,22 @@ async def fetch_tweets_command(args):
                               f"🔄{metrics.get('retweet_count', 0)} "
                               f"💬{metrics.get('reply_count', 0)}")
                     print("-" * 50)
+            
+            # 推文写入数据库和输出文件后再提交其ID
+            if dedupe:
+                dedupe.flush()
         
+        if dedupe:
+            if dedupe.duplicates:
+                print(f"ℹ️ 跳过 {dedupe.duplicates} 条已输出过的推文")
+            dedupe.close()
+        if near_duplicates is not None:
+            if near_duplicates.duplicates:
+                print(f"ℹ️ 跳过 {near_duplicates.duplicates} 条近似重复的推文")
+            if args.near_index:
+                near_duplicates.save(args.near_index)
+        if archive:
+            archive.close()
         await client.close()
         return 0
         
@@ -107,6 +340,209 @@ async def fetch_tweets_command(args):
         return 1
 
 
+async def compare_command(args):
+    """多用户对比命令"""
+    try:
+        config_manager = ConfigManager(args.config)
+        
+        if not args.replay and not config_manager.validate_config():
+            print("❌ 配置验证失败，请检查配置文件或环境变量TWITTER_COOKIE")
+            return 1
+        
+        handler = ReplayHandler(ResponseArchive(args.replay)) if args.replay else None
+        client = TwitterClient(config_manager.get_request_config(), handler=handler)
+        
+        def print_partial(report):
+            if args.json:
+                return
+            if report.get("error"):
+                print(f"⚠️ 用户 {report['user_id']}: {report['error']}")
+            else:
+                print(f"✅ 用户 {report['user_id']}: {report['tweet_count']} 条推文，"
+                      f"平均互动 {report['engagement_per_tweet']:.1f}")
+        
+        try:
+            report = await compare_users(
+                client,
+                args.user_ids,
+                max_tweets=args.count,
+                concurrency=args.concurrency,
+                on_partial=print_partial
+            )
+        finally:
+            await client.close()
+        
+        if args.json:
+            print(serialization.dumps(report, indent=True))
+            return 0
+        
+        print("\n🏆 平均互动排名 (点赞+转发)/推文:")
+        print("-" * 50)
+        for item in report["ranking"]:
+            print(f"{item['rank']:>3}. 用户 {item['user_id']}: {item['engagement_per_tweet']:.1f} "
+                  f"(👍{item['total_likes']} 🔄{item['total_retweets']} / {item['tweet_count']} 条)")
+        if report["failed"]:
+            print(f"⚠️ {len(report['failed'])} 个用户分析失败: {', '.join(report['failed'])}")
+        return 0 if report["ranking"] else 1
+    
+    except Exception as e:
+        logger.error(f"用户对比失败: {e}")
+        print(f"❌ 错误: {e}")
+        return 1
+
+
+def search_local_command(args):
+    """本地全文检索命令"""
+    try:
+        if not os.path.exists(args.db):
+            print(f"❌ 数据库不存在: {args.db}")
+            return 1
+        
+        with SQLiteArchive(args.db) as archive:
+            if not archive.fulltext:
+                print("❌ 数据库未建立全文索引，请先使用 fetch --db ... --fulltext")
+                return 1
+            results = archive.search(args.kind, args.query, user_id=args.user_id, limit=args.limit)
+        
+        if args.json:
+            print(serialization.dumps(results, indent=True))
+            return 0
+        
+        print(f"🔍 找到 {len(results)} 条匹配 \"{args.query}\" 的记录:")
+        print("-" * 50)
+        for i, item in enumerate(results, 1):
+            if args.kind == TWEET:
+                metrics = item.get('public_metrics', {})
+                print(f"推文 {i}:")
+                print(f"  ID: {item.get('id', 'N/A')}")
+                print(f"  作者: {item.get('author', 'N/A')}")
+                print(f"  内容: {item.get('text', '')[:100]}")
+                print(f"  互动: 👍{metrics.get('like_count', 0)} 🔄{metrics.get('retweet_count', 0)}")
+            else:
+                stats = item.get('statistics', {})
+                print(f"视频 {i}:")
+                print(f"  ID: {item.get('aweme_id', 'N/A')}")
+                print(f"  作者: {item.get('author', {}).get('nickname', 'N/A')}")
+                print(f"  描述: {item.get('desc', '')[:100]}")
+                print(f"  话题: {' '.join('#' + tag for tag in item.get('hashtags', []))}")
+                print(f"  互动: 👍{stats.get('digg_count', 0)} ▶️{stats.get('play_count', 0)}")
+            print("-" * 50)
+        return 0
+    
+    except ValueError as e:
+        print(f"❌ 查询无效: {e}")
+        return 1
+    except Exception as e:
+        logger.error(f"本地检索失败: {e}")
+        print(f"❌ 错误: {e}")
+        return 1
+
+
+def _print_series(series: EngagementSeries, as_json: bool) -> int:
+    """输出互动时间序列"""
+    points = series.series()
+    if as_json:
+        print(serialization.dumps(points, indent=True))
+        return 0
+    
+    label = {"minute": "分钟", "hour": "小时", "day": "天"}[series.granularity]
+    print(f"📈 按{label}统计的互动序列 ({len(points)} 个时间桶):")
+    for point in points:
+        if series.kind == TWEET:
+            detail = f"👍{point['likes']} 🔄{point['retweets']} 💬{point['replies']}"
+        else:
+            detail = f"👍{point['likes']} ▶️{point['plays']} 加权互动率 {point['weighted_engagement_rate']:.2%}"
+        print(f"  {point['time']}  {point['count']:>6} 条  {detail}")
+    if series.skipped:
+        print(f"ℹ️ {series.skipped} 条记录缺少发布时间，未计入")
+    return 0
+
+
+def _print_keywords(keywords: KeywordAggregator, args) -> int:
+    """输出关键词统计，按需生成词云"""
+    top = keywords.top(args.keywords)
+    if not top:
+        print("ℹ️ 没有提取到关键词")
+        return 0
+    if args.wordcloud:
+        keywords.wordcloud(args.wordcloud, font_path=args.font)
+    
+    if args.json:
+        print(serialization.dumps({**keywords.snapshot(), "top_keywords": top}, indent=True))
+        return 0
+    
+    print(f"🔤 {keywords.count} 条记录中的热门关键词:")
+    for word, count in top:
+        print(f"  {word}: {count}")
+    if args.wordcloud:
+        print(f"☁️ 词云已生成: {args.wordcloud}")
+    return 0
+
+
+def analyze_local_command(args):
+    """本地归档并行分析命令"""
+    try:
+        missing = [path for path in args.paths if not os.path.exists(path)]
+        if missing:
+            print(f"❌ 路径不存在: {', '.join(missing)}")
+            return 1
+        
+        if args.series and args.keywords:
+            print("❌ --series 与 --keywords 不能同时使用")
+            return 1
+        if args.wordcloud and not args.keywords:
+            print("❌ --wordcloud 需要配合 --keywords 使用")
+            return 1
+        
+        factory = None
+        if args.series:
+            factory = functools.partial(EngagementSeries, args.kind, args.series)
+        elif args.keywords:
+            # 分片已在进程池中并行，各工作进程内直接分词
+            factory = functools.partial(KeywordAggregator, args.kind)
+        aggregator = analyze_corpus(
+            args.paths,
+            args.kind,
+            workers=args.workers,
+            chunk_bytes=int(args.chunk_size * 1024 * 1024),
+            factory=factory
+        )
+        
+        if args.series:
+            return _print_series(aggregator, args.json)
+        if args.keywords:
+            return _print_keywords(aggregator, args)
+        
+        result = aggregator.snapshot()
+        
+        if args.json:
+            print(serialization.dumps(result, indent=True))
+            return 0
+        
+        if args.kind == TWEET:
+            print(f"📊 共分析 {result['total_tweets']} 条推文")
+            print(f"  总点赞: {result['total_likes']}  总转发: {result['total_retweets']}  总回复: {result['total_replies']}")
+            print(f"  平均文本长度: {result['avg_text_length']:.1f}")
+            top_hashtags = sorted(result['hashtags'].items(), key=lambda x: x[1], reverse=True)[:10]
+        else:
+            if not result:
+                print("ℹ️ 没有找到视频记录")
+                return 0
+            stats = result['statistics']
+            print(f"📊 共分析 {result['total_videos']} 个视频")
+            print(f"  总点赞: {stats['total_likes']}  总播放: {stats['total_plays']}")
+            print(f"  平均互动率: {stats['avg_engagement_rate']:.2%}")
+            top_hashtags = result['top_hashtags']
+        if top_hashtags:
+            print("  热门话题: " + ", ".join(f"{tag}({count})" for tag, count in top_hashtags))
+        return 0
+    
+    except Exception as e:
+        logger.error(f"本地分析失败: {e}")
+        print(f"❌ 错误: {e}")
+        return 1
+
+
 def config_command(args):
     """配置命令"""
     try:
@@ -126,7 +562,7 @@ def config_command(args):
                 config_copy['cookie'] = '[已设置]'
             
             print("当前配置:")
-            print(json.dumps(config_copy, indent=2, ensure_ascii=False))
+            print(serialization.dumps(config_copy, indent=True))
             return 0
         
         elif args.validate:
@@ -158,6 +594,38 @@ def main():
   # 流式获取并保存到文件
   twitter-client fetch 25073877 --stream --output tweets.json
   
+  # 流式获取并以zstd压缩保存
+  twitter-client fetch 25073877 --stream --output tweets.jsonl.zst
+  
+  # 写入本地SQLite归档（重复拉取时刷新互动数据）
+  twitter-client fetch 25073877 --count 200 --db tweets.db
+  
+  # 导出为Parquet数据集（需安装analysis扩展）
+  twitter-client fetch 25073877 --count 200 --format parquet --output tweets_parquet/
+  
+  # 录制原始响应，之后离线回放
+  twitter-client fetch 25073877 --count 200 --record crawl_archive/
+  twitter-client fetch 25073877 --count 200 --replay crawl_archive/ --output tweets.json
+  
+  # 作者对象只在共享作者表中保存一份，推文引用author_id
+  twitter-client fetch 25073877 --count 200 --output tweets.json --normalize
+  
+  # 定时轮询时跳过之前已输出过的推文
+  twitter-client fetch 25073877 --stream --output tweets.jsonl --dedupe seen.db
+  
+  # 跳过转发、复制粘贴等内容近似重复的推文，索引跨运行保留
+  twitter-client fetch 25073877 --count 500 --output tweets.json --near-duplicates 0.8 --near-index near.idx
+  
+  # 长时间运行时按小时或每10万条切换分片，输出目录中的manifest.jsonl列出已完成分片
+  twitter-client fetch 25073877 --stream --count 1000000 --output shards/ --rotate-interval 3600 --rotate-records 100000
+  
+  # 原始透传模式归档
+  twitter-client fetch 25073877 --raw --count 1000 --output pages.jsonl
+  
+  # 写入归档时建立全文索引，之后在本地检索
+  twitter-client fetch 25073877 --count 200 --db tweets.db --fulltext
+  twitter-client search-local "美食 探店" --db tweets.db --limit 10
+  
   # 初始化配置文件
   twitter-client config --init
   
@@ -204,6 +672,198 @@ def main():
         "--output", "-o",
         help="输出文件路径"
     )
+    fetch_parser.add_argument(
+        "--db",
+        help="SQLite归档路径，按推文ID去重并刷新互动数据"
+    )
+    fetch_parser.add_argument(
+        "--fulltext",
+        action="store_true",
+        help="为 --db 归档建立全文索引，供 search-local 使用"
+    )
+    fetch_parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="把作者对象提取到共享作者表，推文只保存author_id（JSON输出内含作者表，JSONL输出另存为 <输出>.authors.json）"
+    )
+    fetch_parser.add_argument(
+        "--dedupe",
+        metavar="PATH",
+        help="去重库路径，跨运行跳过已输出过的推文（可与--db使用同一文件）"
+    )
+    fetch_parser.add_argument(
+        "--near-duplicates",
+        type=float,
+        metavar="THRESHOLD",
+        help="跳过与已获取推文内容相似度不低于阈值的推文（0-1，如0.8）"
+    )
+    fetch_parser.add_argument(
+        "--near-index",
+        metavar="PATH",
+        help="近似重复索引文件，跨运行保留 --near-duplicates 的索引"
+    )
+    fetch_parser.add_argument(
+        "--format",
+        choices=["json", "parquet"],
+        default="json",
+        help="批量输出格式，parquet输出为按用户和日期分区的目录，不支持 --stream/--raw/--compress (默认: json)"
+    )
+    fetch_parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default=None,
+        help="输出压缩格式，默认按扩展名判断 (.gz/.zst)"
+    )
+    fetch_parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=1.0,
+        help="流式输出的刷新间隔秒数 (默认: 1.0)"
+    )
+    fetch_parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default="never",
+        help="流式输出的fsync策略 (默认: never)"
+    )
+    fetch_parser.add_argument(
+        "--rotate-size",
+        type=float,
+        metavar="MB",
+        help="流式/原始模式按大小切换分片，--output 作为分片目录"
+    )
+    fetch_parser.add_argument(
+        "--rotate-records",
+        type=int,
+        metavar="N",
+        help="流式/原始模式按记录数切换分片，--output 作为分片目录"
+    )
+    fetch_parser.add_argument(
+        "--rotate-interval",
+        type=float,
+        metavar="SECONDS",
+        help="流式/原始模式按时间窗口切换分片（如3600为每小时），--output 作为分片目录"
+    )
+    record_group = fetch_parser.add_mutually_exclusive_group()
+    record_group.add_argument(
+        "--record",
+        metavar="DIR",
+        help="把每一页原始响应录制到归档目录"
+    )
+    record_group.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="从录制归档回放，不访问网络"
+    )
+    fetch_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="原始透传模式，按页保存处理器原始数据 (需配合--output)"
+    )
+    
+    # compare子命令
+    compare_parser = subparsers.add_parser("compare", help="并发对比多个用户的互动数据")
+    compare_parser.add_argument("user_ids", nargs="+", help="用户ID列表")
+    compare_parser.add_argument(
+        "--count", "-n",
+        type=int,
+        default=100,
+        help="每个用户最多分析的推文数 (默认: 100)"
+    )
+    compare_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="同时拉取的用户数上限 (默认: 4)"
+    )
+    compare_parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="从录制归档回放，不访问网络"
+    )
+    compare_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以JSON输出完整对比报告"
+    )
+    
+    # search-local子命令
+    search_parser = subparsers.add_parser("search-local", help="在本地归档中全文检索")
+    search_parser.add_argument("query", help="关键词，空白分隔的多个关键词需同时命中")
+    search_parser.add_argument(
+        "--db",
+        required=True,
+        help="SQLite归档路径（需以 --fulltext 建立过索引）"
+    )
+    search_parser.add_argument(
+        "--kind",
+        choices=[TWEET, VIDEO],
+        default=TWEET,
+        help="检索推文或视频 (默认: tweet)"
+    )
+    search_parser.add_argument(
+        "--user-id",
+        help="只检索该用户的记录"
+    )
+    search_parser.add_argument(
+        "--limit", "-n",
+        type=int,
+        default=20,
+        help="最多返回的记录数 (默认: 20)"
+    )
+    search_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以JSON输出完整记录"
+    )
+    
+    # analyze-local子命令
+    analyze_parser = subparsers.add_parser("analyze-local", help="并行分析本地JSONL/Parquet归档")
+    analyze_parser.add_argument("paths", nargs="+", help="JSONL/Parquet文件或目录")
+    analyze_parser.add_argument(
+        "--kind",
+        choices=[TWEET, VIDEO],
+        default=TWEET,
+        help="记录类型 (默认: tweet)"
+    )
+    analyze_parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        help="工作进程数 (默认: CPU核数，1为单进程)"
+    )
+    analyze_parser.add_argument(
+        "--chunk-size",
+        type=float,
+        default=DEFAULT_CHUNK_BYTES / 1024 / 1024,
+        metavar="MB",
+        help=f"未压缩JSONL每个分片的大小 (默认: {DEFAULT_CHUNK_BYTES // 1024 // 1024}MB)"
+    )
+    analyze_parser.add_argument(
+        "--series",
+        choices=list(GRANULARITIES),
+        help="改为输出按发布时间分桶的互动时间序列"
+    )
+    analyze_parser.add_argument(
+        "--keywords",
+        type=int,
+        metavar="N",
+        help="改为输出中文分词后的前N个关键词 (需要jieba)"
+    )
+    analyze_parser.add_argument(
+        "--wordcloud",
+        metavar="PATH",
+        help="按关键词频次生成词云图片 (需配合--keywords，需要wordcloud)"
+    )
+    analyze_parser.add_argument(
+        "--font",
+        metavar="PATH",
+        help="词云使用的中文字体文件"
+    )
+    analyze_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以JSON输出完整分析结果"
+    )
     
     # config子命令
     config_parser = subparsers.add_parser("config", help="配置管理")
@@ -232,7 +892,22 @@ def main():
     
     # 执行命令
     if args.command == "fetch":
-        return asyncio.run(fetch_tweets_command(args))
+        try:
+            return asyncio.run(fetch_tweets_command(args))
+        except KeyboardInterrupt:
+            # 输出端已在退出时刷新
+            print("\n⚠️ 已中断")
+            return 130
+    elif args.command == "compare":
+        try:
+            return asyncio.run(compare_command(args))
+        except KeyboardInterrupt:
+            print("\n⚠️ 已中断")
+            return 130
+    elif args.command == "search-local":
+        return search_local_command(args)
+    elif args.command == "analyze-local":
+        return analyze_local_command(args)
     elif args.command == "config":
         return config_command(args)
     else:
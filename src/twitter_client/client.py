@@ -3,12 +3,19 @@ Twitter客户端封装类
 基于F2项目的TwitterHandler实现推文拉取功能
 """
 
-import asyncio
-import json
 from typing import Dict, List, Optional, AsyncGenerator, Any
-from datetime import datetime
 import logging
 
+try:
+    from social_common.entities import extract_entities
+    from social_common.raw import build_raw_page, write_to_sink
+    from social_common.storage import TWEET
+except ImportError:
+    # 以src.twitter_client方式导入时，公共模块位于src包内
+    from ..social_common.entities import extract_entities
+    from ..social_common.raw import build_raw_page, write_to_sink
+    from ..social_common.storage import TWEET
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -27,16 +34,18 @@ class TwitterClient:
     基于F2项目的TwitterHandler封装，提供简化的推文拉取接口
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], handler: Optional[Any] = None):
         """
         初始化Twitter客户端
         
         Args:
             config: 配置字典，包含headers、proxies、cookie等信息
+            handler: 自定义处理器（如录制/回放处理器），默认创建TwitterHandler
         """
         self.config = config
-        self.handler = None
-        self._init_handler()
+        self.handler = handler
+        if self.handler is None:
+            self._init_handler()
     
     def _init_handler(self):
         """初始化TwitterHandler"""
@@ -66,6 +75,9 @@ class TwitterClient:
         Returns:
             推文列表
         """
+        if not self.handler:
+            raise RuntimeError("客户端未初始化")
+        
         tweets = []
         
         try:
@@ -92,7 +104,8 @@ class TwitterClient:
         user_id: str,
         max_tweets: int = 100,
         page_size: int = 20,
-        max_cursor: str = ""
+        max_cursor: str = "",
+        dedupe: Optional[Any] = None
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         流式获取用户推文
@@ -102,10 +115,14 @@ class TwitterClient:
             max_tweets: 最大获取推文数量
             page_size: 每页获取的推文数量
             max_cursor: 分页游标
+            dedupe: 去重库（SeenStore或NearDuplicateIndex），跳过之前已输出过或内容近似重复的推文
             
         Yields:
             单条推文数据
         """
+        if not self.handler:
+            raise RuntimeError("客户端未初始化")
+        
         tweet_count = 0
         
         try:
@@ -116,6 +133,8 @@ class TwitterClient:
                 max_counts=max_tweets
             ):
                 tweet_data = tweet_list._to_list()
+                if dedupe is not None:
+                    tweet_data = dedupe.filter_new(TWEET, tweet_data)
                 
                 for tweet in tweet_data:
                     if tweet_count >= max_tweets:
@@ -123,11 +142,68 @@ class TwitterClient:
                     
                     yield tweet
                     tweet_count += 1
+                    # 达到数量后立即返回，避免去重过滤器把未输出的下一条记为已见过
+                    if tweet_count >= max_tweets:
+                        return
                     
         except Exception as e:
             logger.error(f"流式获取推文失败: {e}")
             raise
     
+    async def fetch_user_tweets_raw(
+        self,
+        user_id: str,
+        max_tweets: int = 100,
+        page_size: int = 20,
+        max_cursor: str = "",
+        sink: Optional[Any] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        原始透传模式获取用户推文
+        
+        跳过 _to_dict()/_to_list() 转换和格式化，只提取推文ID和分页游标，
+        适用于只需归档原始数据的场景
+        
+        Args:
+            user_id: 用户ID
+            max_tweets: 最大获取推文数量（按整页计，最后一页不截断）
+            page_size: 每页获取的推文数量
+            max_cursor: 分页游标
+            sink: 输出端，提供 write(record) 方法，每页写入一次
+            
+        Yields:
+            原始页面记录，包含 user_id、cursor、ids、raw 等字段
+        """
+        if not self.handler:
+            raise RuntimeError("客户端未初始化")
+        
+        tweet_count = 0
+        
+        try:
+            async for tweet_list in self.handler.fetch_post_tweet(
+                userId=user_id,
+                page_counts=page_size,
+                max_cursor=max_cursor,
+                max_counts=max_tweets
+            ):
+                page = build_raw_page(
+                    tweet_list,
+                    platform="twitter",
+                    user_id=user_id,
+                    id_attrs=("tweet_id",),
+                    cursor_attrs=("max_cursor", "cursor")
+                )
+                await write_to_sink(sink, page)
+                yield page
+                
+                tweet_count += len(page["ids"])
+                if tweet_count >= max_tweets:
+                    return
+                    
+        except Exception as e:
+            logger.error(f"原始模式获取推文失败: {e}")
+            raise
+    
     async def get_tweet_details(self, tweet_id: str) -> Dict[str, Any]:
         """
         获取单条推文详情
@@ -159,15 +235,19 @@ class TwitterClient:
             格式化后的推文数据
         """
         try:
+            text = tweet_data.get("text", "") or ""
+
             # 提取关键信息
             formatted_tweet = {
                 "id": tweet_data.get("id", ""),
-                "text": tweet_data.get("text", ""),
+                "text": text,
                 "author": tweet_data.get("author", {}).get("username", ""),
                 "created_at": tweet_data.get("created_at", ""),
                 "public_metrics": tweet_data.get("public_metrics", {}),
                 "urls": [],
-                "media": []
+                "media": [],
+                # 从正文中提取的话题、提及、股票代码和URL
+                "entities": extract_entities(text)
             }
             
             # 提取URL和媒体信息
@@ -0,0 +1,157 @@
+"""
+多用户对比模块
+在并发上限内同时拉取并分析多个用户的推文，每个用户完成后立即产出其结果，
+最后按每条推文的平均互动排名生成对比报告
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from social_common.aggregators import TweetAggregator
+except ImportError:
+    # 以src.twitter_client方式导入时，公共模块位于src包内
+    from ..social_common.aggregators import TweetAggregator
+
+logger = logging.getLogger(__name__)
+
+# 单个用户结果中展示的热门话题数量
+TOP_HASHTAGS_PER_USER = 3
+
+
+def engagement_per_tweet(aggregator: TweetAggregator) -> float:
+    """
+    每条推文的平均互动: (点赞 + 转发) / 推文数
+
+    与视频统计和时间序列中按播放计算的互动率不同，这里按推文数平均，不是比例
+    """
+    if not aggregator.count:
+        return 0.0
+    return (aggregator.total_likes + aggregator.total_retweets) / aggregator.count
+
+
+def _user_report(user_id: str, aggregator: TweetAggregator) -> Dict[str, Any]:
+    snapshot = aggregator.snapshot()
+    return {
+        "user_id": user_id,
+        "tweet_count": snapshot["total_tweets"],
+        "total_likes": snapshot["total_likes"],
+        "total_retweets": snapshot["total_retweets"],
+        "total_replies": snapshot["total_replies"],
+        "avg_text_length": snapshot["avg_text_length"],
+        "engagement_per_tweet": engagement_per_tweet(aggregator),
+        "most_liked": snapshot["most_liked_tweet"],
+        "top_hashtags": aggregator.hashtags.top(TOP_HASHTAGS_PER_USER),
+    }
+
+
+async def _analyze_users(
+    client: Any,
+    user_ids: Sequence[str],
+    max_tweets: int,
+    concurrency: int
+) -> AsyncGenerator[Tuple[str, Optional[TweetAggregator], Optional[str]], None]:
+    """按完成顺序产出 (用户ID, 聚合器, 错误信息)"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def analyze(user_id: str):
+        async with semaphore:
+            aggregator = TweetAggregator(client.format_tweet)
+            try:
+                await aggregator.aconsume(client.fetch_user_tweets_stream(user_id=user_id, max_tweets=max_tweets))
+            except Exception as e:
+                logger.error(f"分析用户 {user_id} 失败: {e}")
+                return user_id, None, str(e)
+            if not aggregator.count:
+                return user_id, None, "没有推文数据"
+            return user_id, aggregator, None
+
+    # 去重且保持顺序，同一用户只拉取一次
+    tasks = [asyncio.ensure_future(analyze(user_id)) for user_id in dict.fromkeys(user_ids)]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        # 调用方提前停止迭代时取消尚未完成的拉取
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_user_reports(
+    client: Any,
+    user_ids: Sequence[str],
+    max_tweets: int = 100,
+    concurrency: int = 4
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    并发分析多个用户，按完成顺序逐个产出单用户结果
+
+    Args:
+        client: TwitterClient
+        user_ids: 用户ID列表
+        max_tweets: 每个用户最多分析的推文数
+        concurrency: 同时拉取的用户数上限
+
+    Yields:
+        单用户结果，失败时为 {"user_id": ..., "error": ...}
+    """
+    async for user_id, aggregator, error in _analyze_users(client, user_ids, max_tweets, concurrency):
+        yield {"user_id": user_id, "error": error} if aggregator is None else _user_report(user_id, aggregator)
+
+
+async def compare_users(
+    client: Any,
+    user_ids: Sequence[str],
+    max_tweets: int = 100,
+    concurrency: int = 4,
+    on_partial: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> Dict[str, Any]:
+    """
+    生成多用户对比报告
+
+    Args:
+        client: TwitterClient
+        user_ids: 用户ID列表
+        max_tweets: 每个用户最多分析的推文数
+        concurrency: 同时拉取的用户数上限
+        on_partial: 每个用户分析完成时调用，参数为单用户结果（可以是协程函数）
+
+    Returns:
+        对比报告，包含按平均互动排名的 ranking、所有用户合并后的 overall 和失败的 failed
+    """
+    overall = TweetAggregator()
+    users: List[Dict[str, Any]] = []
+    failed: Dict[str, str] = {}
+
+    async for user_id, aggregator, error in _analyze_users(client, user_ids, max_tweets, concurrency):
+        if aggregator is None:
+            failed[user_id] = error
+            report = {"user_id": user_id, "error": error}
+        else:
+            overall.merge(aggregator)
+            report = _user_report(user_id, aggregator)
+            users.append(report)
+
+        if on_partial is not None:
+            result = on_partial(report)
+            if asyncio.iscoroutine(result):
+                await result
+
+    ranking = sorted(users, key=lambda x: x["engagement_per_tweet"], reverse=True)
+    for rank, report in enumerate(ranking, 1):
+        report["rank"] = rank
+
+    return {
+        "users_compared": len(ranking),
+        "ranking": ranking,
+        "overall": {
+            "tweet_count": overall.count,
+            "total_likes": overall.total_likes,
+            "total_retweets": overall.total_retweets,
+            "total_replies": overall.total_replies,
+            "engagement_per_tweet": engagement_per_tweet(overall),
+            "top_hashtags": overall.hashtags.top(TOP_HASHTAGS_PER_USER),
+        },
+        "failed": failed,
+    }
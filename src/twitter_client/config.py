@@ -3,12 +3,17 @@
 用于管理Twitter客户端的配置信息
 """
 
-import json
 import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 import logging
 
+try:
+    from social_common import serialization
+except ImportError:
+    # 以src.twitter_client方式导入时，公共模块位于src包内
+    from ..social_common import serialization
+
 # 支持.env文件
 try:
     from dotenv import load_dotenv
@@ -78,7 +83,7 @@ class ConfigManager:
         try:
             if self.config_path.exists():
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
+                    file_config = serialization.load(f)
                 
                 # 合并配置，文件配置覆盖默认配置
                 self._merge_config(self.config, file_config)
@@ -154,7 +159,7 @@ class ConfigManager:
                 save_config["cookie"] = "[从环境变量TWITTER_COOKIE加载]"
             
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(save_config, f, indent=2, ensure_ascii=False)
+                serialization.dump(save_config, f, indent=True)
             
             logger.info(f"配置已保存到: {self.config_path}")
             
@@ -244,7 +249,7 @@ def create_default_config_file(config_path: str = None):
     example_config["cookie"] = "[请设置您的Twitter Cookie或使用环境变量TWITTER_COOKIE]"
     
     with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(example_config, f, indent=2, ensure_ascii=False)
+        serialization.dump(example_config, f, indent=True)
     
     print(f"默认配置文件已创建: {config_path}")
     print("请编辑配置文件或设置环境变量TWITTER_COOKIE")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+录制回放安全性测试
+归档中的页面类型不在允许列表中时，回放不得导入或调用该类型
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加src目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "src"))
+
+from social_common.replay import ReplayHandler, ReplayPage, ResponseArchive
+
+
+def _replay_profile(root: str, type_name: str, raw):
+    archive = ResponseArchive(root)
+    kwargs = {"userId": "fixture"}
+    archive.save_request("fetch_user_profile", kwargs, [
+        {"digest": archive.put_object(raw), "type": type_name}
+    ])
+    return asyncio.run(ReplayHandler(archive).fetch_user_profile(**kwargs))
+
+
+def test_unlisted_type_is_not_called():
+    """不在允许列表中的类型不会被调用"""
+    with tempfile.TemporaryDirectory() as root:
+        marker = Path(root) / "executed"
+        command = f"touch {marker}"
+        page = _replay_profile(root, "os:system", command)
+
+        assert isinstance(page, ReplayPage)
+        assert page._to_raw() == command
+        assert not marker.exists()
+
+
+def test_unlisted_module_is_not_imported():
+    """不在允许列表中的模块不会被导入"""
+    module_name = "xml.dom.minidom"
+    sys.modules.pop(module_name, None)
+    with tempfile.TemporaryDirectory() as root:
+        page = _replay_profile(root, f"{module_name}:parseString", "<a/>")
+
+    assert isinstance(page, ReplayPage)
+    assert module_name not in sys.modules
+
+
+def main():
+    """运行所有测试"""
+    print("🔍 录制回放安全性测试")
+    print("=" * 30)
+    test_unlisted_type_is_not_called()
+    print("✅ 未列出的类型不会被调用")
+    test_unlisted_module_is_not_imported()
+    print("✅ 未列出的模块不会被导入")
+
+
+if __name__ == "__main__":
+    main()